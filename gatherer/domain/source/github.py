@@ -119,6 +119,14 @@ class GitHub(Git):
 
         return self._github_token
 
+    @property
+    def github_api_url(self) -> str:
+        """
+        Retrieve the base URL of the GitHub API.
+        """
+
+        return self._github_api_url
+
     @property
     def github_owner(self) -> str:
         """
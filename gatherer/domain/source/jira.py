@@ -24,6 +24,7 @@ from jira import JIRA
 from jira.exceptions import JIRAError
 from .types import Source, Source_Types, Project
 from ...config import Configuration
+from ...request import Rate_Limit_Adapter
 
 @Source_Types.register('jira')
 class Jira(Source):
@@ -109,5 +110,13 @@ class Jira(Source):
 
             self._jira_api = JIRA(server=self.plain_url, options=options,
                                   basic_auth=auth, max_retries=0)
+            # The JIRA client has no argument for a session or its adapters,
+            # so the adapter is mounted on the session which the client made
+            # during construction and uses for all its later requests.
+            adapter = Rate_Limit_Adapter()
+            # pylint: disable-next=protected-access
+            session = self._jira_api._session
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
 
         return self._jira_api
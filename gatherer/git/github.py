@@ -23,6 +23,8 @@ import re
 from typing import Dict, List, Optional, Set, Tuple, Union, cast, TYPE_CHECKING
 import dateutil.tz
 import github
+from .graphql import Comment, GitHub_GraphQL, Issue, Pull_Request, Review, \
+    User
 from .repo import Git_Repository
 from ..table import Table, Key_Table, Link_Table
 from ..utils import convert_utc_datetime, format_date, get_local_datetime, \
@@ -46,10 +48,14 @@ else:
     Source = object
     GitHub = object
 
-CommentLike = Union[github.CommitComment.CommitComment,
-                    github.PullRequestComment.PullRequestComment]
-NoteLike = Union[CommentLike, github.IssueComment.IssueComment]
-IssueLike = Union[github.Issue.Issue, github.PullRequest.PullRequest]
+IssueCommentLike = Union[github.IssueComment.IssueComment, Comment]
+ReviewCommentLike = Union[github.PullRequestComment.PullRequestComment, Comment]
+CommentLike = Union[github.CommitComment.CommitComment, ReviewCommentLike]
+NoteLike = Union[CommentLike, IssueCommentLike]
+PullRequestLike = Union[github.PullRequest.PullRequest, Pull_Request]
+IssueLike = Union[github.Issue.Issue, PullRequestLike, Issue]
+ReviewLike = Union[github.PullRequestReview.PullRequestReview, Review]
+UserLike = Union[github.NamedUser.NamedUser, User]
 
 class GitHub_Repository(Git_Repository, Review_System):
     """
@@ -78,6 +84,13 @@ class GitHub_Repository(Git_Repository, Review_System):
         else:
             self._github_bots = {bot.strip() for bot in bots.split(',')}
 
+        self._graphql: Optional[GitHub_GraphQL] = None
+        if source.get_option('github_graphql'):
+            unsafe = source.get_option('unsafe_hosts')
+            self._graphql = GitHub_GraphQL(source.github_api_url,
+                                           token=source.github_token,
+                                           verify=not unsafe)
+
     @property
     def review_tables(self) -> Dict[str, Table]:
         review_tables = super().review_tables
@@ -196,18 +209,45 @@ class GitHub_Repository(Git_Repository, Review_System):
 
         return versions
 
+    def _add_pull_request_data(self, pull_request: PullRequestLike) -> bool:
+        newer, reviews = self.add_pull_request(pull_request)
+        if newer:
+            for issue_comment in pull_request.get_issue_comments():
+                self.add_pull_comment(issue_comment, pull_request.number)
+            for review_comment in pull_request.get_review_comments():
+                self.add_review_comment(review_comment, pull_request.number)
+            for review in reviews:
+                self.add_review(review, pull_request.number)
+
+        return newer
+
     def _get_pull_requests(self) -> None:
+        if self._graphql is not None:
+            self._get_graphql_pull_requests(self._graphql)
+            return
+
         for pull_request in self.source.github_repo.get_pulls(state='all'):
-            newer, reviews = self.add_pull_request(pull_request)
-            if newer:
-                for issue_comment in pull_request.get_issue_comments():
-                    self.add_pull_comment(issue_comment, pull_request.number)
-                for review_comment in pull_request.get_review_comments():
-                    self.add_review_comment(review_comment, pull_request.number)
-                for review in reviews:
-                    self.add_review(review, pull_request.number)
+            self._add_pull_request_data(pull_request)
+
+    def _get_graphql_pull_requests(self, graphql: GitHub_GraphQL) -> None:
+        pull_requests = graphql.get_pull_requests(
+            self.source.github_owner, self.source.path_name, self.tracker_date
+        )
+        since = convert_utc_datetime(self.tracker_date)
+        for pull_request in pull_requests:
+            if self._add_pull_request_data(pull_request):
+                # Pull requests are also issues in the REST API, but not in
+                # the GraphQL issues, so we add them to the issue tables here.
+                self._add_issue(pull_request, pull_request.number,
+                                pull_request.label_count)
+                for issue_comment in pull_request.get_comments(since=since):
+                    self.add_issue_comment(issue_comment, pull_request.number)
 
     def _get_issues(self) -> None:
+        if self._graphql is not None:
+            self._get_graphql_issues(self._graphql)
+            return
+
         since = convert_utc_datetime(self.tracker_date)
         for issue in self.source.github_repo.get_issues(state='all',
                                                         since=since):
@@ -216,6 +256,16 @@ class GitHub_Repository(Git_Repository, Review_System):
                 for issue_comment in issue.get_comments(since=since):
                     self.add_issue_comment(issue_comment, issue.number)
 
+    def _get_graphql_issues(self, graphql: GitHub_GraphQL) -> None:
+        since = convert_utc_datetime(self.tracker_date)
+        issues = graphql.get_issues(self.source.github_owner,
+                                    self.source.path_name, since)
+        for issue in issues:
+            if self._is_newer(issue.updated_at):
+                self._add_issue(issue, 0, issue.label_count)
+                for issue_comment in issue.get_comments(since=since):
+                    self.add_issue_comment(issue_comment, issue.number)
+
     def fill_repo_table(self, repo: github.Repository.Repository) -> None:
         """
         Add the repository data from a GitHub API Repository object `repo`
@@ -249,13 +299,13 @@ class GitHub_Repository(Git_Repository, Review_System):
         })
 
     @staticmethod
-    def _get_username(part: Optional[github.NamedUser.NamedUser]) -> str:
+    def _get_username(part: Optional[UserLike]) -> str:
         if part is None:
             return str(0)
 
         return parse_unicode(part.login)
 
-    def _is_bot_user(self, user: github.NamedUser.NamedUser) -> bool:
+    def _is_bot_user(self, user: UserLike) -> bool:
         if user.type == "Bot":
             return True
         if user.login in self._github_bots:
@@ -286,8 +336,8 @@ class GitHub_Repository(Git_Repository, Review_System):
             'updated_at': updated_at 
         }
 
-    def add_pull_request(self, pull_request: github.PullRequest.PullRequest) \
-            -> Tuple[bool, List[github.PullRequestReview.PullRequestReview]]:
+    def add_pull_request(self, pull_request: PullRequestLike) \
+            -> Tuple[bool, List[ReviewLike]]:
         """
         Add a pull request described by its GitHub API response object to the
         merge requests table. Returns whether the pull request is updated more
@@ -339,6 +389,11 @@ class GitHub_Repository(Git_Repository, Review_System):
             if match:
                 pull_request_id = int(match.group(1))
 
+        self._add_issue(issue, pull_request_id, len(issue.labels))
+        return True
+
+    def _add_issue(self, issue: Union[github.Issue.Issue, Issue],
+                   pull_request_id: int, labels: int) -> None:
         if issue.closed_at is not None:
             closed_date = format_date(convert_local_datetime(issue.closed_at))
         else:
@@ -347,14 +402,12 @@ class GitHub_Repository(Git_Repository, Review_System):
         issue_row = self._format_issue(issue)
         issue_row.update({
             'pull_request_id': str(pull_request_id),
-            'labels': str(len(issue.labels)),
+            'labels': str(labels),
             'closed_at': closed_date,
             'closed_by': self._get_username(issue.closed_by)
         })
         self._tables["github_issue"].append(issue_row)
 
-        return True
-
     def _format_note(self, comment: NoteLike) -> Dict[str, str]:
         author = self._get_username(comment.user)
         return {
@@ -367,7 +420,7 @@ class GitHub_Repository(Git_Repository, Review_System):
             'updated_at': format_date(convert_local_datetime(comment.updated_at))
         }
 
-    def add_issue_comment(self, comment: github.IssueComment.IssueComment,
+    def add_issue_comment(self, comment: IssueCommentLike,
                           issue_id: int) -> bool:
         """
         Add an issue comment described by its GitHub API response object to the
@@ -384,7 +437,7 @@ class GitHub_Repository(Git_Repository, Review_System):
 
         return True
 
-    def add_pull_comment(self, comment: github.IssueComment.IssueComment,
+    def add_pull_comment(self, comment: IssueCommentLike,
                          request_id: int) -> bool:
         """
         Add a normal pull request comment described by its GitHub API response
@@ -419,11 +472,11 @@ class GitHub_Repository(Git_Repository, Review_System):
             'merge_request_id': str(request_id),
             'created_date': note['created_at'],
             'updated_date': note['updated_at'],
-            'file': comment.path,
+            'file': comment.path or '',
             'line': str(line),
             'end_line': str(end_line),
             'line_type': line_type if line_type is not None else str(0),
-            'commit_id': comment.commit_id
+            'commit_id': comment.commit_id or str(0)
         })
         del note['created_at']
         del note['updated_at']
@@ -446,8 +499,7 @@ class GitHub_Repository(Git_Repository, Review_System):
         self._add_commit_comment(comment, line=line, end_line=line)
         return True
 
-    def add_review_comment(self,
-                           comment: github.PullRequestComment.PullRequestComment,
+    def add_review_comment(self, comment: ReviewCommentLike,
                            request_id: int = 0) -> bool:
         """
         Add a pull request review comment described by its GitHub API response
@@ -462,7 +514,8 @@ class GitHub_Repository(Git_Repository, Review_System):
             return False
 
         # We store the most recent line indexes to which the comment applies.
-        position = comment.position
+        # Outdated comments have no position.
+        position = comment.position if comment.position is not None else 0
         if comment.diff_hunk is not None and comment.diff_hunk.startswith('@@'):
             lines = comment.diff_hunk.split('\n')
             match = re.match(r'@@ -(\d+),(\d+) \+(\d+),(\d+) @@', lines[0])
@@ -488,8 +541,7 @@ class GitHub_Repository(Git_Repository, Review_System):
 
         return True
 
-    def add_review(self, review: github.PullRequestReview.PullRequestReview,
-                   request_id: int) -> None:
+    def add_review(self, review: ReviewLike, request_id: int) -> None:
         """
         Add a pull request review described by its GitHub API response object
         to the merge request reviews table.
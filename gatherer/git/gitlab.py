@@ -19,10 +19,14 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Type, cast, TYPE_CHECKING
+import threading
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, \
+    Optional, Tuple, Type, TypeVar, cast, TYPE_CHECKING
 from git import GitCommandError
 import gitlab.v4.objects
 from gitlab.exceptions import GitlabAuthenticationError, GitlabGetError
@@ -41,6 +45,9 @@ else:
     Source = object
     GitLab = object
 
+T = TypeVar('T')
+R = TypeVar('R')
+
 class GitLab_Dropins_Parser:
     """
     Parser for dropins containing an exported version of GitLab API responses.
@@ -126,6 +133,14 @@ class GitLab_Repository(Git_Repository, Review_System):
 
     ISO8601_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
 
+    # Default number of concurrent requests for notes and comments per host
+    HARVEST_WORKERS = 4
+
+    # Semaphores that limit the number of concurrent requests to each host,
+    # shared by all repositories on the host.
+    _host_slots: Dict[str, threading.BoundedSemaphore] = {}
+    _host_lock = threading.Lock()
+
     AUXILIARY_TABLES = Git_Repository.AUXILIARY_TABLES | \
         Review_System.AUXILIARY_TABLES | {'gitlab_repo', 'vcs_event'}
 
@@ -136,6 +151,11 @@ class GitLab_Repository(Git_Repository, Review_System):
         self._repo_project: Optional[gitlab.v4.objects.Project] = None
         has_commit_comments = self._source.get_option('has_commit_comments')
         self._has_commit_comments = has_commit_comments is not None
+        workers = self._source.get_option('gitlab_workers')
+        if workers is not None and workers.isdigit() and int(workers) > 0:
+            self._harvest_workers = int(workers)
+        else:
+            self._harvest_workers = self.HARVEST_WORKERS
 
         # List of dropin files that contain table data for GitLab only.
         self._table_dropin_files = [
@@ -304,16 +324,66 @@ class GitLab_Repository(Git_Repository, Review_System):
             for event in self.repo_project.events.list(as_list=False):
                 self.add_event(event)
 
-            for request in self.repo_project.mergerequests.list(as_list=False):
-                newer = self.add_merge_request(request)
-                if newer:
-                    for note in request.notes.list(as_list=False):
-                        self.add_note(note, request.id)
+            merge_requests = self._harvest(self._get_newer_merge_requests(),
+                                           lambda request: request.notes.list(as_list=False))
+            for request, notes in merge_requests:
+                for note in notes:
+                    self.add_note(note, request.id)
 
         self.set_latest_date()
 
         return versions
 
+    def _get_newer_merge_requests(self) \
+            -> Iterator[gitlab.v4.objects.ProjectMergeRequest]:
+        for request in self.repo_project.mergerequests.list(as_list=False):
+            if self.add_merge_request(request):
+                yield request
+
+    def _get_host_slots(self) -> threading.BoundedSemaphore:
+        with self._host_lock:
+            host = self.source.host
+            if host not in self._host_slots:
+                slots = threading.BoundedSemaphore(self._harvest_workers)
+                self._host_slots[host] = slots
+
+            return self._host_slots[host]
+
+    def _harvest(self, items: Iterable[T], fetch: Callable[[T], Iterable[R]]) \
+            -> Iterator[Tuple[T, List[R]]]:
+        """
+        Retrieve the related objects of each of the `items` by calling `fetch`
+        with the item in a pool of threads, with a limited number of concurrent
+        requests to the GitLab host.
+
+        The items are consumed in the main thread with a bounded lookahead and
+        yielded in their original order along with the list of their objects,
+        such that table rows are added in a deterministic order. The first
+        error of a `fetch` call is raised when its item is reached.
+        """
+
+        slots = self._get_host_slots()
+
+        def _fetch(item: T) -> List[R]:
+            with slots:
+                return list(fetch(item))
+
+        pending: Deque[Tuple[T, 'Future[List[R]]']] = deque()
+        with ThreadPoolExecutor(max_workers=self._harvest_workers) as executor:
+            try:
+                for item in items:
+                    pending.append((item, executor.submit(_fetch, item)))
+                    if len(pending) > 2 * self._harvest_workers:
+                        item, future = pending.popleft()
+                        yield item, future.result()
+
+                while pending:
+                    item, future = pending.popleft()
+                    yield item, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
     def get_commit_comments(self, versions: List[Dict[str, str]]) -> None:
         """
         Retrieve commit comments for specific `versions`, a sequence of version
@@ -321,14 +391,22 @@ class GitLab_Repository(Git_Repository, Review_System):
         hashes to retrieve commit comments for.
 
         The commit comments are added to the auxiliary review system table.
+        The comments of several commits are retrieved concurrently, but they
+        are added in the order of the versions.
         """
 
         if self._has_commit_comments:
-            for version in versions:
-                commit = self.repo_project.commits.get(version['version_id'],
-                                                       lazy=True)
-                for comment in commit.comments.list(as_list=False):
-                    self.add_commit_comment(comment, version['version_id'])
+            commits = self.repo_project.commits
+
+            def _get_comments(commit_id: Version) \
+                    -> Iterable[gitlab.v4.objects.ProjectCommitComment]:
+                commit = commits.get(commit_id, lazy=True)
+                return commit.comments.list(as_list=False)
+
+            commit_ids = [version['version_id'] for version in versions]
+            for commit_id, comments in self._harvest(commit_ids, _get_comments):
+                for comment in comments:
+                    self.add_commit_comment(comment, commit_id)
 
     def fill_repo_table(self, repo_project: gitlab.v4.objects.Project) -> None:
         """
@@ -0,0 +1,376 @@
+"""
+Module for retrieving pull requests and issues along with their comments and
+reviews in paginated batches from the GitHub GraphQL API.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, \
+    Sequence, Union
+from requests.exceptions import ConnectionError as ConnectError, HTTPError, \
+    Timeout
+from ..request import Session
+from ..utils import convert_utc_datetime, get_utc_datetime
+
+Node = Dict[str, Any]
+Variables = Dict[str, Union[str, int, None]]
+
+User = NamedTuple('User', [('login', str), ('type', str)])
+Ref = NamedTuple('Ref', [('ref', str)])
+Review = NamedTuple('Review', [('state', str), ('user', User)])
+Comment = NamedTuple('Comment', [('id', int),
+                                 ('user', User),
+                                 ('body', str),
+                                 ('created_at', datetime),
+                                 ('updated_at', datetime),
+                                 ('path', Optional[str]),
+                                 ('commit_id', Optional[str]),
+                                 ('position', Optional[int]),
+                                 ('diff_hunk', Optional[str])])
+
+# Deleted accounts are replaced by this user in the REST API
+GHOST = User('ghost', 'User')
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Size of the first page of connections nested within a node of a page
+NESTED_SIZE = 50
+
+PAGE_INFO = 'pageInfo { hasNextPage endCursor }'
+ACTOR_FIELDS = 'login __typename'
+COMMENT_FIELDS = f'databaseId body createdAt updatedAt author {{ {ACTOR_FIELDS} }}'
+REVIEW_COMMENT_FIELDS = f'{COMMENT_FIELDS} path position diffHunk commit {{ oid }}'
+REVIEW_FIELDS = f'''id state author {{ {ACTOR_FIELDS} }}
+comments(first: {NESTED_SIZE}) {{ {PAGE_INFO} nodes {{ {REVIEW_COMMENT_FIELDS} }} }}'''
+ISSUE_FIELDS = f'''id number title body state createdAt updatedAt closedAt
+author {{ {ACTOR_FIELDS} }}
+assignees(first: 1) {{ nodes {{ {ACTOR_FIELDS} }} }}
+labels {{ totalCount }}
+timelineItems(itemTypes: [CLOSED_EVENT], last: 1) {{
+  nodes {{ ... on ClosedEvent {{ actor {{ {ACTOR_FIELDS} }} }} }}
+}}
+comments(first: {NESTED_SIZE}) {{ {PAGE_INFO} nodes {{ {COMMENT_FIELDS} }} }}'''
+PULL_REQUEST_FIELDS = f'''{ISSUE_FIELDS}
+merged headRefName baseRefName
+reviews(first: {NESTED_SIZE}) {{ {PAGE_INFO} nodes {{ {REVIEW_FIELDS} }} }}'''
+
+PULL_REQUESTS_QUERY = f'''query($owner: String!, $name: String!, $size: Int!,
+                                $cursor: String) {{
+  repository(owner: $owner, name: $name) {{
+    pullRequests(first: $size, after: $cursor,
+                 orderBy: {{field: UPDATED_AT, direction: DESC}}) {{
+      {PAGE_INFO}
+      nodes {{ {PULL_REQUEST_FIELDS} }}
+    }}
+  }}
+}}'''
+
+ISSUES_QUERY = f'''query($owner: String!, $name: String!, $size: Int!,
+                         $cursor: String, $since: DateTime) {{
+  repository(owner: $owner, name: $name) {{
+    issues(first: $size, after: $cursor, filterBy: {{since: $since}},
+           orderBy: {{field: UPDATED_AT, direction: DESC}}) {{
+      {PAGE_INFO}
+      nodes {{ {ISSUE_FIELDS} }}
+    }}
+  }}
+}}'''
+
+def get_connection_query(type_name: str, field: str, fields: str) -> str:
+    """
+    Format a query for retrieving further pages of a connection `field` of
+    a node with the GraphQL type `type_name`. The nodes of the connection have
+    the selected `fields`.
+    """
+
+    return f'''query($id: ID!, $size: Int!, $cursor: String) {{
+  node(id: $id) {{
+    ... on {type_name} {{
+      {field}(first: $size, after: $cursor) {{
+        {PAGE_INFO}
+        nodes {{ {fields} }}
+      }}
+    }}
+  }}
+}}'''
+
+def _get_date(value: str) -> datetime:
+    return get_utc_datetime(value, DATE_FORMAT)
+
+def _get_user(actor: Optional[Node]) -> Optional[User]:
+    if actor is None:
+        return None
+
+    # Bot logins have a suffix in the REST API
+    if actor['__typename'] == 'Bot':
+        return User(f"{actor['login']}[bot]", 'Bot')
+
+    return User(str(actor['login']), str(actor['__typename']))
+
+class Issue:
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """
+    Issue retrieved from the GitHub GraphQL API, with the attributes of an
+    issue object of PyGithub that are used by the GitHub repository.
+    """
+
+    def __init__(self, node: Node, comments: List[Comment]) -> None:
+        self.number = int(node['number'])
+        self.title = str(node['title'])
+        self.body = str(node['body'])
+        # Merged pull requests are closed issues in the REST API
+        self.state = 'open' if node['state'] == 'OPEN' else 'closed'
+        self.user = _get_user(node['author']) or GHOST
+        assignees = node['assignees']['nodes']
+        self.assignee = _get_user(assignees[0]) if assignees else None
+        self.created_at = _get_date(node['createdAt'])
+        self.updated_at = _get_date(node['updatedAt'])
+        self.closed_at = _get_date(node['closedAt']) \
+            if node['closedAt'] is not None else None
+        events = node['timelineItems']['nodes']
+        self.closed_by = _get_user(events[-1].get('actor')) if events else None
+        self.label_count = int(node['labels']['totalCount'])
+        self.comments = comments
+
+    def get_comments(self, since: Optional[datetime] = None) -> List[Comment]:
+        """
+        Retrieve the comments of the issue, optionally only those that are
+        updated at or after the `since` date.
+        """
+
+        if since is None:
+            return self.comments
+
+        return [comment for comment in self.comments
+                if comment.updated_at >= since]
+
+class Pull_Request(Issue):
+    """
+    Pull request retrieved from the GitHub GraphQL API, with the attributes of
+    a pull request object of PyGithub that are used by the GitHub repository.
+    """
+
+    def __init__(self, node: Node, comments: List[Comment],
+                 reviews: List[Review], review_comments: List[Comment]) -> None:
+        super().__init__(node, comments)
+        self.merged = bool(node['merged'])
+        self.head = Ref(str(node['headRefName']))
+        self.base = Ref(str(node['baseRefName']))
+        self.reviews = reviews
+        self.review_comments = review_comments
+
+    def get_issue_comments(self) -> List[Comment]:
+        """
+        Retrieve the normal comments of the pull request.
+        """
+
+        return self.comments
+
+    def get_review_comments(self) -> List[Comment]:
+        """
+        Retrieve the comments on lines of the pull request made in reviews.
+        """
+
+        return self.review_comments
+
+    def get_reviews(self) -> List[Review]:
+        """
+        Retrieve the reviews of the pull request.
+        """
+
+        return self.reviews
+
+class GitHub_GraphQL:
+    """
+    Client for the GitHub GraphQL API, which retrieves pull requests and
+    issues along with their comments and reviews in a few requests for each
+    batch, rather than one request per item like the REST API.
+    """
+
+    # Number of nodes to retrieve in one page of a paginated connection
+    PAGE_SIZE = 25
+    # Number of seconds to wait for a response of a query
+    TIMEOUT = 60
+
+    def __init__(self, api_url: str, token: Optional[str] = None,
+                 verify: bool = True) -> None:
+        # GitHub Enterprise has the REST API at /api/v3 and GraphQL at
+        # /api/graphql, while github.com has both at the API domain root.
+        api_url = api_url.rstrip('/')
+        if api_url.endswith('/v3'):
+            api_url = api_url[:-len('/v3')]
+        self._url = f'{api_url}/graphql'
+
+        self._session = Session(verify=verify)
+        if token is not None:
+            self._session.headers['Authorization'] = f'bearer {token}'
+
+    @property
+    def url(self) -> str:
+        """
+        Retrieve the URL of the GraphQL API endpoint.
+        """
+
+        return self._url
+
+    def query(self, query: str, variables: Variables) -> Node:
+        """
+        Perform a GraphQL `query` with the `variables` and return the data
+        of the result.
+
+        Raises a `RuntimeError` if the API cannot be reached or if the result
+        contains errors.
+        """
+
+        try:
+            request = self._session.post(self._url, json={
+                'query': query,
+                'variables': variables
+            }, timeout=self.TIMEOUT)
+            request.raise_for_status()
+        except (ConnectError, HTTPError, Timeout) as error:
+            raise RuntimeError('Could not query GitHub GraphQL API') from error
+
+        result: Node = request.json()
+        if result.get('errors'):
+            messages = '; '.join(str(error.get('message', error))
+                                 for error in result['errors'])
+            raise RuntimeError(f'GitHub GraphQL API errors: {messages}')
+
+        data: Node = result['data']
+        return data
+
+    def _get_connection(self, query: str, variables: Variables,
+                        path: Sequence[str],
+                        connection: Optional[Node] = None) -> Iterator[Node]:
+        # Retrieve the nodes from pages of a connection found at the path in
+        # the query data, possibly starting from an already retrieved page.
+        variables = variables.copy()
+        while True:
+            if connection is None:
+                data = self.query(query, variables)
+                for key in path:
+                    if data.get(key) is None:
+                        raise RuntimeError(f'GitHub GraphQL API has no {key}')
+
+                    data = data[key]
+                connection = data
+
+            yield from connection['nodes']
+            page_info = connection['pageInfo']
+            if not page_info['hasNextPage']:
+                return
+
+            variables['cursor'] = page_info['endCursor']
+            connection = None
+
+    def _get_nested(self, node: Node, type_name: str, field: str,
+                    fields: str) -> Iterator[Node]:
+        query = get_connection_query(type_name, field, fields)
+        variables: Variables = {
+            'id': node['id'],
+            'size': self.PAGE_SIZE,
+            'cursor': None
+        }
+        return self._get_connection(query, variables, ('node', field),
+                                    connection=node[field])
+
+    @staticmethod
+    def _get_comment(node: Node) -> Comment:
+        commit = node.get('commit')
+        return Comment(id=int(node['databaseId']),
+                       user=_get_user(node['author']) or GHOST,
+                       body=str(node['body']),
+                       created_at=_get_date(node['createdAt']),
+                       updated_at=_get_date(node['updatedAt']),
+                       path=node.get('path'),
+                       commit_id=commit['oid'] if commit is not None else None,
+                       position=node.get('position'),
+                       diff_hunk=node.get('diffHunk'))
+
+    def _get_comments(self, node: Node, type_name: str,
+                      since: Optional[datetime] = None) -> List[Comment]:
+        # Retrieve the comments of the node, optionally only those that are
+        # updated at or after the `since` date.
+        comments = (
+            self._get_comment(comment)
+            for comment in self._get_nested(node, type_name, 'comments',
+                                            COMMENT_FIELDS)
+        )
+        if since is None:
+            return list(comments)
+
+        return [comment for comment in comments if comment.updated_at >= since]
+
+    def get_pull_requests(self, owner: str, name: str,
+                          since: datetime) -> Iterator[Pull_Request]:
+        """
+        Retrieve pull requests of the repository `name` of the `owner` that are
+        updated after the `since` date, along with their comments and reviews,
+        in order of most recent update.
+        """
+
+        variables: Variables = {
+            'owner': owner,
+            'name': name,
+            'size': self.PAGE_SIZE,
+            'cursor': None
+        }
+        nodes = self._get_connection(PULL_REQUESTS_QUERY, variables,
+                                     ('repository', 'pullRequests'))
+        for node in nodes:
+            if _get_date(node['updatedAt']) <= since:
+                return
+
+            reviews: List[Review] = []
+            review_comments: List[Comment] = []
+            for review in self._get_nested(node, 'PullRequest', 'reviews',
+                                           REVIEW_FIELDS):
+                reviews.append(Review(state=str(review['state']),
+                                      user=_get_user(review['author']) or GHOST))
+                review_comments.extend(
+                    self._get_comment(comment)
+                    for comment in self._get_nested(review, 'PullRequestReview',
+                                                    'comments',
+                                                    REVIEW_COMMENT_FIELDS)
+                )
+
+            yield Pull_Request(node, self._get_comments(node, 'PullRequest'),
+                               reviews, review_comments)
+
+    def get_issues(self, owner: str, name: str,
+                   since: datetime) -> Iterator[Issue]:
+        """
+        Retrieve issues, excluding pull requests, of the repository `name` of
+        the `owner` that are updated at or after the `since` date, along with
+        their comments that are updated at or after that date as well, in order
+        of most recent update.
+        """
+
+        since = convert_utc_datetime(since)
+        variables: Variables = {
+            'owner': owner,
+            'name': name,
+            'size': self.PAGE_SIZE,
+            'cursor': None,
+            'since': since.strftime(DATE_FORMAT)
+        }
+        nodes = self._get_connection(ISSUES_QUERY, variables,
+                                     ('repository', 'issues'))
+        for node in nodes:
+            yield Issue(node, self._get_comments(node, 'Issue', since=since))
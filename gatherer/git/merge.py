@@ -0,0 +1,104 @@
+"""
+Module that indexes which merge commits brought in commits of a Git branch.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import Dict, List, Optional
+from git import Repo
+
+class Merge_Index:
+    """
+    Index of the earliest merge commit that is a descendant of each commit in
+    the history of a branch head, built from a single walk over the topology.
+
+    For each indexed commit, the merge is the same as the first result of
+    `git rev-list <commit>..<head> --ancestry-path --merges --reverse`.
+    Only commits that are reachable from `head` and not from `exclude` are
+    indexed; these commits have all their descendants in the index as well.
+    """
+
+    def __init__(self, repo: Repo, head: str = 'HEAD',
+                 exclude: Optional[str] = None) -> None:
+        args = ['--date-order', '--parents', head]
+        if exclude is not None:
+            args.extend(['--not', exclude])
+
+        self._commits: List[str] = []
+        self._merges: Dict[str, int] = {}
+        self._branches: Dict[str, str] = {}
+
+        # The walk shows children before their parents and older commits last,
+        # so the earliest descendant merge has the highest position.
+        for position, line in enumerate(repo.git.rev_list(*args).splitlines()):
+            hexsha, *parents = line.split(' ')
+            self._commits.append(hexsha)
+            if len(parents) > 1:
+                merge = position
+            else:
+                merge = self._merges.get(hexsha, -1)
+
+            if merge < 0:
+                continue
+
+            for parent in parents:
+                if self._merges.get(parent, -1) < merge:
+                    self._merges[parent] = merge
+
+        self._positions = {
+            hexsha: position for position, hexsha in enumerate(self._commits)
+        }
+
+    def __contains__(self, hexsha: object) -> bool:
+        return hexsha in self._positions
+
+    def __len__(self) -> int:
+        return len(self._commits)
+
+    def get_merge(self, hexsha: str) -> Optional[str]:
+        """
+        Retrieve the SHA of the earliest merge commit that has the indexed
+        commit `hexsha` as an ancestor. If there is no such merge commit, then
+        `None` is returned. If the commit is not indexed, then a `KeyError` is
+        raised.
+        """
+
+        if hexsha not in self._positions:
+            raise KeyError(f'Commit {hexsha} is not indexed')
+
+        merge = self._merges.get(hexsha, -1)
+        if merge < 0:
+            return None
+
+        return self._commits[merge]
+
+    def get_branch(self, merge_hexsha: str) -> Optional[str]:
+        """
+        Retrieve the branch name that was stored for the merge commit
+        `merge_hexsha`. If no branch name is known, then `None` is returned.
+        """
+
+        return self._branches.get(merge_hexsha)
+
+    def set_branch(self, merge_hexsha: str, branch: str) -> None:
+        """
+        Store the branch name that was parsed for the merge commit
+        `merge_hexsha`, such that other commits brought in by the same merge
+        do not need to parse it again.
+        """
+
+        self._branches[merge_hexsha] = branch
@@ -18,24 +18,28 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import repeat
 import logging
+import multiprocessing
 import os
 from pathlib import Path
 import re
 import shutil
 import tempfile
-from typing import Any, AbstractSet, Dict, Iterator, List, MutableSet, \
-    Literal, Optional, Pattern, Sequence, Tuple, Union, TYPE_CHECKING
-from git import Git, Repo, Blob, Commit, DiffConstants, DiffIndex, \
-    TagReference, InvalidGitRepositoryError, NoSuchPathError, GitCommandError, \
-    NULL_TREE
+from typing import Any, AbstractSet, Dict, Generator, Iterator, List, \
+    MutableSet, Literal, Optional, Pattern, Sequence, Tuple, Union, TYPE_CHECKING
+from git import Git, Repo, Blob, Commit, DiffConstants, TagReference, \
+    InvalidGitRepositoryError, NoSuchPathError, GitCommandError, NULL_TREE
 from ordered_set import OrderedSet
+from .merge import Merge_Index
 from .progress import Git_Progress
+from .stats import Commit_Stats, Stats_Collector, collect_chunk_stats
 from ..table import Table, Key_Table
 from ..utils import convert_local_datetime, format_date, parse_unicode, \
     Iterator_Limiter, Sprint_Data
-from ..version_control.repo import Change_Type, Version_Control_Repository, \
+from ..version_control.repo import Version_Control_Repository, \
     RepositoryDataException, RepositorySourceException, FileNotFoundException, \
     PathLike, Version
 if TYPE_CHECKING:
@@ -123,6 +127,8 @@ class Git_Repository(Version_Control_Repository):
     MAX_SIZE = 100000
     # How often to log the number of commits that have been analyzed
     LOG_SIZE = 1000
+    # Minimum number of commits to analyze in one process of a process pool
+    STATS_CHUNK_SIZE = 500
 
     MERGE_PATTERNS: Sequence[Pattern[str]] = \
         tuple(re.compile(pattern) for pattern in (
@@ -657,23 +663,41 @@ class Git_Repository(Version_Control_Repository):
                descending: bool = True,
                stats: bool = True) -> List[Dict[str, str]]:
         self._reset_limiter()
+        merge_index = self._index_merges(refspec) if stats else None
 
         version_data: List[Dict[str, str]] = []
-        commits = self._query(refspec, paths=paths, descending=descending)
         had_commits = True
         count = 0
         while self._iterator_limiter.check(had_commits):
-            had_commits = False
-
             try:
-                for commit in commits:
-                    had_commits = True
-                    count += 1
-                    version_data.append(self._parse_version(commit,
-                                                            stats=stats))
-
-                    if count % self.LOG_SIZE == 0:
-                        logging.info('Analysed commits up to %d', count)
+                commits = list(self._query(refspec, paths=paths,
+                                           descending=descending))
+                had_commits = bool(commits)
+
+                if stats and commits:
+                    batch_stats: Iterator[Optional[Commit_Stats]] = \
+                        self._collect_stats([commit.hexsha for commit in commits])
+                else:
+                    batch_stats = repeat(None)
+
+                try:
+                    for commit in commits:
+                        count += 1
+                        commit_stats = next(batch_stats)
+                        version = self._parse_version(commit, stats=stats,
+                                                      commit_stats=commit_stats,
+                                                      merge_index=merge_index)
+                        version_data.append(version)
+
+                        if count % self.LOG_SIZE == 0:
+                            logging.info('Analysed commits up to %d', count)
+
+                    # Finish the statistics, which waits for the processes
+                    # and raises any errors from them.
+                    next(batch_stats, None)
+                finally:
+                    if isinstance(batch_stats, Generator):
+                        batch_stats.close()
             except GitCommandError as error:
                 raise RepositoryDataException('Could not analyze commit') from error
 
@@ -681,15 +705,62 @@ class Git_Repository(Version_Control_Repository):
 
             self._iterator_limiter.update()
 
-            if self._iterator_limiter.check(had_commits):
-                commits = self._query(refspec, paths=paths, descending=descending)
-
         return version_data
 
-    def _parse_version(self, commit: Commit,
-                       stats: bool = True) -> Dict[str, str]:
+    def _index_merges(self, refspec: str) -> Optional[Merge_Index]:
+        # Index the merges that brought in commits from the history of HEAD,
+        # limited to commits that are not in the earlier part of the range.
+        exclude: Optional[str] = None
+        if '...' in refspec:
+            exclude = refspec.split('...', 1)[0]
+
+        try:
+            return Merge_Index(self.repo, exclude=exclude)
+        except GitCommandError:
+            logging.exception('Cannot index merge commits in repo %s',
+                              self.repo_name)
+            return None
+
+    def _collect_stats(self, commits: Sequence[str]) \
+            -> Generator[Commit_Stats, None, None]:
+        """
+        Retrieve difference statistics and changed path rows for a sequence of
+        commits, in the same order.
+
+        If the `stats_processes` option of the source allows it, then chunks
+        of the commits are handled by a pool of processes.
+        """
+
+        option = self._source.get_option('stats_processes')
+        processes = int(option) if option is not None and option.isdigit() else 1
+        if processes <= 1 or len(commits) < 2 * self.STATS_CHUNK_SIZE:
+            yield from Stats_Collector(self.repo, self.repo_name).iterate(commits)
+            return
+
+        size = max(self.STATS_CHUNK_SIZE, -(-len(commits) // (processes * 4)))
+        chunks = [commits[i:i + size] for i in range(0, len(commits), size)]
+        environment = self.repo.git.environment()
+        # Start new interpreters rather than forking a process which may have
+        # other threads, such as those of concurrent repositories.
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processes,
+                                 mp_context=context) as executor:
+            for chunk_stats in executor.map(collect_chunk_stats,
+                                            repeat(str(self.repo_directory)),
+                                            repeat(environment),
+                                            repeat(self.repo_name), chunks):
+                yield from chunk_stats
+
+    def _parse_version(self, commit: Commit, stats: bool = True,
+                       commit_stats: Optional[Commit_Stats] = None,
+                       merge_index: Optional[Merge_Index] = None) -> Dict[str, str]:
         """
         Convert one commit instance to a dictionary of properties.
+
+        If `stats` is enabled, then difference statistics and changed paths are
+        taken from `commit_stats` if provided, or else retrieved for the commit.
+        The original branch is looked up in `merge_index` if it is provided and
+        contains the commit.
         """
 
         commit_datetime = convert_local_datetime(commit.committed_datetime)
@@ -723,26 +794,30 @@ class Git_Repository(Version_Control_Repository):
         }
 
         if stats:
-            git_commit.update(self._get_diff_stats(commit))
-            git_commit['branch'] = self._get_original_branch(commit)
-            self._parse_change_stats(commit)
+            if commit_stats is None:
+                collector = Stats_Collector(self.repo, self.repo_name)
+                commit_stats = list(collector.iterate([commit.hexsha]))[0]
+
+            git_commit.update(commit_stats[0])
+            git_commit['branch'] = self._get_original_branch(commit, merge_index)
+            self._tables['change_path'].extend(commit_stats[1])
 
         return git_commit
 
-    @staticmethod
-    def _get_diff_stats(commit: Commit) -> Dict[str, str]:
-        cstotal = commit.stats.total
-
-        return {
-            # Statistics
-            'insertions': str(cstotal['insertions']),
-            'deletions': str(cstotal['deletions']),
-            'number_of_files': str(cstotal['files']),
-            'number_of_lines': str(cstotal['lines']),
-            'size': str(commit.size)
-        }
+    def _get_original_branch(self, commit: Commit,
+                             merge_index: Optional[Merge_Index] = None) -> str:
+        if merge_index is not None and commit.hexsha in merge_index:
+            merge_hexsha = merge_index.get_merge(commit.hexsha)
+            if merge_hexsha is None:
+                return str(0)
+
+            branch = merge_index.get_branch(merge_hexsha)
+            if branch is None:
+                branch = self._get_merge_branch(self.repo.commit(merge_hexsha))
+                merge_index.set_branch(merge_hexsha, branch)
+
+            return branch
 
-    def _get_original_branch(self, commit: Commit) -> str:
         try:
             commits = self.repo.iter_commits(f'{commit.hexsha}..HEAD',
                                              ancestry_path=True, merges=True,
@@ -757,115 +832,22 @@ class Git_Repository(Version_Control_Repository):
         except StopIteration:
             return str(0)
 
+        return self._get_merge_branch(merge_commit)
+
+    def _get_merge_branch(self, merge_commit: Commit) -> str:
         if isinstance(merge_commit.message, str):
             merge_message = parse_unicode(merge_commit.message)
         else:
             merge_message = parse_unicode(merge_commit.message.decode('utf-8'))
 
+        branch = str(0)
         for pattern in self.MERGE_PATTERNS:
             match = pattern.match(merge_message)
             if match:
-                return str(match.group(1))
-
-        return str(0)
-
-    @staticmethod
-    def _format_replaced_path(old_path: str, new_path: str) -> str:
-        # Algorithm comparable to pprint_rename function as implemented in git
-        # to format a path with partial replacement (move). See git's diff.c.
-        # Not implemented: C-style quoted files with non-unicode characters.
-
-        # Find common prefix
-        prefix_length = 0
-        for index, pair in enumerate(zip(old_path, new_path)):
-            if pair[0] != pair[1]:
+                branch = str(match.group(1))
                 break
-            if pair[0] == '/':
-                prefix_length = index + 1
-
-        # Find common suffix
-        suffix_length = 0
-        prefix_adjust_for_slash = 1 if prefix_length else 0
-        old_index = len(old_path) - 1
-        new_index = len(new_path) - 1
-        while prefix_length - prefix_adjust_for_slash <= old_index and \
-                prefix_length - prefix_adjust_for_slash <= new_index and \
-                old_path[old_index] == new_path[new_index]:
-            if old_path[old_index] == '/':
-                suffix_length = len(old_path) - old_index
-
-            old_index -= 1
-            new_index -= 1
-
-        # Format replaced path
-        old_midlen = max(0, len(old_path) - suffix_length)
-        new_midlen = max(0, len(new_path) - suffix_length)
-
-        mid_name = (
-            f'{old_path[prefix_length:old_midlen]} => '
-            f'{new_path[prefix_length:new_midlen]}'
-        )
-        if prefix_length + suffix_length > 0:
-            return (
-                f'{old_path[:prefix_length]}{{{mid_name}}}'
-                f'{old_path[len(old_path)-suffix_length:]}'
-            )
 
-        return mid_name
-
-    def _parse_change_stats(self, commit: Commit) -> None:
-        if commit.parents:
-            parent_diffs: Sequence[DiffIndex] = \
-                tuple(commit.diff(parent, R=True) for parent in commit.parents)
-        else:
-            parent_diffs = (commit.diff(NULL_TREE),)
-
-        for diffs in parent_diffs:
-            self._parse_change_diffs(commit, diffs)
-
-    def _parse_change_diffs(self, commit: Commit, diffs: DiffIndex) -> None:
-        files = commit.stats.files
-        for diff in diffs:
-            old_file = diff.a_path
-            new_file = diff.b_path
-            if old_file is None or new_file is None:
-                continue
-
-            change_type = Change_Type.from_label(diff.change_type)
-            if old_file != new_file:
-                stat_file = self._format_replaced_path(old_file, new_file)
-            else:
-                stat_file = old_file
-
-            if stat_file not in files:
-                logging.debug('File change %s in commit %s has no stats',
-                              stat_file, commit.hexsha)
-                continue
-
-            insertions = files[stat_file]['insertions']
-            deletions = files[stat_file]['deletions']
-
-            if diff.b_blob is None:
-                size = 0
-            else:
-                try:
-                    size = diff.b_blob.size
-                except ValueError:
-                    # Missing blob or parent commit
-                    logging.info('File change %s in commit %s has no parent',
-                                 stat_file, commit.hexsha)
-                    continue
-
-            change_data = {
-                'repo_name': str(self._repo_name),
-                'version_id': str(commit.hexsha),
-                'file': str(new_file),
-                'change_type': str(change_type.value),
-                'insertions': str(insertions),
-                'deletions': str(deletions),
-                'size': str(size)
-            }
-            self._tables['change_path'].append(change_data)
+        return branch
 
     def _parse_tags(self) -> None:
         for tag_ref in self.repo.tags:
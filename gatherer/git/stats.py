@@ -0,0 +1,172 @@
+"""
+Module for collecting difference statistics and changed paths of Git commits.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import logging
+from typing import Dict, Iterator, List, Sequence, Tuple
+from git import Blob, Commit, GitCommandError, Repo
+from .stream import Change, Diff_Stats, Log_Parser
+from ..version_control.repo import Change_Type, RepositoryDataException
+
+# Version statistics and changed path rows of a commit
+Commit_Stats = Tuple[Dict[str, str], List[Dict[str, str]]]
+
+class Stats_Collector:
+    # pylint: disable=too-few-public-methods
+    """
+    Collector of difference statistics and changed path rows for commits of
+    a Git repository.
+    """
+
+    def __init__(self, repo: Repo, repo_name: str) -> None:
+        self._repo = repo
+        self._repo_name = repo_name
+
+    def iterate(self, commits: Sequence[str]) -> Iterator[Commit_Stats]:
+        """
+        Retrieve difference statistics and changed path rows for a sequence of
+        commits, in the same order.
+
+        The statistics of the entire sequence are streamed at once. The
+        processes are stopped if the iterator is closed early.
+        """
+
+        with Log_Parser(self._repo, commits) as log:
+            for hexsha in commits:
+                diff_stats = log.get_stats(hexsha)
+                yield (
+                    self._get_diff_stats(hexsha, diff_stats),
+                    list(self._parse_change_stats(hexsha, diff_stats,
+                                                  log.get_changes(hexsha)))
+                )
+
+    def _get_diff_stats(self, hexsha: str,
+                        diff_stats: Diff_Stats) -> Dict[str, str]:
+        cstotal = diff_stats.total
+
+        return {
+            # Statistics
+            'insertions': str(cstotal['insertions']),
+            'deletions': str(cstotal['deletions']),
+            'number_of_files': str(cstotal['files']),
+            'number_of_lines': str(cstotal['lines']),
+            'size': str(Commit(self._repo, bytes.fromhex(hexsha)).size)
+        }
+
+    @staticmethod
+    def _format_replaced_path(old_path: str, new_path: str) -> str:
+        # Algorithm comparable to pprint_rename function as implemented in git
+        # to format a path with partial replacement (move). See git's diff.c.
+        # Not implemented: C-style quoted files with non-unicode characters.
+
+        # Find common prefix
+        prefix_length = 0
+        for index, pair in enumerate(zip(old_path, new_path)):
+            if pair[0] != pair[1]:
+                break
+            if pair[0] == '/':
+                prefix_length = index + 1
+
+        # Find common suffix
+        suffix_length = 0
+        prefix_adjust_for_slash = 1 if prefix_length else 0
+        old_index = len(old_path) - 1
+        new_index = len(new_path) - 1
+        while prefix_length - prefix_adjust_for_slash <= old_index and \
+                prefix_length - prefix_adjust_for_slash <= new_index and \
+                old_path[old_index] == new_path[new_index]:
+            if old_path[old_index] == '/':
+                suffix_length = len(old_path) - old_index
+
+            old_index -= 1
+            new_index -= 1
+
+        # Format replaced path
+        old_midlen = max(0, len(old_path) - suffix_length)
+        new_midlen = max(0, len(new_path) - suffix_length)
+
+        mid_name = (
+            f'{old_path[prefix_length:old_midlen]} => '
+            f'{new_path[prefix_length:new_midlen]}'
+        )
+        if prefix_length + suffix_length > 0:
+            return (
+                f'{old_path[:prefix_length]}{{{mid_name}}}'
+                f'{old_path[len(old_path)-suffix_length:]}'
+            )
+
+        return mid_name
+
+    def _parse_change_stats(self, hexsha: str, diff_stats: Diff_Stats,
+                            changes: Sequence[Change]) -> Iterator[Dict[str, str]]:
+        files = diff_stats.files
+        for change in changes:
+            old_file = change.old_path
+            new_file = change.new_path
+
+            change_type = Change_Type.from_label(change.change_type)
+            if old_file != new_file:
+                stat_file = self._format_replaced_path(old_file, new_file)
+            else:
+                stat_file = old_file
+
+            if stat_file not in files:
+                logging.debug('File change %s in commit %s has no stats',
+                              stat_file, hexsha)
+                continue
+
+            insertions = files[stat_file]['insertions']
+            deletions = files[stat_file]['deletions']
+
+            if change.blob is None:
+                size = 0
+            else:
+                try:
+                    size = Blob(self._repo, bytes.fromhex(change.blob)).size
+                except ValueError:
+                    # Missing blob or parent commit
+                    logging.info('File change %s in commit %s has no parent',
+                                 stat_file, hexsha)
+                    continue
+
+            yield {
+                'repo_name': str(self._repo_name),
+                'version_id': str(hexsha),
+                'file': str(new_file),
+                'change_type': str(change_type.value),
+                'insertions': str(insertions),
+                'deletions': str(deletions),
+                'size': str(size)
+            }
+
+def collect_chunk_stats(repo_directory: str, environment: Dict[str, str],
+                        repo_name: str,
+                        commits: Sequence[str]) -> List[Commit_Stats]:
+    """
+    Retrieve difference statistics and changed path rows for a chunk of
+    commits from the repository at `repo_directory`, in a pool process.
+    """
+
+    try:
+        repo = Repo(repo_directory)
+        repo.git.update_environment(**environment)
+        return list(Stats_Collector(repo, repo_name).iterate(commits))
+    except GitCommandError as error:
+        # Git command errors cannot always be transferred between processes
+        raise RepositoryDataException(str(error)) from error
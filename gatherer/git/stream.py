@@ -0,0 +1,309 @@
+"""
+Module that streams difference statistics of Git commits from log output.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from abc import ABCMeta, abstractmethod
+import subprocess
+import threading
+from types import TracebackType
+from typing import Any, Dict, IO, Iterator, List, NamedTuple, Optional, \
+    Sequence, Tuple, Type
+from git import Repo
+
+Change = NamedTuple('Change', [('change_type', str),
+                               ('old_path', str),
+                               ('new_path', str),
+                               ('blob', Optional[str])])
+
+class Diff_Stats:
+    # pylint: disable=too-few-public-methods
+    """
+    Line statistics of the difference between a commit and its first parent,
+    or the empty tree for a root commit. The `total` and `files` attributes
+    have the same structure as those of the `git.Stats` object of GitPython.
+    """
+
+    def __init__(self) -> None:
+        self.total: Dict[str, int] = {
+            'insertions': 0,
+            'deletions': 0,
+            'lines': 0,
+            'files': 0
+        }
+        self.files: Dict[str, Dict[str, int]] = {}
+
+    def add_line(self, line: str) -> None:
+        """
+        Parse a line of numeric difference statistics for one file.
+        """
+
+        raw_insertions, raw_deletions, filename = line.split('\t', 2)
+        insertions = int(raw_insertions) if raw_insertions != '-' else 0
+        deletions = int(raw_deletions) if raw_deletions != '-' else 0
+
+        self.total['insertions'] += insertions
+        self.total['deletions'] += deletions
+        self.total['lines'] += insertions + deletions
+        self.total['files'] += 1
+        self.files[filename.strip()] = {
+            'insertions': insertions,
+            'deletions': deletions,
+            'lines': insertions + deletions
+        }
+
+class Log_Stream(metaclass=ABCMeta):
+    """
+    Reader of a single `git log` process which shows the differences for
+    a fixed sequence of commits, in the order in which they are provided.
+
+    The error output of the process is read in a separate thread, such that
+    the process does not block when it writes many warnings.
+    """
+
+    # Byte that starts the header line of each commit in the output.
+    MARKER = b'\x00'
+    # Difference options for the log command.
+    ARGS: Sequence[str] = ()
+    # Number of bytes to read from the output at once.
+    CHUNK_SIZE = 65536
+
+    def __init__(self, repo: Repo, commits: Sequence[str]) -> None:
+        self._process = repo.git.log('--no-walk=unsorted', '--stdin', '--root',
+                                     f'--format=format:%x{self.MARKER[0]:02x}%H',
+                                     *self.ARGS, as_process=True,
+                                     istream=subprocess.PIPE)
+        revisions = ''.join(f'{commit}\n' for commit in commits)
+        self._stderr: List[bytes] = []
+        self._drain = threading.Thread(target=self._read_stderr, daemon=True)
+        self._drain.start()
+        try:
+            self._process.stdin.write(revisions.encode('utf-8'))
+            self._process.stdin.close()
+        except OSError:
+            # The process exited early, which is reported when it is closed
+            pass
+
+        self._records = self._parse(self._process.stdout)
+        self._started = False
+        self._record: Optional[Tuple[str, Any]] = None
+
+    def _read_stderr(self) -> None:
+        for line in iter(self._process.stderr.readline, b''):
+            self._stderr.append(line)
+
+    def _split(self, output: IO[bytes], separator: bytes) -> Iterator[bytes]:
+        remainder = b''
+        for chunk in iter(lambda: output.read(self.CHUNK_SIZE), b''):
+            parts = (remainder + chunk).split(separator)
+            remainder = parts.pop()
+            yield from parts
+
+        if remainder:
+            yield remainder
+
+    @abstractmethod
+    def _parse(self, output: IO[bytes]) -> Iterator[Tuple[str, Any]]:
+        """
+        Parse the output of the process into pairs of commit SHAs and records.
+        """
+
+    def get(self, hexsha: str) -> List[Any]:
+        """
+        Retrieve the parsed records from the output for the commit `hexsha`.
+
+        Commits must be requested in the order in which they were provided.
+        A commit that has no differences results in an empty list.
+        """
+
+        if not self._started:
+            self._record = next(self._records, None)
+            self._started = True
+
+        records = []
+        while self._record is not None and self._record[0] == hexsha:
+            records.append(self._record[1])
+            self._record = next(self._records, None)
+
+        return records
+
+    def close(self) -> None:
+        """
+        Read the remaining output of the process and wait for it to finish.
+
+        If the process exited with an error, then a `GitCommandError` is raised.
+        """
+
+        for _ in self._records:
+            pass
+
+        self._drain.join()
+        try:
+            self._process.wait(stderr=b''.join(self._stderr))
+        finally:
+            self._process.stdout.close()
+            self._process.stderr.close()
+
+    def terminate(self) -> None:
+        """
+        Stop the process without reading the remaining output.
+        """
+
+        process = self._process.proc
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+        self._drain.join()
+        self._process.stdout.close()
+        self._process.stderr.close()
+
+class Numstat_Stream(Log_Stream):
+    """
+    Reader of numeric difference statistics of commits against their first
+    parent, without rename detection.
+    """
+
+    ARGS = ('-m', '--first-parent', '--numstat', '--no-renames')
+
+    def _parse(self, output: IO[bytes]) -> Iterator[Tuple[str, Diff_Stats]]:
+        hexsha: Optional[str] = None
+        stats = Diff_Stats()
+        for line in self._split(output, b'\n'):
+            if line.startswith(self.MARKER):
+                if hexsha is not None:
+                    yield hexsha, stats
+
+                hexsha = line[1:].decode('utf-8')
+                stats = Diff_Stats()
+            elif line:
+                stats.add_line(line.decode('utf-8', 'replace'))
+
+        if hexsha is not None:
+            yield hexsha, stats
+
+class Raw_Stream(Log_Stream):
+    """
+    Reader of the changed paths of commits against each of their parents,
+    with rename detection.
+    """
+
+    MARKER = b'\x01'
+    ARGS = ('-m', '--raw', '-M', '--no-abbrev', '-z')
+
+    def _parse(self, output: IO[bytes]) -> Iterator[Tuple[str, Change]]:
+        tokens = self._split(output, b'\x00')
+        hexsha: Optional[str] = None
+        for token in tokens:
+            if token.startswith(self.MARKER):
+                header, _, token = token[1:].partition(b'\n')
+                hexsha = header.decode('utf-8')
+
+            if hexsha is None or not token.startswith(b':'):
+                continue
+
+            # Metadata: old mode, new mode, old blob, new blob and status
+            meta = token[1:].decode('utf-8').split()
+            change_type = meta[4][0]
+            old_path = self._next_path(tokens, hexsha)
+            if change_type in ('R', 'C'):
+                new_path = self._next_path(tokens, hexsha)
+            else:
+                new_path = old_path
+
+            blob = meta[3] if meta[3].strip('0') else None
+            yield hexsha, Change(change_type, old_path, new_path, blob)
+
+    @staticmethod
+    def _next_path(tokens: Iterator[bytes], hexsha: str) -> str:
+        path = next(tokens, None)
+        if path is None:
+            raise ValueError(f'Missing path in raw log output of {hexsha}')
+
+        return path.decode('utf-8', 'replace')
+
+class Log_Parser:
+    """
+    Parser of difference statistics and changed paths for a sequence of
+    commits, which streams them from two `git log` processes started once for
+    the entire sequence rather than one or more processes per commit.
+    """
+
+    def __init__(self, repo: Repo, commits: Sequence[str]) -> None:
+        self._numstat = Numstat_Stream(repo, commits)
+        try:
+            self._raw = Raw_Stream(repo, commits)
+        except BaseException:
+            self._numstat.terminate()
+            raise
+
+    def __enter__(self) -> 'Log_Parser':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def get_stats(self, hexsha: str) -> Diff_Stats:
+        """
+        Retrieve line statistics for the commit `hexsha` against its first
+        parent. Commits must be requested in the order they were provided.
+        """
+
+        records = self._numstat.get(hexsha)
+        if not records:
+            return Diff_Stats()
+
+        return records[0]
+
+    def get_changes(self, hexsha: str) -> List[Change]:
+        """
+        Retrieve the changed paths of the commit `hexsha` against each of its
+        parents in order. Commits must be requested in the order they were
+        provided.
+        """
+
+        return self._raw.get(hexsha)
+
+    def close(self) -> None:
+        """
+        Finish reading the outputs of the processes.
+
+        If a process exited with an error, then a `GitCommandError` is raised.
+        """
+
+        try:
+            self._numstat.close()
+        except BaseException:
+            self._raw.terminate()
+            raise
+
+        self._raw.close()
+
+    def terminate(self) -> None:
+        """
+        Stop the processes without reading their remaining outputs, for
+        example when an error occurred while handling the commits.
+        """
+
+        self._numstat.terminate()
+        self._raw.terminate()
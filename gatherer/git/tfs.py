@@ -19,13 +19,16 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 import itertools
 import json
 import logging
 from pathlib import Path
 import re
-from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, \
-    Union, cast, TYPE_CHECKING
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, \
+    Sequence, Set, Tuple, Union, cast, TYPE_CHECKING
 from git import Commit
 from requests.auth import HTTPBasicAuth, AuthBase
 from requests.exceptions import HTTPError
@@ -54,12 +57,16 @@ else:
 Project_Collection = Optional[Union[str, bool]]
 Work_Item_Fields = Dict[str, Dict[str, Union[str, List[str]]]]
 Result = Dict[str, Any]
+Value_Parser = Callable[[Any], Optional[str]]
 
 class TFS_Project:
     """
     A project using Git on a TFS or VSTS server.
     """
 
+    # Number of pages of paginated results to retrieve concurrently
+    PAGE_WORKERS = 4
+
     def __init__(self, host: str, collections: TFS_Collection,
                  username: str, password: str) -> None:
         self._host = host
@@ -69,7 +76,8 @@ class TFS_Project:
         if len(collections) > 1:
             self._project = collections[1]
 
-        self._session = Session(auth=self._make_auth(username, password))
+        shared = Session.get_shared(self._host)
+        self._session = shared.fork(auth=self._make_auth(username, password))
         self._url = f'{self._host}/{self._collection}'
 
     @classmethod
@@ -148,48 +156,71 @@ class TFS_Project:
         elif isinstance(options, str):
             options = {options: True}
 
-        params = kw.copy()
         limiter = Iterator_Limiter(size=options.get('size', 100))
-        had_value = True
-        while limiter.check(had_value):
-            had_value = False
-            params['$skip'] = str(limiter.skip)
-            params['$top'] = str(limiter.size)
-
+        pages: Deque['Future[Result]'] = deque()
+        scheduling = limiter.check(True)
+        with ThreadPoolExecutor(max_workers=self.PAGE_WORKERS) as executor:
             try:
-                result = self._get(area, path,
-                                   api_version=api_version,
-                                   project_collection=project_collection,
-                                   **params)
-            except RuntimeError:
-                if options.get('empty_on_error', False):
-                    # The TFS API sometimes returns an error for empty results.
-                    return
-
-                raise
-
-            if result['count'] > 0:
-                had_value = True
-                yield from result['value']
-
-            limiter.update()
+                while True:
+                    # Retrieve the next pages in advance, assuming that the
+                    # earlier pages all have values.
+                    while scheduling and len(pages) < self.PAGE_WORKERS:
+                        params = kw.copy()
+                        params['$skip'] = str(limiter.skip)
+                        params['$top'] = str(limiter.size)
+                        pages.append(executor.submit(self._get, area, path,
+                                                     api_version=api_version,
+                                                     project_collection=project_collection,
+                                                     **params))
+                        limiter.update()
+                        scheduling = limiter.check(True)
+
+                    if not pages:
+                        return
+
+                    try:
+                        result = pages.popleft().result()
+                    except RuntimeError:
+                        if options.get('empty_on_error', False):
+                            # The TFS API sometimes returns an error for empty
+                            # results.
+                            return
+
+                        raise
+
+                    if result['count'] == 0:
+                        return
+
+                    yield from result['value']
+            finally:
+                for page in pages:
+                    page.cancel()
 
     def _get_continuation(self, area: str, path: str, api_version: str = '3.0',
                           **kw: str) -> Iterator[Result]:
         params = kw.copy()
         params['api-version'] = api_version
 
-        is_last_batch = False
         url = '/'.join(self._get_url_candidates(area, path)[0])
-        while not is_last_batch:
-            result, error = self._perform_request(url, params)
-            if result is None:
-                raise RuntimeError(f'Could not obtain continuation result: {error}')
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Retrieve the next batch while the values of a batch are used.
+            batch: Optional['Future[Tuple[Optional[Result], Optional[Exception]]]'] = \
+                executor.submit(self._perform_request, url, params)
+            try:
+                while batch is not None:
+                    result, error = batch.result()
+                    if result is None:
+                        raise RuntimeError(f'Could not obtain continuation result: {error}')
 
-            is_last_batch = result['isLastBatch'] and result['values']
-            url = result['nextLink']
+                    batch = None
+                    if not (result['isLastBatch'] and result['values']):
+                        batch = executor.submit(self._perform_request,
+                                                result['nextLink'], params)
 
-            yield from result['values']
+                    yield from result['values']
+            finally:
+                if batch is not None:
+                    batch.cancel()
 
     def repositories(self) -> List[Result]:
         """
@@ -419,6 +450,74 @@ class TFVC_Project(TFS_Project):
         except (RuntimeError, KeyError) as error:
             raise ValueError(f"Repository '{repository}' cannot be found") from error
 
+class Work_Item_Mapping:
+    """
+    Mapping of fields of work item revisions to the fields of the work item
+    table, compiled once from the field specifications and type parsers.
+
+    Timestamps are parsed once for each distinct value, since revisions of
+    a work item repeat many of them, such as the creation date.
+    """
+
+    # Maximum number of parsed timestamps to remember
+    MAX_DATES = 4096
+
+    def __init__(self, work_item_fields: Work_Item_Fields,
+                 types: Dict[str, Field_Parser]) -> None:
+        # Targets with one source field, by the source field.
+        self._single: Dict[str, List[Tuple[str, Value_Parser]]] = {}
+        # Targets with several source fields, in order of preference.
+        self._multiple: List[Tuple[str, Value_Parser, Tuple[str, ...]]] = []
+        self._fields: Set[str] = set()
+
+        parsers: Dict[str, Value_Parser] = {}
+        for name, type_parser in types.items():
+            if isinstance(type_parser, Date_Parser):
+                parsers[name] = lru_cache(maxsize=self.MAX_DATES)(type_parser.parse)
+            else:
+                parsers[name] = type_parser.parse
+
+        for target, properties in work_item_fields.items():
+            parser = parsers[str(properties["type"])]
+            fields = tuple(properties["fields"])
+            self._fields.update(fields)
+            if len(fields) == 1:
+                self._single.setdefault(fields[0], []).append((target, parser))
+            else:
+                self._multiple.append((target, parser, fields))
+
+    @property
+    def fields(self) -> Set[str]:
+        """
+        Retrieve the fields of work item revisions that the mapping uses.
+        """
+
+        return self._fields
+
+    def parse(self, fields: Result) -> Dict[str, str]:
+        """
+        Parse the `fields` of a work item revision into fields of the work
+        item table. Each target field is parsed from the first source field of
+        its specification that is in the revision, if the value is not empty.
+        """
+
+        row: Dict[str, str] = {}
+        for field, raw_value in fields.items():
+            for target, parser in self._single.get(field, ()):
+                value = parser(raw_value)
+                if value is not None:
+                    row[target] = value
+
+        for target, parser, candidates in self._multiple:
+            for field in candidates:
+                if field in fields:
+                    value = parser(fields[field])
+                    if value is not None:
+                        row[target] = value
+                    break
+
+        return row
+
 class TFS_Repository(Git_Repository, Review_System):
     """
     Git repository hosted by a TFS server.
@@ -837,31 +936,20 @@ class TFS_Repository(Git_Repository, Review_System):
             if "field" in properties and isinstance(properties["field"], str):
                 properties["fields"] = [properties["field"]]
 
-        fields: Set[str] = {
-            prop for props in work_item_fields.values() for prop in props["fields"]
-        }
+        mapping = Work_Item_Mapping(work_item_fields, types)
 
         from_date = self._update_trackers['tfs_update']
-        work_item_revisions = self.api.work_item_revisions(fields=list(fields),
+        work_item_revisions = self.api.work_item_revisions(fields=list(mapping.fields),
                                                            from_date=from_date)
 
         for revision in work_item_revisions:
-            self._add_work_item_revision(revision, work_item_fields, types)
+            self._add_work_item_revision(revision, mapping)
 
     def _add_work_item_revision(self, revision: Result,
-                                work_item_fields: Work_Item_Fields,
-                                types: Dict[str, Field_Parser]) -> None:
+                                mapping: Work_Item_Mapping) -> None:
         row = {
             "issue_id": str(revision["id"]),
             "changelog_id": str(revision["rev"])
         }
-        for target, properties in work_item_fields.items():
-            parser = types[str(properties["type"])]
-            for field in properties["fields"]:
-                if field in revision["fields"]:
-                    value = parser.parse(revision["fields"][field])
-                    if value is not None:
-                        row[target] = value
-                    break
-
+        row.update(mapping.parse(revision["fields"]))
         self._tables["tfs_work_item"].append(row)
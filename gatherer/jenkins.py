@@ -18,233 +18,29 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from abc import ABCMeta
 from configparser import RawConfigParser
 import json
 import logging
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, \
-    Tuple, Union
-from urllib.parse import quote, urlencode
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
 from requests.adapters import BaseAdapter
 from requests.auth import HTTPBasicAuth
 from requests.exceptions import ConnectionError as ConnectError, HTTPError, \
     Timeout
 from requests.models import Response
 from .config import Configuration
+from .jenkins_base import Base, BaseUrl, Object_Cache, ObjectT, \
+    RequestException, Response_Cache
 from .request import Session
 
-BaseUrl = Optional[Union[str, Dict[str, str]]]
-
-class RequestException(RuntimeError):
-    """
-    An exception during a request to the Jenkins API.
-    """
-
-class NoneMapping(Mapping[str, None]):
-    """
-    An empty mapping that returns `None` for all key lookups.
-    """
-
-    def __getitem__(self, key: str) -> None:
-        return None
-
-    def __iter__(self) -> Iterator[str]:
-        return iter(())
-
-    def __len__(self) -> int:
-        return 0
-
-    def __contains__(self, key: object) -> bool:
-        return False
-
-    def __repr__(self) -> str:
-        return 'NoneMapping()'
-
-class Base(metaclass=ABCMeta):
-    """
-    Base Jenkins object.
-    """
-
-    DELETE_URL: Optional[str] = None
-
-    def __init__(self, instance: 'Jenkins', base_url: BaseUrl,
-                 exists: Optional[bool] = True) -> None:
-        self._instance = instance
-
-        # Allow API query parameters such as 'tree' and 'depth' to be passed
-        # as a dict. The base URL should be in the parameter 'url', which is
-        # removed from the query. Subclasses may also provide a default base
-        # URL afterward.
-        query: Dict[str, str] = {}
-        if isinstance(base_url, dict):
-            query = base_url.copy()
-            base_url = query.pop('url', None)
-
-        # Ensure the base URL ends in a slash for further suffixes
-        if isinstance(base_url, str) and not base_url.endswith('/'):
-            base_url = f'{base_url}/'
-
-        self._base_url = base_url
-        self._query = query
-        self._data: Mapping[str, Any] = {}
-        self._has_data = False
-        self._default_exists = exists
-        self._exists = exists
-
-    @property
-    def base_url(self) -> str:
-        """
-        Retrieve the base (HTML) URL of this Jenkins object.
-        """
-
-        if self._base_url is None:
-            raise ValueError('API URL unknown for this Jenkins object')
-
-        return str(self._base_url)
-
-    @property
-    def query(self) -> Dict[str, str]:
-        """
-        Retrieve the query used to retrieve data for this Jenkins object.
-
-        Returns a dictionary of query parameters which can be updated.
-        """
-
-        return self._query
-
-    @query.setter
-    def query(self, query: Dict[str, str]) -> None:
-        """
-        Replace the query used to retrieve data for this Jenkins object.
-        """
-
-        self._query = query
-
-    def _retrieve(self) -> Response:
-        url = f'{self.base_url}api/json?{urlencode(self._query)}'
-        try:
-            request = self.instance.session.get(url,
-                                                timeout=self.instance.timeout)
-            if Session.is_code(request, 'not_found'):
-                self._exists = False
-                self._data = NoneMapping()
-            else:
-                request.raise_for_status()
-                self._data = request.json()
-                self._has_data = True
-                self._exists = True
-            return request
-        except (ConnectError, HTTPError, Timeout) as error:
-            raise RequestException('Could not retrieve data') from error
-
-    @property
-    def data(self) -> Mapping[str, Any]:
-        """
-        Retrieve the raw data from the API. The API is accessed if the data has
-        not been retrieved before since the last invalidation or since the
-        construction of this object.
-        """
-
-        if self._exists is not False and not self._has_data:
-            self._retrieve()
-
-        return self._data
-
-    @property
-    def has_data(self) -> bool:
-        """
-        Retrieve a boolean indicating whether we fetched data for the object.
-        Returns `True` if and only if the current data is from the object's API
-        endpoint itself. This property returns `False` if the data is from
-        another API endpoint, e.g., a parent object, if the data has been
-        invalidated, the object did not exist at the API or if the data has not
-        been retrieved at all.
-        """
-
-        return self._has_data
-
-    @property
-    def version(self) -> str:
-        """
-        Retrieve the version number of the Jenkins instance.
-
-        If the version is not provided, then this is the empty string.
-        """
-
-        return self._instance.version
-
-    def invalidate(self) -> None:
-        """
-        Ensure that we refresh the data for this object on next lookup.
-        """
-
-        self._has_data = False
-        self._data = {}
-        self._exists = self._default_exists
-
-    @property
-    def instance(self) -> 'Jenkins':
-        """
-        Retrieve the Jenkins instance to which this object belongs.
-        """
-
-        return self._instance
-
-    @property
-    def exists(self) -> bool:
-        """
-        Retrieve whether this object exists on the Jenkins instance.
-        """
-
-        if self._exists is None:
-            self._exists = False
-            self._retrieve()
-
-        return self._exists
-
-    def delete(self) -> None:
-        """
-        Delete the object from the Jenkins instance if possible.
-
-        If the object cannot be deleted, then a `TypeError` or the appropriate
-        request status is raised.
-        """
-
-        if self.DELETE_URL is None:
-            raise TypeError("This object does not support deletion")
-
-        url = f'{self.base_url}{self.DELETE_URL}'
-        try:
-            request = self.instance.session.post(url,
-                                                 timeout=self.instance.timeout)
-            request.raise_for_status()
-        except (ConnectError, HTTPError, Timeout) as error:
-            raise RequestException('Could not delete object') from error
-
-    def __eq__(self, other: object) -> bool:
-        if isinstance(other, Base):
-            return self.base_url == other.base_url
-
-        return False
-
-    def __ne__(self, other: object) -> bool:
-        return not self.__eq__(other)
-
-    def __bool__(self) -> bool:
-        return self.exists
-
-    def __hash__(self) -> int:
-        return hash((self.instance, self.base_url))
-
-    def __repr__(self) -> str:
-        return f'{self.__class__.__name__}({self.base_url!r})'
-
 class Jenkins(Base):
     """
     Jenkins instance.
     """
 
+    TREE = ('jobs[name,url]', 'views[name,url]')
+
     def __init__(self, host: str, username: Optional[str] = None,
                  password: Optional[str] = None,
                  verify: Union[bool, str] = True) -> None:
@@ -255,16 +51,21 @@ class Jenkins(Base):
         else:
             auth = None
 
-        self._session = Session(verify=verify, auth=auth)
+        # Keep the headers and adapters of this instance apart from other
+        # clients while reusing the connections of the shared session
+        shared = Session.get_shared(host, verify=verify)
+        self._session = shared.fork(auth=auth)
         # Ensure nodes' display names are canonical
         self._session.headers.update({'Accept-Language': 'en'})
 
         self.timeout: Optional[int] = None
         self._has_crumb = False
         self._version: Optional[str] = None
+        self._responses = Response_Cache()
+        self._objects = Object_Cache()
 
-    def _retrieve(self) -> Response:
-        response = super()._retrieve()
+    def _retrieve(self, full: bool = False) -> Response:
+        response = super()._retrieve(full=full)
         self._version = response.headers.get('X-Jenkins', '')
         return response
 
@@ -340,6 +141,24 @@ class Jenkins(Base):
 
         return self._version
 
+    @property
+    def responses(self) -> Response_Cache:
+        """
+        Retrieve the cache of API responses of the Jenkins instance.
+        """
+
+        return self._responses
+
+    def get_object(self, obj: ObjectT) -> ObjectT:
+        """
+        Retrieve a Jenkins object of the same type and with the same API URL
+        as the newly created `obj`, if such an object was retrieved before and
+        its data can no longer change, such as a finished build, so that its
+        data is reused. Otherwise, `obj` is registered and returned.
+        """
+
+        return self._objects.get(obj)
+
     @property
     def session(self) -> Session:
         """
@@ -386,10 +205,11 @@ class Jenkins(Base):
         if '/' in name:
             # Support workflow 'full project' job names
             workflow_name, pipeline_name = name.split('/', 1)
-            workflow_job = Job(self, name=workflow_name, exists=None)
+            workflow_job = self.get_object(Job(self, name=workflow_name,
+                                               exists=None))
             return workflow_job.get_job(pipeline_name, url=url)
 
-        return Job(self, name=name, url=url, exists=None)
+        return self.get_object(Job(self, name=name, url=url, exists=None))
 
     def get_view(self, name: str) -> 'View':
         """
@@ -412,6 +232,8 @@ class Nodes(Base, Sequence['Node']):
     Collection of nodes linked to the Jenkins instance.
     """
 
+    TREE = ('computer[displayName]',)
+
     def __init__(self, instance: Jenkins) -> None:
         url = f'{instance.base_url}computer/'
         super().__init__(instance, url, exists=True)
@@ -490,6 +312,7 @@ class View(Base):
     """
 
     DELETE_URL = 'doDelete'
+    TREE = ('jobs[name,url]',)
 
     def __init__(self, instance: Jenkins, name: str = '', url: BaseUrl = None,
                  exists: Optional[bool] = True, **kwargs: Any) -> None:
@@ -534,6 +357,17 @@ class Job(Base):
     """
 
     DELETE_URL = 'doDelete'
+    LAST_BUILDS = (
+        'lastBuild', 'lastCompletedBuild', 'lastFailedBuild',
+        'lastStableBuild', 'lastSuccessfulBuild', 'lastUnstableBuild',
+        'lastUnsuccessfulBuild'
+    )
+    PARAMETERS = 'parameterDefinitions[name,defaultParameterValue[value]]'
+    TREE = (
+        'builds[number,url]', 'jobs[name,url]', 'nextBuildNumber',
+        *(f'{name}[number,url]' for name in LAST_BUILDS),
+        f'actions[{PARAMETERS}]', f'property[{PARAMETERS}]'
+    )
 
     def __init__(self, instance: Union[Jenkins, 'Job'], name: str = '',
                  url: BaseUrl = None, exists: Optional[bool] = True,
@@ -607,18 +441,21 @@ class Job(Base):
         the HTML page of the job, or a dictionary of query parameters.
         """
 
-        return Job(self, name=name, url=url, exists=None)
+        return self.instance.get_object(Job(self, name=name, url=url,
+                                            exists=None))
 
     def _make_last_build(self, name: str) -> 'Build':
         if name not in self._last_builds:
             if self.has_data and name in self.data:
                 if self.data[name] is None:
-                    self._last_builds[name] = Build(self, exists=False)
+                    build = Build(self, exists=False)
                 else:
-                    self._last_builds[name] = Build(self, **self.data[name])
+                    build = Build(self, **self.data[name])
             else:
                 url = f'{self.base_url}{name}/'
-                self._last_builds[name] = Build(self, url=url, exists=None)
+                build = Build(self, url=url, exists=None)
+
+            self._last_builds[name] = self.instance.get_object(build)
 
         return self._last_builds[name]
 
@@ -700,7 +537,8 @@ class Job(Base):
             else:
                 exists = False
 
-        return Build(self, number=number, exists=exists)
+        return self.instance.get_object(Build(self, number=number,
+                                              exists=exists))
 
     def get_last_branch_build(self, branch: str) -> \
             Tuple[Optional['Build'], Optional[Dict[str, Any]]]:
@@ -720,10 +558,13 @@ class Job(Base):
         # branch, so we check the builds by branch name on this build.
         # The job may have no builds in which case we cannot check stability.
         build = self.last_build
+        # The actions of the build are not selected by its tree, so retrieve
+        # all the data at once.
+        actions: List[Dict[str, Any]] = build.full_data.get('actions') or []
         if not build.exists:
             raise ValueError('Jenkins job or its builds could not be found')
 
-        for action in build.data['actions']:
+        for action in actions:
             if 'buildsByBranchName' in action:
                 build_data: Dict[str, Dict[str, Any]] = action['buildsByBranchName']
                 # Check if there has been a build for the branch.
@@ -809,6 +650,9 @@ class Build(Base):
     """
 
     DELETE_URL = 'doDelete'
+    # Actions are not selected since they contain data with variable keys,
+    # which are retrieved with all the other data through `full_data`.
+    TREE = ('number', 'result', 'building')
 
     def __init__(self, job: Job, number: Optional[int] = None,
                  url: BaseUrl = None, exists: Optional[bool] = True,
@@ -860,6 +704,13 @@ class Build(Base):
 
         return self.data['building']
 
+    @property
+    def final(self) -> bool:
+        # Builds by number which are no longer building do not change, unlike
+        # builds retrieved through a permalink such as the last build.
+        return self._number is not None and self.has_data and \
+            self.data.get('building') is False
+
     def _related(self, other: 'Build') -> bool:
         return self.exists and other.exists and self.job == other.job
 
@@ -0,0 +1,467 @@
+"""
+Module for the base of Jenkins API objects and caches of their data.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from abc import ABCMeta
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, \
+    Sequence, Set, Tuple, Type, TypeVar, Union, TYPE_CHECKING
+from urllib.parse import urlencode
+from requests.exceptions import ConnectionError as ConnectError, HTTPError, \
+    Timeout
+from requests.models import Response
+from .request import Session
+if TYPE_CHECKING:
+    # pylint: disable=cyclic-import
+    from .jenkins import Jenkins
+else:
+    Jenkins = object
+
+BaseUrl = Optional[Union[str, Dict[str, str]]]
+ObjectT = TypeVar('ObjectT', bound='Base')
+
+class RequestException(RuntimeError):
+    """
+    An exception during a request to the Jenkins API.
+    """
+
+class NoneMapping(Mapping[str, None]):
+    """
+    An empty mapping that returns `None` for all key lookups.
+    """
+
+    def __getitem__(self, key: str) -> None:
+        return None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+    def __contains__(self, key: object) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return 'NoneMapping()'
+
+class Projection(Mapping[str, Any]):
+    """
+    Mapping of data retrieved from the Jenkins API with a `tree` query
+    parameter that selects the top-level `keys`. If another key is looked up,
+    then all the data is retrieved through the `fallback` instead.
+    """
+
+    def __init__(self, data: Mapping[str, Any], keys: Set[str],
+                 fallback: Callable[[], Mapping[str, Any]]) -> None:
+        self._data = data
+        self._keys: Optional[Set[str]] = keys
+        self._fallback = fallback
+
+    def __getitem__(self, key: str) -> Any:
+        if self._keys is not None and key not in self._keys and \
+            key not in self._data:
+            self._data = self._fallback()
+            self._keys = None
+
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f'Projection({self._data!r})'
+
+    @property
+    def complete(self) -> bool:
+        """
+        Retrieve whether all the data has been retrieved.
+        """
+
+        return self._keys is None
+
+class Response_Cache:
+    """
+    Cache of JSON data from responses of the Jenkins API by their URL, with
+    the validators of the responses for conditional requests which refresh
+    the data only if it was modified.
+    """
+
+    # Maximum number of responses to remember
+    MAX_SIZE = 1000
+
+    def __init__(self) -> None:
+        self._responses: Dict[str, Tuple[Dict[str, str], Any]] = {}
+
+    def get_headers(self, url: str) -> Dict[str, str]:
+        """
+        Retrieve headers for a conditional request for the `url`, based on
+        validators of an earlier response. If there was no earlier response
+        with validators, then the headers are empty.
+        """
+
+        if url not in self._responses:
+            return {}
+
+        return self._responses[url][0].copy()
+
+    def update(self, url: str, response: Response) -> Any:
+        """
+        Retrieve the JSON data of a successful `response` for the `url`.
+
+        If the response indicates that the data was not modified since an
+        earlier response, then the cached data is provided. Otherwise, the data
+        is cached if the response has validators.
+        """
+
+        if Session.is_code(response, 'not_modified') and \
+            url in self._responses:
+            return self._responses[url][1]
+
+        data = response.json()
+        validators = {}
+        if 'ETag' in response.headers:
+            validators['If-None-Match'] = response.headers['ETag']
+        if 'Last-Modified' in response.headers:
+            validators['If-Modified-Since'] = response.headers['Last-Modified']
+
+        if validators:
+            self._responses.pop(url, None)
+            if len(self._responses) >= self.MAX_SIZE:
+                # Forget the oldest response
+                del self._responses[next(iter(self._responses))]
+
+            self._responses[url] = (validators, data)
+        else:
+            self._responses.pop(url, None)
+
+        return data
+
+    def remove(self, url: str) -> None:
+        """
+        Remove the cached data for the `url`.
+        """
+
+        self._responses.pop(url, None)
+
+    def clear(self) -> None:
+        """
+        Remove all cached data.
+        """
+
+        self._responses.clear()
+
+class Base(metaclass=ABCMeta):
+    """
+    Base Jenkins object.
+    """
+
+    DELETE_URL: Optional[str] = None
+    # Elements of a `tree` query parameter that select the data which the
+    # properties of the object read. If this is empty, then all data is used.
+    TREE: Sequence[str] = ()
+
+    def __init__(self, instance: 'Jenkins', base_url: BaseUrl,
+                 exists: Optional[bool] = True) -> None:
+        self._instance = instance
+
+        # Allow API query parameters such as 'tree' and 'depth' to be passed
+        # as a dict. The base URL should be in the parameter 'url', which is
+        # removed from the query. Subclasses may also provide a default base
+        # URL afterward.
+        query: Dict[str, str] = {}
+        if isinstance(base_url, dict):
+            query = base_url.copy()
+            base_url = query.pop('url', None)
+
+        # Ensure the base URL ends in a slash for further suffixes
+        if isinstance(base_url, str) and not base_url.endswith('/'):
+            base_url = f'{base_url}/'
+
+        self._base_url = base_url
+        self._query = query
+        self._data: Mapping[str, Any] = {}
+        self._has_data = False
+        self._default_exists = exists
+        self._exists = exists
+
+    @property
+    def base_url(self) -> str:
+        """
+        Retrieve the base (HTML) URL of this Jenkins object.
+        """
+
+        if self._base_url is None:
+            raise ValueError('API URL unknown for this Jenkins object')
+
+        return str(self._base_url)
+
+    @property
+    def query(self) -> Dict[str, str]:
+        """
+        Retrieve the query used to retrieve data for this Jenkins object.
+
+        Returns a dictionary of query parameters which can be updated.
+        """
+
+        return self._query
+
+    @query.setter
+    def query(self, query: Dict[str, str]) -> None:
+        """
+        Replace the query used to retrieve data for this Jenkins object.
+        """
+
+        self._query = query
+
+    @property
+    def tree(self) -> Optional[str]:
+        """
+        Retrieve the `tree` query parameter that selects the data which the
+        properties of this Jenkins object read. If the object reads all data
+        or the query already has a `tree` or `depth` parameter, then this is
+        `None`.
+        """
+
+        if not self.TREE or 'tree' in self._query or 'depth' in self._query:
+            return None
+
+        return ','.join(self.TREE)
+
+    @property
+    def api_url(self) -> str:
+        """
+        Retrieve the URL of the JSON API of this Jenkins object, including
+        the query parameters.
+        """
+
+        return self._get_api_url(self.tree)
+
+    def _get_api_url(self, tree: Optional[str]) -> str:
+        query = self._query
+        if tree is not None:
+            query = query.copy()
+            query['tree'] = tree
+
+        return f'{self.base_url}api/json?{urlencode(query)}'
+
+    def _retrieve_full(self) -> Mapping[str, Any]:
+        self._retrieve(full=True)
+        return self._data
+
+    def _retrieve(self, full: bool = False) -> Response:
+        tree = None if full else self.tree
+        url = self._get_api_url(tree)
+        responses = self.instance.responses
+        try:
+            request = self.instance.session.get(url,
+                                                headers=responses.get_headers(url),
+                                                timeout=self.instance.timeout)
+            if Session.is_code(request, 'not_found'):
+                responses.remove(url)
+                self._exists = False
+                self._data = NoneMapping()
+            else:
+                request.raise_for_status()
+                self._data = responses.update(url, request)
+                if tree is not None:
+                    keys = {key.split('[', 1)[0] for key in self.TREE}
+                    self._data = Projection(self._data, keys,
+                                            self._retrieve_full)
+                self._has_data = True
+                self._exists = True
+            return request
+        except (ConnectError, HTTPError, Timeout) as error:
+            raise RequestException('Could not retrieve data') from error
+
+    @property
+    def data(self) -> Mapping[str, Any]:
+        """
+        Retrieve the raw data from the API. The API is accessed if the data has
+        not been retrieved before since the last invalidation or since the
+        construction of this object.
+        """
+
+        if self._exists is not False and not self._has_data:
+            self._retrieve()
+
+        return self._data
+
+    @property
+    def full_data(self) -> Mapping[str, Any]:
+        """
+        Retrieve all the raw data from the API, instead of only the data that
+        the properties of the object read. The API is accessed if all the data
+        has not been retrieved before since the last invalidation or since the
+        construction of this object.
+        """
+
+        if self._exists is not False and \
+            (not self._has_data or
+             (isinstance(self._data, Projection) and not self._data.complete)):
+            self._retrieve(full=True)
+
+        return self._data
+
+    @property
+    def has_data(self) -> bool:
+        """
+        Retrieve a boolean indicating whether we fetched data for the object.
+        Returns `True` if and only if the current data is from the object's API
+        endpoint itself. This property returns `False` if the data is from
+        another API endpoint, e.g., a parent object, if the data has been
+        invalidated, the object did not exist at the API or if the data has not
+        been retrieved at all.
+        """
+
+        return self._has_data
+
+    @property
+    def final(self) -> bool:
+        """
+        Retrieve whether the data of this object can no longer change on the
+        Jenkins instance, according to the data that was retrieved for it.
+        """
+
+        return False
+
+    @property
+    def version(self) -> str:
+        """
+        Retrieve the version number of the Jenkins instance.
+
+        If the version is not provided, then this is the empty string.
+        """
+
+        return self._instance.version
+
+    def invalidate(self) -> None:
+        """
+        Ensure that we refresh the data for this object on next lookup.
+        """
+
+        self._has_data = False
+        self._data = {}
+        self._exists = self._default_exists
+
+    @property
+    def instance(self) -> 'Jenkins':
+        """
+        Retrieve the Jenkins instance to which this object belongs.
+        """
+
+        return self._instance
+
+    @property
+    def exists(self) -> bool:
+        """
+        Retrieve whether this object exists on the Jenkins instance.
+        """
+
+        if self._exists is None:
+            self._exists = False
+            self._retrieve()
+
+        return self._exists
+
+    @property
+    def known_exists(self) -> Optional[bool]:
+        """
+        Retrieve whether this object is known to exist on the Jenkins instance
+        without accessing the API. If this is not known, then this is `None`.
+        """
+
+        return self._exists
+
+    def delete(self) -> None:
+        """
+        Delete the object from the Jenkins instance if possible.
+
+        If the object cannot be deleted, then a `TypeError` or the appropriate
+        request status is raised.
+        """
+
+        if self.DELETE_URL is None:
+            raise TypeError("This object does not support deletion")
+
+        url = f'{self.base_url}{self.DELETE_URL}'
+        try:
+            request = self.instance.session.post(url,
+                                                 timeout=self.instance.timeout)
+            request.raise_for_status()
+        except (ConnectError, HTTPError, Timeout) as error:
+            raise RequestException('Could not delete object') from error
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Base):
+            return self.base_url == other.base_url
+
+        return False
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    def __bool__(self) -> bool:
+        return self.exists
+
+    def __hash__(self) -> int:
+        return hash((self.instance, self.base_url))
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.base_url!r})'
+
+class Object_Cache:
+    # pylint: disable=too-few-public-methods
+    """
+    Memory of Jenkins objects by their type and API URL, which provides
+    earlier objects whose data can no longer change for reuse.
+    """
+
+    # Maximum number of objects to remember for reuse
+    MAX_SIZE = 1000
+
+    def __init__(self) -> None:
+        self._objects: Dict[Tuple[Type[Base], str], Base] = {}
+
+    def get(self, obj: ObjectT) -> ObjectT:
+        """
+        Retrieve an object of the same type and with the same API URL as the
+        newly created `obj`, if such an object was registered before and its
+        data can no longer change. Otherwise, `obj` is registered and returned.
+
+        The earlier object is not used if `obj` is known to exist or not while
+        the earlier object has a different state of existence.
+        """
+
+        key = (type(obj), obj.api_url)
+        existing = self._objects.get(key)
+        if isinstance(existing, type(obj)) and existing.final and \
+            (obj.known_exists is None or
+             existing.known_exists == obj.known_exists):
+            return existing
+
+        self._objects.pop(key, None)
+        if len(self._objects) >= self.MAX_SIZE:
+            # Forget the oldest object
+            del self._objects[next(iter(self._objects))]
+
+        self._objects[key] = obj
+        return obj
@@ -19,6 +19,7 @@ limitations under the License.
 """
 
 from .collector import Collector as Jira, Data, FieldValue, Field, Prefetcher
+from .reference import Reference_Cache
 from .update import Updated_Time, Update_Tracker
 
 __all__ = [
@@ -26,6 +27,8 @@ __all__ = [
     "Jira",
     # Types that were already available in the package without explicit export
     "Data", "FieldValue", "Field", "Prefetcher",
+    # Reference data cache
+    "Reference_Cache",
     # Update tracker
     "Updated_Time", "Update_Tracker"
 ]
@@ -19,7 +19,7 @@ limitations under the License.
 """
 
 from abc import ABCMeta, abstractmethod
-from typing import Dict, Optional, Tuple, Union, TYPE_CHECKING
+from typing import Any, Dict, Optional, Tuple, Union, TYPE_CHECKING
 from jira import Issue
 if TYPE_CHECKING:
     # pylint: disable=cyclic-import
@@ -38,6 +38,46 @@ class TableKeyError(Exception):
     Error when requesting a table key.
     """
 
+class Raw_Resource:
+    """
+    Attribute view of raw JSON data from the JIRA API, which is used instead of
+    the resource objects of the JIRA library.
+
+    Values of the JSON object that are not nested objects or lists are set as
+    attributes directly. Nested objects become views once they are accessed,
+    rather than being converted to resources when the response is read.
+    """
+
+    def __init__(self, raw: Dict[str, Any]) -> None:
+        self.raw = raw
+        self.__dict__.update(
+            (key, value) for key, value in raw.items()
+            if not isinstance(value, (dict, list))
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        raw: Dict[str, Any] = self.__dict__.get('raw', {})
+        if name not in raw:
+            raise AttributeError(f"Resource has no attribute '{name}'")
+
+        value = self.convert(raw[name])
+        setattr(self, name, value)
+        return value
+
+    @classmethod
+    def convert(cls, value: Any) -> Any:
+        """
+        Convert a value from raw JSON data to a view if it is a JSON object,
+        or to a list of converted values if it is a list.
+        """
+
+        if isinstance(value, dict):
+            return cls(value)
+        if isinstance(value, list):
+            return [cls.convert(item) for item in value]
+
+        return value
+
 class Table_Source(metaclass=ABCMeta):
     """
     Abstract mixin class that indicates that subclasses might provide
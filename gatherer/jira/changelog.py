@@ -19,8 +19,8 @@ limitations under the License.
 """
 
 import logging
-from typing import Dict, List, Mapping, MutableMapping, Optional, Type, \
-    Union, TYPE_CHECKING
+from typing import cast, Callable, Dict, Iterator, List, Mapping, \
+    MutableMapping, Optional, Tuple, Type, Union, TYPE_CHECKING
 from jira.resources import Issue, UnknownResource, User
 from jira.resilientsession import ResilientSession
 from .base import Base_Jira_Field, Base_Changelog_Field
@@ -32,6 +32,9 @@ else:
     Collector = object
     Field = object
 
+Primary_Parser = Callable[['ChangeHistory', Dict[str, Optional[str]], Issue,
+                           Optional['ChangeItem']], Optional[str]]
+
 class ChangeItem(UnknownResource):
     """
     Type for a difference field in a changelog history entry.
@@ -86,6 +89,7 @@ class Changelog:
 
         self._primary_fields: Dict[str, Base_Changelog_Field] = {}
         self._item_fields: Dict[str, Base_Changelog_Field] = {}
+        self._primary_plan: Optional[List[Tuple[str, Primary_Parser]]] = None
 
     def _create_field(self, changelog_class: Type[Base_Changelog_Field],
                       name: str, data: Field,
@@ -109,6 +113,7 @@ class Changelog:
             primary_field = self._create_field(Changelog_Primary_Field, name,
                                                data, field=field)
             self._primary_fields[changelog_name] = primary_field
+            self._primary_plan = None
             return primary_field
 
         if "changelog_name" in data:
@@ -147,14 +152,19 @@ class Changelog:
         but it requires more postprocessing to be used in the output data.
         """
 
+        if self._primary_plan is None:
+            self._primary_plan = [
+                (field.name, field.parse_changelog)
+                for field in self._primary_fields.values()
+            ]
+
         changelog: List[ChangeHistory] = issue.changelog.histories
         issue_diffs: Dict[str, Dict[str, Optional[str]]] = {}
         for changes in changelog:
             diffs: Dict[str, Optional[str]] = {}
 
-            for field in self._primary_fields.values():
-                value = field.parse_changelog(changes, diffs, issue, None)
-                diffs[field.name] = value
+            for name, parse_changelog in self._primary_plan:
+                diffs[name] = parse_changelog(changes, diffs, issue, None)
 
             # Updated date is required for changelog sorting, as well as
             # issuelinks special field parser
@@ -183,7 +193,7 @@ class Changelog:
                                   diffs: MutableMapping[str, Optional[str]]) -> Dict[str, str]:
         """
         Returns a copy of `source_data`, updated with the new key-value pairs
-        in `diffs`.
+        in `diffs`, without the fields that have no value.
         """
 
         # Shallow copy
@@ -196,7 +206,12 @@ class Changelog:
             result["attachment"] = str(max(0, total))
 
         result.update(diffs)
-        return cls._cleanup_data(result)
+
+        # Remove empty fields from the copy itself, keeping the field order
+        for key in [key for key, value in result.items() if value is None]:
+            del result[key]
+
+        return cast(Dict[str, str], result)
 
     @classmethod
     def _cleanup_data(cls, data: Dict[str, Optional[str]]) -> Dict[str, str]:
@@ -260,12 +275,23 @@ class Changelog:
         the current version of the issue.
         """
 
+        return list(self.iter_versions(issue, data))
+
+    def iter_versions(self, issue: Issue,
+                      data: Dict[str, str]) -> Iterator[Dict[str, str]]:
+        """
+        Generate the versions of the issue based on changelog data as well as
+        the current version of the issue, from the latest version to the first.
+
+        Each version is created from the previous version only when it is
+        requested, and the generated versions are not altered afterward.
+        """
+
         issue_diffs = self.fetch_changelog(issue)
 
         changelog_count = len(issue_diffs)
         prev_diffs: Dict[str, Optional[str]] = {}
         prev_data: Dict[str, Optional[str]] = dict(data)
-        versions: List[Dict[str, str]] = []
 
         # reestablish issue data from differences
         sorted_diffs = sorted(issue_diffs.keys(), reverse=True)
@@ -279,7 +305,7 @@ class Changelog:
                 prev_data["changelog_id"] = str(changelog_count)
                 self._alter_change_metadata(prev_data, diffs)
                 data = self._cleanup_data(prev_data)
-                versions.append(data)
+                yield data
                 prev_diffs = diffs
                 changelog_count -= 1
             else:
@@ -288,19 +314,16 @@ class Changelog:
                 old_data = self._create_change_transition(prev_data,
                                                           prev_diffs)
                 old_data["changelog_id"] = str(changelog_count)
-                versions.append(old_data)
-                prev_data = {}
-                prev_data.update(old_data)
+                yield old_data
+                # The next transition makes a copy of the generated version
+                prev_data = cast(Dict[str, Optional[str]], old_data)
                 prev_diffs = diffs
                 changelog_count -= 1
 
         if self._updated_since.is_newer(data["created"]):
+            prev_data = dict(prev_data)
             prev_data["created"] = data["created"]
-            first_data = self._create_first_version(issue, prev_data,
-                                                    prev_diffs)
-            versions.append(first_data)
-
-        return versions
+            yield self._create_first_version(issue, prev_data, prev_diffs)
 
     @property
     def search_field(self) -> str:
@@ -34,6 +34,7 @@ from .parser import Field_Parser, Int_Parser, String_Parser, Boolean_Parser, \
     Issue_Key_Parser, Flag_Parser, Ready_Status_Parser, Labels_Parser, \
     Project_Parser, Status_Category_Parser
 from .query import Query
+from .reference import Reference_Cache
 from .special_field import Special_Field
 from .update import Updated_Time, Update_Tracker
 from ..table import Table, Key_Table, Link_Table
@@ -48,6 +49,7 @@ Field = Dict[str, FieldValue]
 FieldSpec = Dict[str, Field]
 Option = TypeVar('Option')
 Prefetcher = Callable[[Query], None]
+Extractor = Tuple[str, Callable[[Issue], Optional[str]]]
 
 @overload
 def _check_option(data: TableOptions, field: str, check_type: Type[Option]) \
@@ -381,27 +383,40 @@ class Collector:
         Search for issues in batches and extract field data from them.
         """
 
+        plan = self._get_extraction_plan()
         had_issues = True
-        issues = query.perform_batched_query(had_issues)
-        while issues:
-            had_issues = False
-            for issue in issues:
-                had_issues = True
-                data = self.collect_fields(issue)
-                versions = self._changelog.get_versions(issue, data)
-                self._tables["issue"].extend(versions)
-
-            query.update()
+        try:
             issues = query.perform_batched_query(had_issues)
+            while issues:
+                had_issues = False
+                for issue in issues:
+                    had_issues = True
+                    data = self._extract_fields(issue, plan)
+                    versions = self._changelog.iter_versions(issue, data)
+                    self._tables["issue"].extend(versions)
+
+                query.update()
+                issues = query.perform_batched_query(had_issues)
+        finally:
+            query.close()
 
     def collect_fields(self, issue: Issue) -> Data:
         """
         Extract simple field data from one issue.
         """
 
+        return self._extract_fields(issue, self._get_extraction_plan())
+
+    def _get_extraction_plan(self) -> List[Extractor]:
+        return [
+            (name, field.parse) for name, field in self._issue_fields.items()
+        ]
+
+    @staticmethod
+    def _extract_fields(issue: Issue, plan: List[Extractor]) -> Data:
         data: Data = {}
-        for name, field in self._issue_fields.items():
-            result = field.parse(issue)
+        for name, parse in plan:
+            result = parse(issue)
             if result is not None:
                 data[name] = result
 
@@ -415,13 +430,21 @@ class Collector:
         for table in self._tables.values():
             table.write(self._project.export_key)
 
-    def process(self, jira_source: Jira, query: Optional[str] = None) -> str:
+    def process(self, jira_source: Jira, query: Optional[str] = None,
+                prefetch: int = 0,
+                reference_cache: Optional[Reference_Cache] = None) -> str:
         """
         Perform all steps to export the issues, fields and additional data
         gathered from a JIRA search. Return the update time of the query.
+
+        If `prefetch` is positive, then at most this number of pages of issues
+        are retrieved in the background while issues are parsed. If
+        `reference_cache` is provided, then prefetchers use it to retrieve
+        reference data of the JIRA server, such as sprints and versions.
         """
 
-        query_api = Query(self, jira_source, query)
+        query_api = Query(self, jira_source, query, prefetch=prefetch,
+                          reference_cache=reference_cache)
         for prefetcher in self._prefetchers:
             prefetcher(query_api)
 
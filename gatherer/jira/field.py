@@ -26,9 +26,11 @@ from .base import Base_Jira_Field, Base_Issue_Field, Base_Changelog_Field, \
 from .parser import Field_Parser
 if TYPE_CHECKING:
     # pylint: disable=cyclic-import
+    from . import Jira
     from .collector import FieldValue
     from .changelog import ChangeHistory, ChangeItem
 else:
+    Jira = object
     FieldValue = object
     ChangeHistory = object
     ChangeItem = object
@@ -43,21 +45,33 @@ class Jira_Field(Base_Jira_Field, metaclass=ABCMeta):
     cast parsers and tables.
     """
 
+    def __init__(self, jira: Jira, name: str, **data: FieldValue) -> None:
+        super().__init__(jira, name, **data)
+        self._types: Optional[List[Field_Parser]] = None
+
     def get_types(self) -> List[Field_Parser]:
         """
         Retrieve the type parsers that this field uses in sequence to perform
         its type casting actions.
+
+        The type parsers are looked up once and then reused.
         """
 
+        if self._types is not None:
+            return self._types
+
+        self._types = []
         if "type" in self.data:
             if not isinstance(self.data["type"], str):
                 types = tuple(self.data["type"])
             else:
                 types = (self.data["type"],)
 
-            return [self.jira.get_type_cast(datatype) for datatype in types]
+            self._types = [
+                self.jira.get_type_cast(datatype) for datatype in types
+            ]
 
-        return []
+        return self._types
 
     @property
     def table_name(self) -> Optional[str]:
@@ -112,8 +126,12 @@ class Primary_Field(Issue_Field):
     such as the ID or key of the issue.
     """
 
+    def __init__(self, jira: Jira, name: str, **data: FieldValue) -> None:
+        super().__init__(jira, name, **data)
+        self._primary = str(self.data["primary"])
+
     def fetch(self, issue: Issue) -> Optional[str]:
-        return getattr(issue, str(self.data["primary"]))
+        return getattr(issue, self._primary)
 
     @property
     def search_field(self) -> Optional[str]:
@@ -129,8 +147,12 @@ class Payload_Field(Issue_Field):
     as well as metadata fields for the issue.
     """
 
+    def __init__(self, jira: Jira, name: str, **data: FieldValue) -> None:
+        super().__init__(jira, name, **data)
+        self._field = str(self.data["field"])
+
     def fetch(self, issue: Issue) -> Optional[str]:
-        return getattr(issue.fields, str(self.data["field"]), None)
+        return getattr(issue.fields, self._field, None)
 
     @property
     def search_field(self) -> Optional[str]:
@@ -146,9 +168,13 @@ class Property_Field(Payload_Field):
     identifying value for that field in the issue.
     """
 
+    def __init__(self, jira: Jira, name: str, **data: FieldValue) -> None:
+        super().__init__(jira, name, **data)
+        self._property = str(self.data["property"])
+
     def fetch(self, issue: Issue) -> Optional[str]:
         field = super().fetch(issue)
-        return getattr(field, str(self.data["property"]), None)
+        return getattr(field, self._property, None)
 
     def parse(self, issue: Issue) -> Optional[str]:
         field = super().parse(issue)
@@ -224,9 +250,13 @@ class Changelog_Primary_Field(Changelog_Field):
     A field in the change entry in the changelog of the JIRA response.
     """
 
+    def __init__(self, jira: Jira, name: str, **data: FieldValue) -> None:
+        super().__init__(jira, name, **data)
+        self._primary = str(self.data["changelog_primary"])
+
     def fetch(self, entry: ChangeHistory, item: Optional[ChangeItem]) \
             -> Optional[str]:
-        return getattr(entry, str(self.data["changelog_primary"]), None)
+        return getattr(entry, self._primary, None)
 
     def parse_changelog(self, entry: ChangeHistory,
                         diffs: Dict[str, Optional[str]],
@@ -2,10 +2,11 @@
 Type specific parsers that convert field values to correct format.
 """
 
+from functools import partial
 import logging
 import re
 from typing import Any, Dict, List, Mapping, Optional, TYPE_CHECKING
-from jira.resources import User
+from jira.resources import User, dict2resource
 from .base import Table_Source, TableKey
 from .query import Query
 from ..utils import parse_date, parse_unicode
@@ -165,8 +166,19 @@ class Sprint_Parser(Field_Parser):
                 logging.info('Skipping non-Scrum board #%d', board.id)
                 continue
 
-            for sprint in query.api.sprints(board.id, maxResults=False):
-                self._parse_sprint_data(sprint.raw)
+            # Sprints are cached per board, since boards may be shared by the
+            # projects on the server.
+            sprints = query.reference_cache.retrieve('sprints', str(board.id),
+                                                     partial(self._fetch, query,
+                                                             board.id))
+            for sprint in sprints:
+                self._parse_sprint_data(sprint)
+
+    @staticmethod
+    def _fetch(query: Query, board_id: int) -> List[Dict[str, Any]]:
+        return [
+            sprint.raw for sprint in query.api.sprints(board_id, maxResults=False)
+        ]
 
     @classmethod
     def _split_sprint(cls, sprint: str) -> Dict[str, str]:
@@ -413,8 +425,14 @@ class Version_Parser(Field_Parser):
         in JIRA using the query API, and store the data in a table.
         """
 
+        versions = query.reference_cache.retrieve('versions',
+                                                  self.jira.project_key,
+                                                  lambda: self._fetch(query))
+        self.parse([dict2resource(version) for version in versions])
+
+    def _fetch(self, query: Query) -> List[Dict[str, Any]]:
         versions = query.api.project_versions(self.jira.project_key)
-        self.parse(versions)
+        return [version.raw for version in versions]
 
     def parse(self, value: Any) -> Optional[str]:
         if value is None:
@@ -578,8 +596,19 @@ class Project_Parser(Field_Parser):
         mapping.
         """
 
-        for project in query.api.projects():
-            self.parse(project)
+        projects = query.reference_cache.retrieve('projects', '',
+                                                  lambda: self._fetch(query))
+        for project in projects:
+            self.parse(dict2resource(project))
+
+    @staticmethod
+    def _fetch(query: Query) -> List[Dict[str, Any]]:
+        # Only keep the identifiers of the projects
+        return [
+            {'id': project.id, 'key': project.key}
+            for project in query.api.projects()
+            if hasattr(project, 'id') and hasattr(project, 'key')
+        ]
 
     def parse(self, value: Any) -> Optional[str]:
         if value is None:
@@ -18,10 +18,14 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 import logging
-from typing import Iterable, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Sequence, Tuple, cast, \
+    TYPE_CHECKING
 from jira import Issue, JIRA
+from .base import Raw_Resource
+from .reference import Reference_Cache
 from ..domain.source import Jira
 from ..utils import format_date, Iterator_Limiter
 if TYPE_CHECKING:
@@ -30,9 +34,113 @@ if TYPE_CHECKING:
 else:
     Collector = object
 
+Page = Tuple[int, int]
+
+class Issue_Search:
+    """
+    Search for pages of issue results of a JQL query using the JIRA API.
+
+    If `prefetch` is positive, then pages can be scheduled to be retrieved in
+    at most this number of background threads.
+    """
+
+    def __init__(self, api: JIRA, query: str, fields: str,
+                 prefetch: int = 0) -> None:
+        self._api = api
+        self._query = query
+        self._fields = fields
+        self._prefetch = prefetch
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pages: Dict[Page, Tuple[datetime, 'Future[Dict[str, Any]]']] = {}
+
+    def get(self, page: Page) -> Tuple[datetime, Dict[str, Any]]:
+        """
+        Retrieve the time of the request and the issue search result of
+        a `page`, which is either a scheduled page or retrieved now.
+        """
+
+        if page in self._pages:
+            request_time, future = self._pages.pop(page)
+            return request_time, future.result()
+
+        return datetime.now(), self._search(page)
+
+    def _search(self, page: Page) -> Dict[str, Any]:
+        result = self._api.search_issues(self._query,
+                                         startAt=page[0],
+                                         maxResults=page[1],
+                                         expand='attachment,changelog',
+                                         fields=self._fields,
+                                         json_result=True)
+
+        if not isinstance(result, dict): # pragma: no cover
+            raise TypeError('Incorrect issue search API response')
+
+        return result
+
+    def schedule(self, pages: Sequence[Page]) -> None:
+        """
+        Start retrieving the `pages` in the background, unless they are
+        already scheduled.
+        """
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._prefetch)
+
+        for page in pages:
+            if page not in self._pages:
+                self._pages[page] = (
+                    datetime.now(), self._executor.submit(self._search, page)
+                )
+
+    def close(self) -> None:
+        """
+        Stop retrieving pages of issue results in the background.
+        """
+
+        for _, future in self._pages.values():
+            future.cancel()
+
+        self._pages = {}
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @property
+    def api(self) -> JIRA:
+        """
+        Retrieve the Jira API connection.
+        """
+
+        return self._api
+
+    @property
+    def query(self) -> str:
+        """
+        Retrieve the JQL query used to search issues.
+        """
+
+        return self._query
+
+    @property
+    def prefetch(self) -> int:
+        """
+        Retrieve the maximum number of pages that are retrieved in the
+        background.
+        """
+
+        return self._prefetch
+
 class Query:
     """
     Object that handles the JIRA API query using limiting.
+
+    If `prefetch` is positive, then at most this number of the next pages of
+    the query are retrieved in background threads while a page is processed,
+    once the total number of results is known from a response.
+
+    Prefetchers may use the `reference_cache` for reference data of the JIRA
+    server. If it is not provided, then reference data is never cached.
     """
 
     DATE_FORMAT = '%Y-%m-%d %H:%M'
@@ -40,9 +148,12 @@ class Query:
 
 
     def __init__(self, jira: Collector, jira_source: Jira,
-                 query: Optional[str] = None) -> None:
+                 query: Optional[str] = None, prefetch: int = 0,
+                 reference_cache: Optional[Reference_Cache] = None) -> None:
         self._jira = jira
-        self._api = jira_source.jira_api
+        if reference_cache is None:
+            reference_cache = Reference_Cache(jira_source.plain_url)
+        self._reference_cache = reference_cache
 
         updated_since = format_date(self._jira.updated_since.date,
                                     date_format=self.DATE_FORMAT)
@@ -50,10 +161,11 @@ class Query:
             query = f"{self.QUERY_FORMAT} AND ({query})"
         else:
             query = self.QUERY_FORMAT
-        self._query = query.format(self._jira.project_key, updated_since)
-        logging.info('Using query %s', self._query)
+        query = query.format(self._jira.project_key, updated_since)
+        logging.info('Using query %s', query)
 
-        self._search_fields = self._jira.search_fields
+        self._search = Issue_Search(jira_source.jira_api, query,
+                                    self._jira.search_fields, prefetch=prefetch)
         self._latest_update = updated_since
 
         self._iterator_limiter = Iterator_Limiter(size=100, maximum=100000)
@@ -65,29 +177,54 @@ class Query:
 
         self._iterator_limiter.update()
 
-    def perform_batched_query(self, had_issues: bool) -> Iterable[Issue]:
+    def perform_batched_query(self, had_issues: bool) -> List[Issue]:
         """
         Retrieve a batch of issue results from the JIRA API. `had_issues`
         indicates whether a previous batch had a usable result or that this is
         the first batch request for this query.
+
+        The issues are views of the raw JSON data of the results, which have
+        the same attributes as issue resources, without the cost of building
+        resources for all the nested data and changelog entries.
         """
 
         if not self._iterator_limiter.check(had_issues):
             return []
 
-        self._latest_update = format_date(datetime.now(),
+        page = (self._iterator_limiter.skip, self._iterator_limiter.size)
+        request_time, result = self._search.get(page)
+        self._latest_update = format_date(request_time,
                                           date_format=self.DATE_FORMAT)
-        result = self._api.search_issues(self._query,
-                                         startAt=self._iterator_limiter.skip,
-                                         maxResults=self._iterator_limiter.size,
-                                         expand='attachment,changelog',
-                                         fields=self._search_fields,
-                                         json_result=False)
 
-        if isinstance(result, dict): # pragma: no cover
-            raise TypeError('Incorrect issue search API response')
+        self._schedule(page, result.get('total'))
+        return [
+            cast(Issue, Raw_Resource(issue)) for issue in result.get('issues', [])
+        ]
 
-        return result
+    def _schedule(self, page: Page, total: Optional[int]) -> None:
+        prefetch = self._search.prefetch
+        if prefetch <= 0 or not isinstance(total, int):
+            return
+
+        skip, size = page
+        pages: List[Page] = []
+        for index in range(1, prefetch + 1):
+            start = skip + index * size
+            # Pages close to the limit of the iterator limiter are retrieved
+            # when they are needed, since they may have a different size.
+            if start >= total or start + size > self._iterator_limiter.maximum:
+                break
+
+            pages.append((start, size))
+
+        self._search.schedule(pages)
+
+    def close(self) -> None:
+        """
+        Stop retrieving pages of issue results in the background.
+        """
+
+        self._search.close()
 
     @property
     def query(self) -> str:
@@ -95,7 +232,7 @@ class Query:
         Retrieve the JQL query to be used to search issues.
         """
 
-        return self._query
+        return self._search.query
 
     @property
     def api(self) -> JIRA:
@@ -103,7 +240,15 @@ class Query:
         Retrieve the Jira API connection.
         """
 
-        return self._api
+        return self._search.api
+
+    @property
+    def reference_cache(self) -> Reference_Cache:
+        """
+        Retrieve the cache of reference data of the JIRA server.
+        """
+
+        return self._reference_cache
 
     @property
     def latest_update(self) -> str:
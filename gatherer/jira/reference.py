@@ -0,0 +1,108 @@
+"""
+On-disk cache of reference data retrieved from JIRA servers.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+import time
+from typing import Any, Callable, Dict, List, Optional
+from ..table import PathLike
+
+Reference = List[Dict[str, Any]]
+
+class Reference_Cache:
+    # pylint: disable=too-few-public-methods
+    """
+    Cache of raw reference data from API endpoints of a JIRA server, such as
+    sprints of boards, versions and projects, which may be shared by the
+    collection of multiple projects from the same server. Reference data with
+    personal fields, such as assignable users, should not be cached.
+
+    The cached data is stored in the `directory` for at most `ttl` seconds.
+    If `directory` is `None`, then the data is never cached. If `refresh` is
+    enabled, then cached data is not used, but newly retrieved data is stored.
+    """
+
+    # Default number of seconds to use cached data
+    DEFAULT_TTL = 60 * 60
+
+    def __init__(self, server: str,
+                 directory: Optional[PathLike] = None,
+                 ttl: int = DEFAULT_TTL, refresh: bool = False) -> None:
+        self._directory = Path(directory) if directory is not None else None
+        if self._directory is not None:
+            # Do not include the server URL in paths, since it may have
+            # credentials
+            self._server = hashlib.sha256(server.encode('utf-8')).hexdigest()
+        else:
+            self._server = ''
+
+        self._ttl = ttl
+        self._refresh = refresh
+
+    def _get_path(self, endpoint: str, key: str) -> Path:
+        if self._directory is None:
+            raise ValueError('Cache has no directory')
+
+        key_hash = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return self._directory / self._server / f'{endpoint}-{key_hash}.json'
+
+    def _read(self, path: Path) -> Optional[Reference]:
+        if self._refresh or not path.exists():
+            return None
+
+        try:
+            with path.open('r', encoding='utf-8') as cache_file:
+                cache: Dict[str, Any] = json.load(cache_file)
+        except (OSError, ValueError):
+            logging.warning('Could not read JIRA reference data cache %s', path)
+            return None
+
+        if time.time() - float(cache.get('time', 0)) > self._ttl:
+            return None
+
+        data: Reference = cache.get('data', [])
+        return data
+
+    def retrieve(self, endpoint: str, key: str,
+                 fetch: Callable[[], Reference]) -> Reference:
+        """
+        Retrieve the raw reference data of a JIRA API `endpoint` for the `key`,
+        such as a board ID, either from the cache if it has recent data or
+        by calling `fetch`, which retrieves the data from the API.
+        """
+
+        if self._directory is None:
+            return fetch()
+
+        path = self._get_path(endpoint, key)
+        data = self._read(path)
+        if data is not None:
+            logging.info('Using cached JIRA %s reference data for %s',
+                         endpoint, key)
+            return data
+
+        data = fetch()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open('w', encoding='utf-8') as cache_file:
+            json.dump({'time': time.time(), 'data': data}, cache_file)
+
+        return data
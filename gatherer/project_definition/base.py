@@ -24,7 +24,7 @@ from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union, \
     TYPE_CHECKING
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from ..config import Configuration
-from ..table import Row
+from ..table import PathLike, Row
 if TYPE_CHECKING:
     # pylint: disable=cyclic-import
     from ..domain import Project, Source
@@ -268,6 +268,15 @@ class Data:
 
         raise NotImplementedError("Must be implemented by subclasses")
 
+    def set_cache_directory(self, directory: PathLike) -> None:
+        """
+        Use the `directory` to store data that remains valid between
+        collections, such that later collections need to retrieve less data
+        from the project definition source.
+
+        Data sources without such caches can leave the implementation empty.
+        """
+
     def get_measurements(self, metrics: Optional[MetricNames], version: Version,
                          from_revision: Optional[Revision] = None) -> List[Row]:
         """
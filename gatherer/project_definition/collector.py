@@ -481,6 +481,7 @@ class Metric_Options_Collector(Metric_Collector, Definition_Collector):
         self._metric_names: Dict[str, Any] = {}
         self._diff = Metric_Difference(project,
                                        self._update_tracker.get_previous_data())
+        self._data.set_cache_directory(project.export_key)
 
     @property
     def target(self) -> str:
@@ -0,0 +1,166 @@
+"""
+Cache of changes to metrics from the changelog of a Quality-time server.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import datetime
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+from ...table import PathLike
+
+class Change(NamedTuple):
+    """
+    A processed entry of the changelog of a metric.
+    """
+
+    timestamp: str
+    date: datetime
+    delta: Optional[Dict[str, str]]
+    email: str
+
+class Metric_Changelog(NamedTuple):
+    """
+    Changes of a metric which are known to be complete for the dates after
+    `since`, or all changes if it is `None`, up to and including `until`.
+    """
+
+    since: Optional[datetime]
+    until: datetime
+    changes: Dict[str, List[Change]]
+
+class Changelog_Cache:
+    """
+    Cache of processed changelog entries of metrics, keyed by the metric UUID
+    and the timestamp of the entries.
+
+    If a `path` is provided, then the cache is read from and written to that
+    file, such that later collections only need to retrieve newer changes.
+    """
+
+    def __init__(self, path: Optional[PathLike] = None) -> None:
+        self._path = Path(path) if path is not None else None
+        self._metrics: Dict[str, Metric_Changelog] = {}
+        self._changed = False
+        self._read()
+
+    def _read(self) -> None:
+        if self._path is None or not self._path.exists():
+            return
+
+        try:
+            with self._path.open('r', encoding='utf-8') as cache_file:
+                cache: Dict[str, Dict[str, Any]] = json.load(cache_file)
+
+            for metric_uuid, metric in cache.items():
+                since = metric.get('since')
+                self._metrics[metric_uuid] = Metric_Changelog(
+                    datetime.fromisoformat(since) if since is not None else None,
+                    datetime.fromisoformat(metric['until']),
+                    {
+                        timestamp: [
+                            Change(timestamp, datetime.fromisoformat(change['date']),
+                                   change['delta'], change['email'])
+                            for change in changes
+                        ]
+                        for timestamp, changes in metric['changes'].items()
+                    }
+                )
+        except (OSError, ValueError, KeyError, TypeError):
+            logging.warning('Could not read Quality-time changelog cache %s',
+                            self._path)
+            self._metrics = {}
+
+    def get(self, metric_uuid: str, start_date: datetime, end_date: datetime) \
+            -> Optional[List[Change]]:
+        """
+        Retrieve the changes of a metric after `start_date` up to and including
+        `end_date`, sorted from newest to oldest. If the cache does not have
+        all the changes of the metric in this period, then `None` is returned.
+        """
+
+        metric = self._metrics.get(metric_uuid)
+        if metric is None or metric.until < end_date or \
+            (metric.since is not None and metric.since > start_date):
+            return None
+
+        return sorted((
+            change
+            for changes in metric.changes.values() for change in changes
+            if start_date < change.date <= end_date
+        ), key=lambda change: change.date, reverse=True)
+
+    def update(self, metric_uuid: str, changes: List[Change],
+               since: Optional[datetime], until: datetime) -> None:
+        """
+        Store the changes of a metric, which are all the changes after `since`,
+        or all changes ever if it is `None`, up to and including `until`.
+        """
+
+        new_changes: Dict[str, List[Change]] = {}
+        for change in changes:
+            new_changes.setdefault(change.timestamp, []).append(change)
+
+        metric = self._metrics.get(metric_uuid)
+        if metric is not None and \
+            (since is None or metric.until >= since) and \
+            (metric.since is None or until >= metric.since):
+            # The periods overlap, so the changes remain complete for the
+            # combined period.
+            new_changes = {**metric.changes, **new_changes}
+            if metric.since is None or since is None:
+                since = None
+            else:
+                since = min(metric.since, since)
+            until = max(metric.until, until)
+
+        self._metrics[metric_uuid] = Metric_Changelog(since, until, new_changes)
+        self._changed = True
+
+    def write(self) -> None:
+        """
+        Write the cache to the file if it has changed.
+        """
+
+        if self._path is None or not self._changed:
+            return
+
+        cache = {
+            metric_uuid: {
+                'since': metric.since.isoformat() \
+                    if metric.since is not None else None,
+                'until': metric.until.isoformat(),
+                'changes': {
+                    timestamp: [
+                        {
+                            'date': change.date.isoformat(),
+                            'delta': change.delta,
+                            'email': change.email
+                        } for change in changes
+                    ]
+                    for timestamp, changes in metric.changes.items()
+                }
+            }
+            for metric_uuid, metric in self._metrics.items()
+        }
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._path.open('w', encoding='utf-8') as cache_file:
+            json.dump(cache, cache_file)
+
+        self._changed = False
@@ -18,18 +18,23 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
+import logging
+from pathlib import Path
 import re
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, \
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Type, \
     TYPE_CHECKING
 from urllib.parse import urlsplit
 import dateutil.parser
 from requests.exceptions import ConnectionError as ConnectError, HTTPError, Timeout
 from . import parser
+from .changelog import Change, Changelog_Cache
 from ..base import Data, DataUrl, Parser, MetricNames, MetricTargets, \
     Revision, Version, UUID
 from ...request import Session
-from ...table import Row
+from ...table import PathLike, Row
 from ...utils import convert_local_datetime, convert_utc_datetime, \
     format_date, get_utc_datetime, parse_date
 if TYPE_CHECKING:
@@ -60,12 +65,42 @@ class Quality_Time_Data(Data):
         'direction': 'direction'
     }
 
+    # Number of metrics to retrieve measurements for concurrently
+    MEASUREMENT_WORKERS = 4
+
+    # Number of changes to retrieve from the changelog per metric
+    CHANGELOG_SIZE = 10
+
+    # Filename of the cache of changes to metrics in the cache directory
+    CHANGELOG_CACHE = 'quality_time_changelog.json'
+
     def __init__(self, project: Project, source: Source, url: DataUrl = None):
         super().__init__(project, source, url)
 
-        self._session = Session()
-        self._session.verify = not source.get_option('unsafe_hosts')
+        self._session = Session.get_shared(self._url,
+                                           verify=not source.get_option('unsafe_hosts'))
         self._delta_description = re.compile(self.DELTA_DESCRIPTION, re.X)
+        self._changelog_cache = Changelog_Cache()
+
+    @property
+    def changelog_cache(self) -> Changelog_Cache:
+        """
+        Retrieve the cache of processed changes to metrics.
+        """
+
+        return self._changelog_cache
+
+    @changelog_cache.setter
+    def changelog_cache(self, changelog_cache: Changelog_Cache) -> None:
+        """
+        Replace the cache of processed changes to metrics.
+        """
+
+        self._changelog_cache = changelog_cache
+
+    def set_cache_directory(self, directory: PathLike) -> None:
+        self._changelog_cache = Changelog_Cache(Path(directory,
+                                                     self.CHANGELOG_CACHE))
 
     def _format_version(self, date: datetime) -> Row:
         return {
@@ -127,19 +162,85 @@ class Quality_Time_Data(Data):
     def update_source_definitions(self, contents: Dict[str, Any]) -> None:
         pass
 
-    def _get_changelog(self, metric: str, count: int, version: Version) \
-            -> List[Dict[str, str]]:
+    def _get_changelog(self, path: str, count: int, version: Version) \
+            -> List[Dict[str, Any]]:
         date = dateutil.parser.parse(version['version_id'])
-        url = self.get_url(f'changelog/metric/{metric}/{count}',
+        url = self.get_url(f'changelog/{path}/{count}',
                            {'report_date': self._format_date(date)},
                            version='internal')
         try:
             request = self._session.get(url)
             request.raise_for_status()
         except (ConnectError, HTTPError, Timeout) as error:
-            raise RuntimeError(f"Could not retrieve changelog for {metric} from") \
+            raise RuntimeError(f"Could not retrieve changelog for {path}") \
                 from error
-        return request.json()['changelog']
+        changelog: List[Dict[str, Any]] = request.json()['changelog']
+        return changelog
+
+    def _parse_change(self, change: Dict[str, Any]) -> Change:
+        timestamp = str(change.get("timestamp", ""))
+        match = self._delta_description.match(str(change.get("delta", "")))
+        return Change(timestamp, get_utc_datetime(parse_date(timestamp)),
+                      match.groupdict() if match else None,
+                      str(change.get("email", "0")))
+
+    @staticmethod
+    def _get_since(changes: Sequence[Change], count: int) -> Optional[datetime]:
+        # The changes are complete after the oldest change if the changelog
+        # was limited, otherwise they are all the changes.
+        if len(changes) < count:
+            return None
+
+        return min(change.date for change in changes)
+
+    def _get_report_changes(self, report_uuid: str, metric_uuids: List[str],
+                            version: Version) -> Dict[str, List[Change]]:
+        # Retrieve the changes of metrics in a report at once and index them
+        # by metric UUID if the entries indicate which metric they change.
+        count = self.CHANGELOG_SIZE * len(metric_uuids)
+        try:
+            changelog = self._get_changelog(f'report/{report_uuid}', count,
+                                            version)
+        except RuntimeError:
+            logging.info('Could not retrieve changelog of report %s',
+                         report_uuid)
+            return {}
+
+        index: Dict[str, List[Change]] = {uuid: [] for uuid in metric_uuids}
+        changes = []
+        for entry in changelog:
+            uuids = entry.get("uuids", [entry.get("metric_uuid")])
+            if not isinstance(uuids, list) or not any(uuids):
+                return {}
+
+            change = self._parse_change(entry)
+            changes.append(change)
+            for uuid in uuids:
+                if uuid in index:
+                    index[uuid].append(change)
+
+        self._update_cache(index, self._get_since(changes, count), version)
+        return index
+
+    def _update_cache(self, index: Dict[str, List[Change]],
+                      since: Optional[datetime], version: Version) -> None:
+        end_date = get_utc_datetime(parse_date(version['version_id']))
+        for metric_uuid, changes in index.items():
+            self._changelog_cache.update(metric_uuid, changes, since, end_date)
+
+    def _get_metric_changes(self, metric_uuid: str, start_date: datetime,
+                            version: Version) -> List[Change]:
+        changes = [
+            self._parse_change(entry)
+            for entry in self._get_changelog(f'metric/{metric_uuid}',
+                                             self.CHANGELOG_SIZE, version)
+        ]
+        self._update_cache({metric_uuid: changes},
+                           self._get_since(changes, self.CHANGELOG_SIZE),
+                           version)
+        end_date = get_utc_datetime(parse_date(version['version_id']))
+        cached = self._changelog_cache.get(metric_uuid, start_date, end_date)
+        return cached if cached is not None else changes
 
     def adjust_target_versions(self, version: Version, result: Dict[str, Any],
                                from_revision: Optional[Revision] = None) \
@@ -148,51 +249,90 @@ class Quality_Time_Data(Data):
             start_date = get_utc_datetime(parse_date(str(from_revision)))
         else:
             start_date = self.START_DATE
-        versions = []
+        end_date = get_utc_datetime(parse_date(version['version_id']))
+
+        changelogs: Dict[str, List[Change]] = {}
+        reports: Dict[str, List[str]] = {}
         for metric_uuid, metric in result.items():
             if start_date is not None and \
                 get_utc_datetime(str(metric['report_date'])) <= start_date:
                 continue
 
-            changelog = self._get_changelog(metric_uuid, 10, version)
-            versions.extend(self._adjust_changelog(changelog, start_date,
-                                                   metric_uuid, metric))
+            changes = self._changelog_cache.get(metric_uuid, start_date,
+                                                end_date)
+            if changes is not None:
+                changelogs[metric_uuid] = changes
+            else:
+                reports.setdefault(str(metric.get('report_uuid', '')),
+                                   []).append(metric_uuid)
+
+        changelogs.update(self._retrieve_changes(reports, start_date, version))
+        self._changelog_cache.write()
+
+        versions = []
+        for metric_uuid, changes in changelogs.items():
+            # Only consider the most recent changes of each metric, as if the
+            # changelog of the metric was retrieved.
+            versions.extend(self._adjust_changelog(changes[:self.CHANGELOG_SIZE],
+                                                   start_date,
+                                                   metric_uuid,
+                                                   result[metric_uuid]))
 
         return sorted(versions, key=lambda version: version[0]['version_id'])
 
-    def _adjust_changelog(self, changelog: List[Dict[str, str]],
+    def _retrieve_changes(self, reports: Dict[str, List[str]],
+                          start_date: datetime,
+                          version: Version) -> Dict[str, List[Change]]:
+        # Retrieve the changes of metrics that are not cached, grouped by the
+        # UUID of the report that the metrics are part of.
+        end_date = get_utc_datetime(parse_date(version['version_id']))
+        changelogs: Dict[str, List[Change]] = {}
+        for report_uuid, metric_uuids in reports.items():
+            if report_uuid != '':
+                self._get_report_changes(report_uuid, metric_uuids, version)
+
+            for metric_uuid in metric_uuids:
+                # Use the changes from the report changelog if they reach
+                # the start date, otherwise retrieve the metric changelog.
+                changes = self._changelog_cache.get(metric_uuid, start_date,
+                                                    end_date)
+                if changes is None:
+                    changes = self._get_metric_changes(metric_uuid, start_date,
+                                                       version)
+                changelogs[metric_uuid] = changes
+
+        return changelogs
+
+    def _adjust_changelog(self, changelog: List[Change],
                           start_date: datetime, metric_uuid: str,
                           metric: Row) -> List[Tuple[Version, MetricTargets]]:
         versions = []
         for change in changelog:
-            match = self._delta_description.match(change.get("delta", ""))
-            if match:
-                delta = match.groupdict()
+            delta = change.delta
+            if delta is not None:
                 key = str(delta['parameter_key'])
                 if key not in self.METRIC_TARGET_MAP or \
                     self.METRIC_TARGET_MAP[key] not in metric:
                     continue
 
-                date = get_utc_datetime(parse_date(change.get("timestamp", "")))
-                if date <= start_date:
+                if change.date <= start_date:
                     break
 
                 versions.append(self._update_metric_version(metric_uuid,
                                                             metric, delta,
-                                                            date, change))
+                                                            change))
 
         return versions
 
     def _update_metric_version(self, metric_uuid: str, metric: Row,
-                               delta: Dict[str, str], date: datetime,
-                               change: Dict[str, str]) \
+                               delta: Dict[str, str], change: Change) \
             -> Tuple[Version, MetricTargets]:
         key = self.METRIC_TARGET_MAP[delta['parameter_key']]
         metric[key] = delta['new_value']
-        new_version = self._format_version(date)
+        new_version = self._format_version(change.date)
         new_version.update({
             'developer': delta['user'],
-            'email': change.get('email', '0'),
+            'email': change.email,
             'message': ''
         })
         new_result = {metric_uuid: metric.copy()}
@@ -211,23 +351,42 @@ class Quality_Time_Data(Data):
             cutoff = self.START_DATE
 
         result: List[Row] = []
-        for metric in metrics:
-            if not UUID.match(metric):
-                continue
-
-            url = self.get_url(f'measurements/{metric}', {'report_date': date},
-                               version='internal')
+        uuids = iter([metric for metric in metrics if UUID.match(metric)])
+        pending: Deque['Future[List[Row]]'] = deque()
+        with ThreadPoolExecutor(max_workers=self.MEASUREMENT_WORKERS) as executor:
             try:
-                request = self._session.get(url)
+                while True:
+                    # Retrieve measurements of the next metrics in advance,
+                    # while keeping the results in the order of the metrics.
+                    for metric in uuids:
+                        pending.append(executor.submit(self._get_metric_measurements,
+                                                       metric, date, cutoff))
+                        if len(pending) >= self.MEASUREMENT_WORKERS:
+                            break
+
+                    if not pending:
+                        return result
+
+                    result.extend(pending.popleft().result())
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _get_metric_measurements(self, metric: str, date: str,
+                                 cutoff: datetime) -> List[Row]:
+        url = self.get_url(f'measurements/{metric}', {'report_date': date},
+                           version='internal')
+        result: List[Row] = []
+        try:
+            with self._session.get(url, stream=True) as request:
                 request.raise_for_status()
-            except (ConnectError, HTTPError, Timeout) as error:
-                raise RuntimeError(f"Could not retrieve measurements for {metric}") \
-                    from error
-
-            for measurement in request.json()['measurements']:
-                measurement_date = parse_date(str(measurement.get("end")))
-                if get_utc_datetime(measurement_date) > cutoff:
-                    result.append(measurement)
+                for measurement in Session.iter_json_array(request, 'measurements'):
+                    measurement_date = parse_date(str(measurement.get("end")))
+                    if get_utc_datetime(measurement_date) > cutoff:
+                        result.append(measurement)
+        except (ConnectError, HTTPError, Timeout, ValueError) as error:
+            raise RuntimeError(f"Could not retrieve measurements for {metric}") \
+                from error
 
         return result
 
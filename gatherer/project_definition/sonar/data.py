@@ -49,8 +49,8 @@ class Sonar_Data(Data):
     def __init__(self, project: Project, source: Source, url: DataUrl = None):
         super().__init__(project, source, url)
 
-        self._session = Session()
-        self._session.verify = not source.get_option('unsafe_hosts')
+        self._session = Session.get_shared(self._url,
+                                           verify=not source.get_option('unsafe_hosts'))
 
         # For older versions of Sonar, in particular SonarCloud, we provide
         # the organization parameter for (additional) filtering
@@ -1,5 +1,6 @@
 """
-Module that provides HTTP request sessions.
+Module that provides HTTP request sessions and a scheduler of requests that
+follows the rate limits of hosts.
 
 Copyright 2017-2020 ICTU
 Copyright 2017-2022 Leiden University
@@ -18,25 +19,416 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import atexit
+import codecs
+from collections import OrderedDict
+from copy import copy, deepcopy
+from email.utils import parsedate_to_datetime
+import json
+import logging
 from pathlib import Path
-from typing import Optional, Union
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Mapping, \
+    Optional, Tuple, Union
+from urllib.parse import urlsplit
 import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
 from requests.auth import AuthBase
-from requests.models import Response
+from requests.models import PreparedRequest, Response
+from requests.structures import CaseInsensitiveDict
 from . import __name__ as _gatherer_name, __version__ as _gatherer_version
+from .config import Configuration
+
+Counters = Dict[str, Union[int, float]]
+Adapter_Factory = Callable[..., BaseAdapter]
+Session_Key = Tuple[str, Union[bool, str]]
+RequestTimeout = Union[None, float, Tuple[float, float], Tuple[float, None]]
+ClientCert = Union[None, bytes, str, Tuple[Union[bytes, str], Union[bytes, str]]]
+
+class Token_Bucket:
+    """
+    Pacing of requests to one host.
+
+    When the remaining requests in the `X-RateLimit-*` or `RateLimit-*` headers
+    drop below a fraction `low_remaining` of the limit, then a token bucket
+    spreads the remaining requests over the time until the reset. Requests are
+    blocked until the time indicated by the `Retry-After` header or the reset
+    time of an exhausted rate limit, or with an exponential backoff otherwise.
+    """
+
+    def __init__(self, low_remaining: float = 0.1,
+                 max_backoff: float = 300.0) -> None:
+        self._low_remaining = low_remaining
+        self._max_backoff = max_backoff
+
+        # Rate in requests per second, or unlimited
+        self._rate: Optional[float] = None
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+
+        self._blocked_until = 0.0
+        self._failures = 0
+
+    def get_delay(self, now: float) -> float:
+        """
+        Refill the bucket and determine the number of seconds to wait from the
+        monotonic time `now` until a request may be sent.
+        """
+
+        if self._rate is not None:
+            self._tokens = min(1.0, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+        delay = self._blocked_until - now
+        if self._rate is not None and self._tokens < 1.0:
+            delay = max(delay, (1.0 - self._tokens) / self._rate)
+
+        return delay
+
+    def take(self) -> None:
+        """
+        Take a token from the bucket for a request that is sent.
+        """
+
+        if self._rate is not None:
+            self._tokens -= 1.0
+
+    def block(self, now: float, retry_after: Optional[float],
+              remaining: Optional[float], reset: Optional[float]) -> None:
+        """
+        Block requests after a response at monotonic time `now` which indicated
+        that the rate limit was exceeded.
+        """
+
+        self._failures += 1
+        if retry_after is None:
+            if remaining == 0 and reset is not None:
+                retry_after = reset
+            else:
+                retry_after = 2.0 ** (self._failures - 1)
+
+        backoff = min(max(retry_after, 0.0), self._max_backoff)
+        self._blocked_until = max(self._blocked_until, now + backoff)
+
+    def update(self, now: float, remaining: Optional[float],
+               limit: Optional[float], reset: Optional[float]) -> None:
+        """
+        Adjust the rate of the bucket after a successful response at monotonic
+        time `now` based on the `remaining` requests out of the `limit` until
+        the rate limit `reset`s.
+        """
+
+        self._failures = 0
+        if remaining is None or reset is None or not limit:
+            self._rate = None
+        elif remaining < limit * self._low_remaining:
+            window = min(max(reset, 1.0), self._max_backoff)
+            if remaining < 1:
+                self._blocked_until = max(self._blocked_until, now + window)
+            self._rate = max(remaining, 1.0) / window
+        else:
+            self._rate = None
+
+class Host_Limiter:
+    """
+    Scheduler of requests to one host.
+
+    The number of concurrent requests is limited adaptively: it is halved when
+    the host responds that the rate limit is exceeded and it increases again
+    after a series of successful requests. Requests are further paced with
+    a token bucket based on the rate limit headers of the responses.
+    """
+
+    def __init__(self, max_concurrency: int = 10, low_remaining: float = 0.1,
+                 max_backoff: float = 300.0) -> None:
+        self._condition = threading.Condition()
+        self._max_concurrency = max_concurrency
+        self._concurrency = max_concurrency
+        self._active = 0
+        self._successes = 0
+        self._bucket = Token_Bucket(low_remaining=low_remaining,
+                                    max_backoff=max_backoff)
+        self._counters: Counters = {
+            'requests': 0,
+            'throttled': 0,
+            'wait_time': 0.0
+        }
+
+    @property
+    def counters(self) -> Counters:
+        """
+        Retrieve the number of requests, the number of responses which
+        indicated that the rate limit was exceeded, the total time in seconds
+        that requests waited before they were sent and the current limit of
+        concurrent requests.
+        """
+
+        with self._condition:
+            counters = self._counters.copy()
+            counters['concurrency'] = self._concurrency
+            return counters
+
+    def acquire(self) -> None:
+        """
+        Wait until a request to the host may be sent.
+        """
+
+        start = time.monotonic()
+        with self._condition:
+            while True:
+                delay = self._bucket.get_delay(time.monotonic())
+                if delay <= 0 and self._active < self._concurrency:
+                    break
+
+                self._condition.wait(delay if delay > 0 else None)
+
+            self._active += 1
+            self._bucket.take()
+            self._counters['requests'] += 1
+            self._counters['wait_time'] += time.monotonic() - start
+
+    def release(self, response: Optional[Response] = None) -> bool:
+        """
+        Register that a request to the host has finished with a `response`,
+        or `None` if the request failed without a response.
+
+        Returns whether the response indicates that the rate limit was
+        exceeded, such that the request could be tried again.
+        """
+
+        with self._condition:
+            self._active -= 1
+            throttled = False
+            if response is not None:
+                throttled = self._update(response.status_code, response.headers)
+            self._condition.notify_all()
+
+        return throttled
+
+    @staticmethod
+    def _get_header(headers: Mapping[str, str], name: str) -> Optional[float]:
+        for header in (f'X-RateLimit-{name}', f'RateLimit-{name}'):
+            if header in headers:
+                try:
+                    return float(headers[header])
+                except ValueError:
+                    return None
+
+        return None
+
+    @staticmethod
+    def _get_retry_after(headers: Mapping[str, str], now: float) -> Optional[float]:
+        if 'Retry-After' not in headers:
+            return None
+
+        value = headers['Retry-After']
+        if value.isdigit():
+            return float(value)
+
+        try:
+            return parsedate_to_datetime(value).timestamp() - now
+        except (TypeError, ValueError):
+            return None
+
+    def _update(self, status: int, headers: Mapping[str, str]) -> bool:
+        now = time.monotonic()
+        epoch = time.time()
+        retry_after = self._get_retry_after(headers, epoch)
+        remaining = self._get_header(headers, 'Remaining')
+        limit = self._get_header(headers, 'Limit')
+        reset = self._get_header(headers, 'Reset')
+        if reset is not None and reset > 1e9:
+            # Reset time is a timestamp rather than a number of seconds
+            reset -= epoch
+
+        if status == 429 or (status in (403, 503) and
+                             (retry_after is not None or remaining == 0)):
+            self._counters['throttled'] += 1
+            self._successes = 0
+            self._concurrency = max(1, self._concurrency // 2)
+            self._bucket.block(now, retry_after, remaining, reset)
+            return True
+
+        self._successes += 1
+        if self._successes >= self._concurrency and \
+            self._concurrency < self._max_concurrency:
+            self._concurrency += 1
+            self._successes = 0
+
+        self._bucket.update(now, remaining, limit, reset)
+        return False
+
+class Rate_Limiter:
+    """
+    Scheduler of HTTP requests to hosts, which follows the rate limits that the
+    hosts indicate in their responses. The scheduler is shared by API clients
+    that connect to the same hosts.
+    """
+
+    _default: Optional['Rate_Limiter'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, **kwargs: Any) -> None:
+        self._kwargs = kwargs
+        self._hosts: Dict[str, Host_Limiter] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_default(cls) -> 'Rate_Limiter':
+        """
+        Retrieve the scheduler which is shared within the process.
+        """
+
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+                atexit.register(cls._default.log_counters)
+
+            return cls._default
+
+    def get_host(self, host: str) -> Host_Limiter:
+        """
+        Retrieve the scheduler of requests to a `host`, which is the network
+        location of URLs, including the port if it is provided.
+        """
+
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = Host_Limiter(**self._kwargs)
+
+            return self._hosts[host]
+
+    def get_counters(self) -> Dict[str, Counters]:
+        """
+        Retrieve counters of requests and wait times for each host.
+        """
+
+        with self._lock:
+            hosts = dict(self._hosts)
+
+        return {host: limiter.counters for host, limiter in hosts.items()}
+
+    def log_counters(self) -> None:
+        """
+        Log the counters of requests and wait times for each host.
+        """
+
+        for host, counters in sorted(self.get_counters().items()):
+            logging.info('Rate limits of %s: %d requests, %d throttled, '
+                         'waited %.1f seconds, concurrency %d', host,
+                         counters['requests'], counters['throttled'],
+                         counters['wait_time'], counters['concurrency'])
+
+class Rate_Limit_Adapter(BaseAdapter):
+    """
+    Transport adapter which schedules requests with a rate limiter and sends
+    them through another adapter. Requests that exceed the rate limit are
+    sent again after the backoff, at most `max_retries` times.
+    """
+
+    def __init__(self, limiter: Optional[Rate_Limiter] = None,
+                 adapter: Optional[BaseAdapter] = None,
+                 max_retries: int = 3) -> None:
+        super().__init__()
+        self._limiter = limiter if limiter is not None \
+            else Rate_Limiter.get_default()
+        self._adapter = adapter if adapter is not None \
+            else Session.make_adapter()
+        self._max_retries = max_retries
+
+    @property
+    def limiter(self) -> Rate_Limiter:
+        """
+        Retrieve the scheduler of the requests.
+        """
+
+        return self._limiter
+
+    @property
+    def adapter(self) -> BaseAdapter:
+        """
+        Retrieve the transport adapter which sends the requests.
+        """
+
+        return self._adapter
+
+    def send(self, request: PreparedRequest, stream: bool = False,
+             timeout: RequestTimeout = None,
+             verify: Union[bool, str] = True,
+             cert: ClientCert = None,
+             proxies: Optional[Mapping[str, str]] = None) -> Response:
+        # pylint: disable=too-many-arguments
+        host = urlsplit(str(request.url)).netloc
+        limiter = self._limiter.get_host(host)
+        # Streamed request bodies cannot be sent again
+        replayable = request.body is None or \
+            isinstance(request.body, (bytes, str))
+        retries = 0
+        while True:
+            limiter.acquire()
+            try:
+                response = self._adapter.send(request, stream=stream,
+                                              timeout=timeout, verify=verify,
+                                              cert=cert, proxies=proxies)
+            except BaseException:
+                limiter.release()
+                raise
+
+            throttled = limiter.release(response)
+            if not throttled or not replayable or retries >= self._max_retries:
+                return response
+
+            retries += 1
+            response.close()
+
+    def close(self) -> None:
+        self._adapter.close()
 
 class Session(requests.Session):
+    # pylint: disable=too-many-instance-attributes
     """
     HTTP request session.
 
     This provides options to change verification and authentication settings
-    for the session, and sets an appropriate user agent.
+    for the session, and sets an appropriate user agent. Requests are
+    scheduled by a rate `limiter`, by default the one shared in the process,
+    and sent through a transport `adapter`, by default one created by the
+    adapter factory with the configured connection pool sizes. The pool sizes
+    are read from the 'http' section of the settings, unless they are set
+    through `configure`.
+
+    Sessions that are shared within the process are available through
+    `get_shared`, such that connections to a host are kept alive in the
+    connection pools and reused by all API clients of that host. Clients
+    with their own authentication or headers use a `fork` of the session.
     """
 
+    # Callable that creates transport adapters, the number of hosts with
+    # a connection pool and the number of connections kept alive in each pool
+    _adapter_settings: Dict[str, Any] = {
+        'adapter_factory': HTTPAdapter,
+        'pool_connections': 10,
+        'pool_maxsize': 10
+    }
+    # Whether the connection pool sizes have been read from the settings
+    _settings_read = False
+    _shared: Dict[Session_Key, 'Session'] = {}
+    _shared_lock = threading.Lock()
+
     def __init__(self, verify: Union[bool, str] = True,
-                 auth: Optional[AuthBase] = None) -> None:
+                 auth: Optional[AuthBase] = None,
+                 limiter: Optional[Rate_Limiter] = None,
+                 adapter: Optional[BaseAdapter] = None) -> None:
         super().__init__()
 
+        if adapter is None:
+            adapter = self.make_adapter()
+        adapter = Rate_Limit_Adapter(limiter, adapter=adapter)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
         user_agent = self.headers['User-Agent'] \
             if isinstance(self.headers['User-Agent'], str) \
             else str(self.headers['User-Agent'], encoding='utf-8')
@@ -44,6 +436,122 @@ class Session(requests.Session):
         self.verify = verify
         self.auth = auth
 
+    @classmethod
+    def configure(cls, pool_connections: Optional[int] = None,
+                  pool_maxsize: Optional[int] = None,
+                  adapter_factory: Optional[Adapter_Factory] = None) -> None:
+        """
+        Change the settings of transport adapters of new sessions.
+
+        The `pool_connections` and `pool_maxsize` change the number of hosts
+        with a connection pool and the number of connections kept alive in
+        each pool. The `adapter_factory` is a callable that receives these two
+        numbers as keyword arguments and returns a transport adapter, for
+        example one that supports HTTP/2. Sessions that are already shared are
+        closed, such that new shared sessions use the settings.
+        """
+
+        cls._read_settings()
+        settings = {
+            'adapter_factory': adapter_factory,
+            'pool_connections': pool_connections,
+            'pool_maxsize': pool_maxsize
+        }
+        cls._adapter_settings.update({
+            key: value for key, value in settings.items() if value is not None
+        })
+
+        cls.clear_shared()
+
+    @classmethod
+    def _read_settings(cls) -> None:
+        if cls._settings_read:
+            return
+
+        cls._settings_read = True
+        config = Configuration.get_settings()
+        for key in ('pool_connections', 'pool_maxsize'):
+            if not config.has_option('http', key):
+                continue
+
+            value = config.get('http', key)
+            try:
+                cls._adapter_settings[key] = int(value)
+            except ValueError:
+                if Configuration.has_value(value) and \
+                    not value.startswith('$'):
+                    logging.warning('Ignoring invalid HTTP %s setting: %s',
+                                    key, value)
+
+    @classmethod
+    def make_adapter(cls) -> BaseAdapter:
+        """
+        Create a transport adapter with the configured connection pool sizes.
+        """
+
+        cls._read_settings()
+        settings = dict(cls._adapter_settings)
+        factory: Adapter_Factory = settings.pop('adapter_factory')
+        return factory(**settings)
+
+    @classmethod
+    def get_shared(cls, url: str, verify: Union[bool, str] = True) -> 'Session':
+        """
+        Retrieve a session that is shared within the process for requests to
+        the host of the `url` with the same verification setting. The session
+        is created if it did not yet exist.
+
+        The shared session has no authentication. API clients that require
+        authentication or other changes to the session should use `fork`.
+        """
+
+        parts = urlsplit(url)
+        key = (f'{parts.scheme}://{parts.netloc}', verify)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(verify=verify)
+
+            return cls._shared[key]
+
+    def fork(self, auth: Optional[AuthBase] = None) -> 'Session':
+        """
+        Create a session for a single API client based on this session, which
+        uses `auth` for authentication if it is provided.
+
+        The new session uses the same transport adapters, and thus connection
+        pools, as this session. Changes to its headers, cookies, hooks, query
+        parameters, proxies and mounted adapters do not affect this session,
+        which may be shared with other clients. Closing the new session also
+        closes the shared adapters.
+        """
+
+        session = copy(self)
+        session.headers = CaseInsensitiveDict(self.headers)
+        session.cookies = self.cookies.copy()
+        session.hooks = {
+            event: list(hooks) for event, hooks in self.hooks.items()
+        }
+        session.params = deepcopy(self.params)
+        session.proxies = deepcopy(self.proxies)
+        session.adapters = OrderedDict(self.adapters)
+        if auth is not None:
+            session.auth = auth
+
+        return session
+
+    @classmethod
+    def clear_shared(cls) -> None:
+        """
+        Close and remove the sessions that are shared within the process.
+        """
+
+        with cls._shared_lock:
+            sessions = list(cls._shared.values())
+            cls._shared.clear()
+
+        for session in sessions:
+            session.close()
+
     @classmethod
     def is_code(cls, response: Response, status_name: str) -> bool:
         """
@@ -53,6 +561,58 @@ class Session(requests.Session):
 
         return response.status_code == requests.codes[status_name]
 
+    @classmethod
+    def iter_json_array(cls, response: Response, key: str,
+                        chunk_size: int = 65536) -> Iterator[Any]:
+        """
+        Parse the items of an array in a JSON object response one by one
+        while the response is read, such that the entire response does not
+        need to be kept in memory. The array is the value of the first `key`
+        in the response, which should be a JSON object with arrays of objects.
+
+        The response should be requested with `stream=True` for the content to
+        be read in chunks of `chunk_size` bytes. If the array is not found or
+        the JSON is invalid, then a `ValueError` is raised.
+        """
+
+        start = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder(response.encoding or 'utf-8')()
+        chunks = response.iter_content(chunk_size=chunk_size)
+        buffer = ''
+        position: Optional[int] = None
+        while True:
+            chunk = next(chunks, None)
+            buffer += text.decode(chunk if chunk is not None else b'',
+                                  final=chunk is None)
+            if position is None:
+                match = start.search(buffer)
+                if match:
+                    position = match.end()
+
+            while position is not None:
+                while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                    position += 1
+                if buffer.startswith(']', position):
+                    return
+
+                try:
+                    item, position = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    if chunk is None:
+                        raise
+                    break
+
+                yield item
+
+            if chunk is None:
+                raise ValueError(f'No complete array for {key} in response')
+
+            # Only keep the part of the buffer that has not been parsed
+            if position is not None:
+                buffer = buffer[position:]
+                position = 0
+
     @staticmethod
     def _get_user_agent() -> str:
         version = _gatherer_version
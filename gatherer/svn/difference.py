@@ -19,8 +19,8 @@ limitations under the License.
 """
 
 import logging
-from typing import Dict, Optional, TYPE_CHECKING
-import svn.exception
+import tempfile
+from typing import Dict, IO, Iterator, Optional, TYPE_CHECKING
 from ..version_control.repo import Change_Type, Version
 from ..table import Table
 if TYPE_CHECKING:
@@ -197,6 +197,9 @@ class Difference:
     Parser for Subversion difference format.
     """
 
+    # Number of bytes to read from the output of the diff command at once.
+    CHUNK_SIZE = 65536
+
     def __init__(self, repo: Subversion_Repository, path: str,
                  from_revision: Optional[Version] = None,
                  to_revision: Optional[Version] = None) -> None:
@@ -232,23 +235,44 @@ class Difference:
 
         args.append(self._path)
 
-        try:
-            diff_result = self._repo.repo.run_command('diff', args,
-                                                      return_binary=True)
-        except svn.exception.SvnException:
-            logging.exception('Could not retrieve diff')
-            return {
-                'insertions': str(0),
-                'deletions': str(0),
-                'number_of_lines': str(0),
-                'number_of_files': str(0),
-                'size': str(0)
-            }
-
-        if not isinstance(diff_result, bytes):
-            raise TypeError('Diff is not a bytes object')
+        # Write errors to a file, such that the process does not block on
+        # a full error pipe while the output is read.
+        with tempfile.TemporaryFile() as error_file:
+            try:
+                process = self._repo.open_command('diff', args,
+                                                  stderr=error_file)
+            except OSError:
+                logging.exception('Could not retrieve diff')
+                return self.get_empty_stats()
+
+            with process:
+                if process.stdout is None:
+                    raise TypeError('Diff process has no output stream')
+
+                stats = self._parse_diff(process.stdout)
+
+            if process.returncode != 0:
+                error_file.seek(0)
+                logging.error('Could not retrieve diff: %s',
+                              error_file.read().decode('utf-8', 'replace').strip())
+                self._change_paths.clear()
+                return self.get_empty_stats()
+
+        return stats
+
+    @staticmethod
+    def get_empty_stats() -> Dict[str, str]:
+        """
+        Retrieve statistics for a difference without changes.
+        """
 
-        return self._parse_diff(diff_result)
+        return {
+            'insertions': str(0),
+            'deletions': str(0),
+            'number_of_lines': str(0),
+            'number_of_files': str(0),
+            'size': str(0)
+        }
 
     @property
     def repo(self) -> Subversion_Repository:
@@ -276,9 +300,26 @@ class Difference:
 
         return self._change_paths
 
-    def _parse_diff(self, diff_result: bytes) -> Dict[str, str]:
+    def _split_lines(self, output: IO[bytes]) -> Iterator[bytes]:
+        # Split the lines in the same way as `bytes.splitlines` but without
+        # reading all the output into memory. The last, possibly incomplete
+        # line of a chunk, which might also end in a carriage return of a line
+        # break that continues in the next chunk, is joined with that chunk.
+        remainder = b''
+        for chunk in iter(lambda: output.read(self.CHUNK_SIZE), b''):
+            lines = (remainder + chunk).splitlines(keepends=True)
+            remainder = lines.pop()
+            for line in lines:
+                if line.endswith(b'\r\n'):
+                    yield line[:-2]
+                else:
+                    yield line[:-1]
+
+        yield from remainder.splitlines()
+
+    def _parse_diff(self, output: IO[bytes]) -> Dict[str, str]:
         state = Difference_State(self)
-        for line in diff_result.splitlines():
+        for line in self._split_lines(output):
             state.parse_line(line)
 
         return state.get_data()
@@ -18,13 +18,17 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
-from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, \
-    Tuple, Union, TYPE_CHECKING
+import os
+import subprocess
+from typing import Any, Dict, IO, Iterator, List, NamedTuple, Optional, \
+    Sequence, Tuple, Union, TYPE_CHECKING
 # Non-standard imports
 import dateutil.tz
 import svn.common
+import svn.config
 import svn.exception
 import svn.local
 import svn.remote
@@ -48,16 +52,80 @@ LogEntry = NamedTuple('LogEntry', [('date', datetime),
                                    ('author', str),
                                    ('changelist', List[Tuple[str, str]])])
 
-class UnsafeRemoteClient(svn.remote.RemoteClient):
+Processes = List['subprocess.Popen[bytes]']
+
+class StreamingClient(svn.common.CommonClient):
+    """
+    A subversion client which can start a command such that its output can be
+    read incrementally, instead of waiting for the command to complete.
+    """
+
+    def external_command(self, cmd: List[str], success_code: int = 0,
+                         do_combine: bool = False, return_binary: bool = False,
+                         environment: Optional[Dict[str, str]] = None,
+                         wd: Optional[str] = None,
+                         processes: Optional[Processes] = None,
+                         stderr: Optional[IO[bytes]] = None) \
+            -> Union[bytes, List[str]]:
+        # pylint: disable=too-many-arguments
+        if environment is None:
+            environment = {}
+        if processes is None:
+            return super().external_command(cmd, success_code=success_code,
+                                            do_combine=do_combine,
+                                            return_binary=return_binary,
+                                            environment=environment, wd=wd)
+
+        # Use the same locale as the client for parseable output
+        env = os.environ.copy()
+        env['LANG'] = svn.config.CONSOLE_ENCODING
+        env.update(environment)
+
+        # The process is handed to the caller, which waits for it to end.
+        # pylint: disable-next=consider-using-with
+        processes.append(subprocess.Popen(cmd, cwd=wd, env=env,
+                                          stdout=subprocess.PIPE,
+                                          stderr=stderr if stderr is not None
+                                          else subprocess.DEVNULL))
+        return []
+
+    def open_command(self, subcommand: str, args: List[str],
+                     stderr: Optional[IO[bytes]] = None) \
+            -> 'subprocess.Popen[bytes]':
+        """
+        Start a Subversion command with the command line and environment of
+        the client, such that the standard output of the process can be read
+        incrementally. The standard error output is written to the file
+        `stderr`, or discarded if it is not provided.
+        """
+
+        processes: Processes = []
+        self.run_command(subcommand, list(args), processes=processes,
+                         stderr=stderr)
+        return processes[0]
+
+class StreamingRemoteClient(StreamingClient, svn.remote.RemoteClient):
+    """
+    A remote subversion client which can start streaming commands.
+    """
+
+class StreamingLocalClient(StreamingClient, svn.local.LocalClient):
+    """
+    A local subversion client which can start streaming commands.
+    """
+
+class UnsafeRemoteClient(StreamingRemoteClient):
     """
     A remote subversion client which trusts a server certificate, even
     if it has other verification failures than a self-signed certificate.
     """
 
+    # Certificate verification failures that are trusted
+    TRUST_FAILURES = 'unknown-ca,cn-mismatch,expired,not-yet-valid,other'
+
     def run_command(self, subcommand: str, args: List[str], **kwargs: Any) \
             -> Union[bytes, List[str]]:
-        failures = 'unknown-ca,cn-mismatch,expired,not-yet-valid,other'
-        args.append(f'--trust-server-cert-failures={failures}')
+        args.append(f'--trust-server-cert-failures={self.TRUST_FAILURES}')
         return super().run_command(subcommand, args, **kwargs)
 
 class Subversion_Repository(Version_Control_Repository):
@@ -71,6 +139,8 @@ class Subversion_Repository(Version_Control_Repository):
     BATCH_SIZE = 1000
     # Maximum number of commits to obtain
     MAX_SIZE = 10000
+    # Number of threads that retrieve differences of a batch of commits
+    DIFF_WORKERS = 4
 
     def __init__(self, source: Source, repo_directory: PathLike,
                  sprints: Optional[Sprint_Data] = None,
@@ -101,7 +171,7 @@ class Subversion_Repository(Version_Control_Repository):
         return env
 
     @classmethod
-    def _create_remote_repo(cls, source: Source) -> svn.remote.RemoteClient:
+    def _create_remote_repo(cls, source: Source) -> StreamingRemoteClient:
         env = cls._create_environment(source)
         if source.get_option('unsafe_hosts'):
             # Do not pass username and password as authority part of an URL to
@@ -110,7 +180,7 @@ class Subversion_Repository(Version_Control_Repository):
             # password from the credentials environment.
             return UnsafeRemoteClient(source.plain_url, **env)
 
-        return svn.remote.RemoteClient(source.url, **env)
+        return StreamingRemoteClient(source.url, **env)
 
     @classmethod
     def from_source(cls, source: Source, repo_directory: PathLike,
@@ -141,7 +211,7 @@ class Subversion_Repository(Version_Control_Repository):
         if self._repo is None:
             path = self._repo_directory.expanduser()
             env = self._create_environment(self.source)
-            self._repo = svn.local.LocalClient(str(path), **env)
+            self._repo = StreamingLocalClient(str(path), **env)
 
         return self._repo
 
@@ -163,6 +233,24 @@ class Subversion_Repository(Version_Control_Repository):
 
         return self._version_info
 
+    def open_command(self, subcommand: str, args: List[str],
+                     stderr: Optional[IO[bytes]] = None) \
+            -> 'subprocess.Popen[bytes]':
+        """
+        Start a Subversion command with the command line and environment that
+        the client of the repository builds, such that the standard output of
+        the process can be read incrementally. The standard error output is
+        written to the file `stderr`, or discarded if it is not provided.
+        The caller should wait for the process to end.
+
+        The client of the repository must be a `StreamingClient`.
+        """
+
+        if not isinstance(self.repo, StreamingClient):
+            raise TypeError('Repository client cannot stream commands')
+
+        return self.repo.open_command(subcommand, args, stderr=stderr)
+
     def is_empty(self) -> bool:
         try:
             self.repo.info()
@@ -243,12 +331,13 @@ class Subversion_Repository(Version_Control_Repository):
         return str(int(rev))
 
     def _query(self, filename: str, from_revision: Version,
-               to_revision: Version) -> Iterator[LogEntry]:
+               to_revision: Version, stats: bool = True) -> Iterator[LogEntry]:
         try:
             return self.repo.log_default(rel_filepath=filename,
                                          revision_from=from_revision,
                                          revision_to=to_revision,
-                                         limit=self._iterator_limiter.size)
+                                         limit=self._iterator_limiter.size,
+                                         changelist=stats)
         except svn.exception.SvnException as error:
             raise RepositoryDataException('Could not search revisions') from error
 
@@ -278,19 +367,18 @@ class Subversion_Repository(Version_Control_Repository):
         from_revision = self.parse_svn_revision(from_revision, '1')
         to_revision = self.parse_svn_revision(to_revision, 'HEAD')
 
-        versions = []
+        versions: List[Dict[str, str]] = []
         log_descending = None
         self._reset_limiter()
         try:
-            log = self._query(filename, from_revision, to_revision)
+            log = self._query(filename, from_revision, to_revision,
+                              stats=stats)
             had_versions = True
             while self._iterator_limiter.check(had_versions):
-                had_versions = False
-                for entry in log:
-                    had_versions = True
-                    new_version = self._parse_version(entry, filename=filename,
-                                                      stats=stats)
-                    versions.append(new_version)
+                entries = list(log)
+                had_versions = bool(entries)
+                versions.extend(self._parse_versions(entries, stats=stats,
+                                                     filename=filename))
 
                 count = self._iterator_limiter.size + self._iterator_limiter.skip
                 self._iterator_limiter.update()
@@ -309,7 +397,8 @@ class Subversion_Repository(Version_Control_Repository):
                     # exist, always keep the latest revision within the range
                     # but trim it off.
                     from_revision = versions[-1]['version_id']
-                    log = self._query(filename, from_revision, to_revision)
+                    log = self._query(filename, from_revision, to_revision,
+                                      stats=stats)
                     try:
                         next(log)
                     except StopIteration:
@@ -324,6 +413,43 @@ class Subversion_Repository(Version_Control_Repository):
         return sorted(versions, key=lambda version: version['version_id'],
                       reverse=descending)
 
+    def _parse_versions(self, entries: Sequence[LogEntry], stats: bool = True,
+                        filename: str = '') -> Iterator[Dict[str, str]]:
+        """
+        Parse information retrieved from the Subversion back end into version
+        information for a batch of log `entries`. If `stats` is enabled, then
+        the differences of the versions are retrieved by concurrent threads,
+        except for versions without changed paths in the log entry.
+        """
+
+        if not stats:
+            for entry in entries:
+                yield self._parse_version(entry, stats=False)
+
+            return
+
+        # Determine the Subversion version once before the threads use it
+        self.version_info # pylint: disable=pointless-statement
+
+        diffs = [
+            self._get_difference(filename, to_revision=entry.revision)
+            if entry.changelist is None or entry.changelist else None
+            for entry in entries
+        ]
+        with ThreadPoolExecutor(max_workers=self.DIFF_WORKERS) as executor:
+            results = executor.map(self._execute_difference, diffs)
+            for entry, diff, diff_stats in zip(entries, diffs, results):
+                version = self._parse_version(entry, stats=False)
+                version.update(self._add_diff_stats(diff, diff_stats))
+                yield version
+
+    @staticmethod
+    def _execute_difference(diff: Optional[Difference]) -> Dict[str, str]:
+        if diff is None:
+            return Difference.get_empty_stats()
+
+        return diff.execute()
+
     def _parse_version(self, commit: LogEntry, stats: bool = True,
                        filename: str = '') -> Dict[str, str]:
         """
@@ -371,16 +497,26 @@ class Subversion_Repository(Version_Control_Repository):
         and the return value is a dictionary with zero values.
         """
 
+        diff = self._get_difference(filename, from_revision=from_revision,
+                                    to_revision=to_revision)
+        return self._add_diff_stats(diff, diff.execute())
+
+    def _get_difference(self, filename: str,
+                        from_revision: Optional[Version] = None,
+                        to_revision: Optional[Version] = None) -> Difference:
         if isinstance(self.repo, svn.remote.RemoteClient):
             path = f'{self.repo.url}/{filename}'
         else:
             path = str(self._repo_directory / filename)
 
-        diff = Difference(self, path, from_revision=from_revision,
+        return Difference(self, path, from_revision=from_revision,
                           to_revision=to_revision)
-        stats = diff.execute()
+
+    def _add_diff_stats(self, diff: Optional[Difference],
+                        stats: Dict[str, str]) -> Dict[str, str]:
         stats['branch'] = str(0)
-        self._tables['change_path'].extend(diff.change_paths.get())
+        if diff is not None:
+            self._tables['change_path'].extend(diff.change_paths.drain())
 
         return stats
 
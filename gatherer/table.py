@@ -22,19 +22,243 @@ import json
 import os
 from pathlib import Path
 import re
-from typing import cast, Collection, Dict, Iterator, List, Optional, Sequence, \
-    Tuple, Union, TYPE_CHECKING
-from copy import copy, deepcopy
+import threading
+from typing import cast, Collection, Dict, FrozenSet, Iterable, Iterator, List, \
+    Optional, Pattern, Sequence, TextIO, Tuple, Union, overload, TYPE_CHECKING
+from bisect import insort
+from copy import copy
 from .salt import Salt
 
 Secrets = Dict[str, Union[Dict[str, str], List[Dict[str, str]]]]
 Value = str
 Row = Dict[str, Value]
+Index_Key = FrozenSet[Tuple[str, Value]]
 if TYPE_CHECKING:
     PathLike = Union[str, os.PathLike[str]]
 else:
     PathLike = Union[str, os.PathLike]
 
+def write_rows(rows: Iterable[Row], outfile: TextIO, indent: Optional[int] = 4,
+               lines: bool = False) -> None:
+    """
+    Write the `rows` to the open file `outfile` one by one, without holding
+    the entire JSON output in memory.
+
+    If `lines` is disabled, then the output is a JSON array that is the same
+    as what `json.dump` writes for a list of the rows with the given `indent`,
+    where `None` results in a compact array on one line. Otherwise, the output
+    is in the JSON Lines format with one compact row object on each line.
+    """
+
+    if lines:
+        for row in rows:
+            outfile.write(json.dumps(row))
+            outfile.write('\n')
+
+        return
+
+    newline = '' if indent is None else '\n' + ' ' * indent
+    separator = ', ' if indent is None else ',' + newline
+    empty = True
+    for row in rows:
+        outfile.write(f'[{newline}' if empty else separator)
+        # Newlines in values are escaped, so only the structure is indented
+        outfile.write(json.dumps(row, indent=indent).replace('\n', newline))
+        empty = False
+
+    outfile.write('[]' if empty else f'{newline[:1]}]')
+
+Username_Rule = Tuple[Pattern[str], Pattern[str], str, bool]
+
+class Encryption_Cache:
+    """
+    Bounded memory of the pseudonymous values of fields for one set of secrets,
+    including username adjustment patterns that are compiled once.
+
+    Caches are shared within the process per set of secrets, as well as per
+    secrets file until the file is modified. The caches may be used by
+    multiple threads.
+    """
+
+    # Maximum number of encrypted values to remember
+    MAX_SIZE = 100000
+
+    _caches: Dict[str, 'Encryption_Cache'] = {}
+    _files: Dict[str, Tuple[int, 'Encryption_Cache']] = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, secrets: Secrets) -> None:
+        self._secrets = secrets
+        salts = cast(Dict[str, str], secrets['salts'])
+        self._salts = (
+            salts['salt'].encode('utf-8'), salts['pepper'].encode('utf-8')
+        )
+
+        usernames = secrets.get('usernames')
+        self._usernames: Optional[List[Username_Rule]] = None
+        if isinstance(usernames, list):
+            self._usernames = [
+                self._compile_rule(search_set) for search_set in usernames
+            ]
+
+        self._values: Dict[Tuple[bool, str], str] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def get(cls, secrets: Secrets) -> 'Encryption_Cache':
+        """
+        Retrieve the cache for the `secrets` that is shared within the process.
+        """
+
+        fingerprint = json.dumps(secrets, sort_keys=True)
+        with cls._caches_lock:
+            if fingerprint not in cls._caches:
+                cls._caches[fingerprint] = cls(secrets)
+
+            return cls._caches[fingerprint]
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['Encryption_Cache']:
+        """
+        Retrieve the cache for the secrets stored in the file at `path`, which
+        is shared within the process. The file is only read again if its
+        modification time changes. If the file does not exist, then `None` is
+        returned.
+        """
+
+        key = str(path)
+        if not path.exists():
+            with cls._caches_lock:
+                cls._files.pop(key, None)
+
+            return None
+
+        mtime = path.stat().st_mtime_ns
+        with cls._caches_lock:
+            if key in cls._files and cls._files[key][0] == mtime:
+                return cls._files[key][1]
+
+        with path.open('r', encoding='utf-8') as secrets_file:
+            cache = cls.get(json.load(secrets_file))
+
+        with cls._caches_lock:
+            cls._files[key] = (mtime, cache)
+
+        return cache
+
+    @staticmethod
+    def _compile_rule(search_set: Dict[str, str]) -> Username_Rule:
+        prefix = re.compile(re.escape(search_set['prefix'])
+                            .replace('%', '.*').replace('_', '.'))
+        if 'pattern' in search_set:
+            pattern = re.compile(search_set['pattern'])
+            replace = search_set.get('replace', '').replace('$', '\\')
+        else:
+            pattern = prefix
+            replace = ''
+
+        return prefix, pattern, replace, search_set.get('mutate') == 'lower'
+
+    def _convert_username(self, username: str) -> str:
+        if self._usernames is None:
+            return username
+
+        for prefix, pattern, replace, lower in self._usernames:
+            if prefix.match(username):
+                username = pattern.sub(replace, username)
+                if lower:
+                    username = username.lower()
+
+                return username
+
+        return username
+
+    def encrypt(self, field: str, value: str) -> str:
+        """
+        Retrieve the pseudonymous value of the `value` of a `field`.
+
+        Username fields are first adjusted with the username patterns.
+        A value that is zero after adjustment is not encrypted.
+        """
+
+        key = (self._usernames is not None and field.endswith('username'), value)
+        with self._lock:
+            if key in self._values:
+                self._hits += 1
+                return self._values[key]
+
+            self._misses += 1
+
+        # Encrypt outside the lock, since other threads may remember the same
+        # value in the meantime, which is harmless.
+        if key[0]:
+            value = self._convert_username(value)
+        if value != str(0):
+            value = Salt.encrypt(value.encode('utf-8'), *self._salts)
+
+        with self._lock:
+            if key not in self._values and len(self._values) >= self.MAX_SIZE:
+                # Forget the oldest value
+                del self._values[next(iter(self._values))]
+
+            self._values[key] = value
+
+        return value
+
+    @property
+    def secrets(self) -> Secrets:
+        """
+        Retrieve the secrets that the encrypted values are based on.
+        """
+
+        return self._secrets
+
+    @property
+    def hits(self) -> int:
+        """
+        Retrieve the number of times that an encrypted value was remembered.
+        """
+
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Retrieve the number of times that a value had to be encrypted.
+        """
+
+        return self._misses
+
+class Rows_View(Sequence[Row]):
+    """
+    Read-only sequence of the rows of a table, which does not copy the rows.
+    """
+
+    def __init__(self, data: List[Row]) -> None:
+        self._data = data
+
+    @overload
+    def __getitem__(self, index: int) -> Row:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[Row]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Row, Sequence[Row]]:
+        if isinstance(index, slice):
+            return Rows_View(self._data[index])
+
+        return self._data[index]
+
+    def __iter__(self) -> Iterator[Row]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
 class Table(Collection[Row]):
     """
     Data storage for eventual JSON output for the database importer.
@@ -43,20 +267,25 @@ class Table(Collection[Row]):
     `secrets.json` may be available with username adjustments patterns and
     encryption keys. These are then used by to perform early encryption so that
     the data is made pseudonymous before it leaves the agent's environment.
+
+    If `index` is enabled, then the table keeps an index of the contents of
+    its rows, such that searching for and updating rows takes constant time
+    rather than linear time, at the cost of additional memory.
     """
 
     def __init__(self, name: str, filename: Optional[str] = None,
                  merge_update: bool = False,
-                 encrypt_fields: Optional[Sequence[str]] = None) -> None:
+                 encrypt_fields: Optional[Sequence[str]] = None,
+                 index: bool = False) -> None:
         self._name = name
         self._merge_update = merge_update
         self._encrypt_fields = encrypt_fields
+        self._data: List[Row] = []
+        self._index: Optional[Dict[Index_Key, List[int]]] = {} if index else None
 
-        secrets_path = Path('secrets.json')
-        self._secrets: Optional[Secrets] = None
-        if self._encrypt_fields is not None and secrets_path.exists():
-            with secrets_path.open('r', encoding='utf-8') as secrets_file:
-                self._secrets = json.load(secrets_file)
+        self._encryption: Optional[Encryption_Cache] = None
+        if self._encrypt_fields is not None:
+            self._encryption = Encryption_Cache.load(Path('secrets.json'))
 
         if filename is None:
             self._filename = f'data_{self._name}.json'
@@ -81,25 +310,14 @@ class Table(Collection[Row]):
 
         return self._filename
 
-    @staticmethod
-    def _convert_username(usernames: List[Dict[str, str]], username: str) -> str:
-        for search_set in usernames:
-            pattern = re.escape(search_set['prefix']).replace('%', '.*') \
-                .replace('_', '.')
-            replace = ''
-
-            if re.match(pattern, username):
-                if 'pattern' in search_set:
-                    pattern = search_set['pattern']
-                    replace = search_set.get('replace', '').replace('$', '\\')
-
-                username = re.sub(pattern, replace, username)
-                if search_set.get('mutate') == 'lower':
-                    username = username.lower()
-
-                return username
+    @property
+    def encryption_cache(self) -> Optional['Encryption_Cache']:
+        """
+        Retrieve the cache of encrypted values used for the table, or `None`
+        if the table does not encrypt fields.
+        """
 
-        return username
+        return self._encryption
 
     def _encrypt(self, row: Row) -> Row:
         # Make a copy so the originally passed dict remains the same.
@@ -111,25 +329,16 @@ class Table(Collection[Row]):
         if "encrypted" in row and row["encrypted"] != str(0):
             return row
 
-        if self._secrets is None:
+        if self._encryption is None:
             row["encrypted"] = str(0)
             return row
 
-        salts = cast(Dict[str, str], self._secrets['salts'])
-        salt = salts['salt'].encode('utf-8')
-        pepper = salts['pepper'].encode('utf-8')
-        usernames = self._secrets.get('usernames')
-
         for field in self._encrypt_fields:
             if field not in row:
                 # Sparse tables may not contain every row
                 continue
 
-            if isinstance(usernames, list) and field.endswith('username'):
-                row[field] = self._convert_username(usernames, row[field])
-
-            if row[field] != str(0):
-                row[field] = Salt.encrypt(row[field].encode('utf-8'), salt, pepper)
+            row[field] = self._encryption.encrypt(field, row[field])
 
         row["encrypted"] = str(1)
         return row
@@ -137,22 +346,83 @@ class Table(Collection[Row]):
     def get(self) -> List[Row]:
         """
         Retrieve a copy of the table data.
+
+        Rows only contain string values, so copying each row suffices to make
+        the copy independent of the table.
+        """
+
+        return [row.copy() for row in self._data]
+
+    def rows(self) -> Sequence[Row]:
+        """
+        Retrieve a read-only view of the table data without copying it.
+
+        The view reflects later changes to the table. The rows in the view are
+        the rows stored in the table, so they must not be altered.
+        """
+
+        return Rows_View(self._data)
+
+    def drain(self) -> List[Row]:
+        """
+        Retrieve the table data without copying it and remove all the rows
+        from the table. The caller becomes the owner of the returned rows.
         """
 
-        return deepcopy(self._data)
+        data = self._data
+        self.clear()
+        return data
 
     def has(self, row: Row) -> bool:
         """
         Check whether the `row` (or a unique identifier contained within)
         already exists within the table.
 
-        The default `Table` implementation uses a slow linear comparison, but
-        subclasses may override this with other comparisons and searches using
-        identifiers in the row.
+        The default `Table` implementation uses a slow linear comparison unless
+        the table has a content index, but subclasses may override this with
+        other comparisons and searches using identifiers in the row.
         """
 
+        if self._index is not None:
+            return self._get_index_key(self._encrypt(row)) in self._index
+
         return self._encrypt(row) in self._data
 
+    @staticmethod
+    def _get_index_key(row: Row) -> Index_Key:
+        return frozenset(row.items())
+
+    def _add_index(self, row: Row, position: int) -> None:
+        if self._index is not None:
+            insort(self._index.setdefault(self._get_index_key(row), []),
+                   position)
+
+    def _remove_index(self, row: Row, position: int) -> None:
+        if self._index is not None:
+            key = self._get_index_key(row)
+            positions = self._index[key]
+            positions.remove(position)
+            if not positions:
+                del self._index[key]
+
+    def _find_position(self, row: Row) -> int:
+        """
+        Retrieve the position of the first row in the table that is equal to
+        the `row` after encryption.
+
+        Raises a `ValueError` if the row does not exist.
+        """
+
+        row = self._encrypt(row)
+        index = self._index
+        if index is None:
+            return self._data.index(row)
+
+        try:
+            return index[self._get_index_key(row)][0]
+        except KeyError as error:
+            raise ValueError('Row is not in table') from error
+
     def _fetch_row(self, row: Row) -> Row:
         """
         Retrieve a row from the table, and return it without copying.
@@ -162,8 +432,7 @@ class Table(Collection[Row]):
 
         # Actually get the real row so that values that compare equal between
         # the given row and our row are replaced.
-        index = self._data.index(self._encrypt(row))
-        return self._data[index]
+        return self._data[self._find_position(row)]
 
     def get_row(self, row: Row) -> Optional[Row]:
         """
@@ -194,10 +463,11 @@ class Table(Collection[Row]):
         """
 
         row = self._encrypt(row)
+        self._add_index(row, len(self._data))
         self._data.append(row)
         return row
 
-    def extend(self, rows: Sequence[Row]) -> Sequence[Optional[Row]]:
+    def extend(self, rows: Iterable[Row]) -> Sequence[Optional[Row]]:
         """
         Insert multiple rows at once into the table.
 
@@ -209,6 +479,9 @@ class Table(Collection[Row]):
         """
 
         extension = [self._encrypt(row) for row in rows]
+        for position, row in enumerate(extension, start=len(self._data)):
+            self._add_index(row, position)
+
         self._data.extend(extension)
         return extension
 
@@ -226,22 +499,42 @@ class Table(Collection[Row]):
         support changing identifiers.
         """
 
-        row = self._fetch_row(search_row)
+        if self._index is None:
+            row = self._fetch_row(search_row)
+            row.update(self._encrypt(update_row))
+            return
+
+        position = self._find_position(search_row)
+        row = self._data[position]
+        self._remove_index(row, position)
         row.update(self._encrypt(update_row))
+        self._add_index(row, position)
 
-    def write(self, folder: PathLike) -> None:
+    def write(self, folder: PathLike, indent: Optional[int] = 4,
+              lines: bool = False) -> None:
         """
         Export the table data into a file in the given `folder`.
+
+        The rows are written one by one as a JSON array with the given `indent`
+        level, or compact if `indent` is `None`. If `lines` is enabled, then
+        the rows are instead written in the JSON Lines format to a file with
+        the same name as the table's filename, except with a `.jsonl` suffix.
         """
 
         if self._merge_update:
-            self.load(folder)
+            self.load(folder, lines=lines)
 
+        with self._get_path(folder, lines).open('w', encoding='utf-8') as outfile:
+            write_rows(self._data, outfile, indent=indent, lines=lines)
+
+    def _get_path(self, folder: PathLike, lines: bool) -> Path:
         path = Path(folder, self._filename)
-        with path.open('w', encoding='utf-8') as outfile:
-            json.dump(self._data, outfile, indent=4)
+        if lines:
+            return path.with_suffix('.jsonl')
+
+        return path
 
-    def load(self, folder: PathLike) -> None:
+    def load(self, folder: PathLike, lines: bool = False) -> None:
         """
         Read the table data from the exported file in the given `folder`.
 
@@ -249,11 +542,18 @@ class Table(Collection[Row]):
         is appended to the in-memory table, i.e., it does not overwrite data
         already in memory. More specifically, key tables whose keys conflict
         will prefer the data in memory over the data loaded by this method.
+        If `lines` is enabled, then the data is read from the JSON Lines file
+        with a `.jsonl` suffix that `write` exports in that case.
         """
 
-        path = Path(folder, self._filename)
-        if path.exists():
-            with path.open('r', encoding='utf-8') as infile:
+        path = self._get_path(folder, lines)
+        if not path.exists():
+            return
+
+        with path.open('r', encoding='utf-8') as infile:
+            if lines:
+                self.extend(json.loads(line) for line in infile if line.strip())
+            else:
                 self.extend(json.load(infile))
 
     def clear(self) -> None:
@@ -261,7 +561,9 @@ class Table(Collection[Row]):
         Remove all rows from the table.
         """
 
-        self._data: List[Row] = []
+        self._data = []
+        if self._index is not None:
+            self._index = {}
 
     def __contains__(self, row: object) -> bool:
         if not isinstance(row, dict):
@@ -304,7 +606,7 @@ class Key_Table(Table):
         # If the key is both an encryption field and a username, then we may be
         # given an intermediate value, so encrypt the row and fetch based on
         # the encrypted key
-        if self._key.endswith('username') and self._secrets is not None and \
+        if self._key.endswith('username') and self._encryption is not None and \
             self._encrypt_fields is not None and \
             self._key in self._encrypt_fields:
             row = self._encrypt(row)
@@ -327,7 +629,7 @@ class Key_Table(Table):
 
         return new_row
 
-    def extend(self, rows: Sequence[Row]) -> Sequence[Optional[Row]]:
+    def extend(self, rows: Iterable[Row]) -> Sequence[Optional[Row]]:
         return [self.append(row) for row in rows]
 
     def update(self, search_row: Row, update_row: Row) -> None:
@@ -372,7 +674,7 @@ class Link_Table(Table):
         super().__init__(name, filename=filename, merge_update=merge_update,
                          encrypt_fields=encrypt_fields)
         self._link_keys = link_keys
-        if self._encrypt_fields is None or self._secrets is None:
+        if self._encrypt_fields is None or self._encryption is None:
             self._encrypt_link = False
             self._link_username = False
         else:
@@ -425,7 +727,7 @@ class Link_Table(Table):
 
         return new_row
 
-    def extend(self, rows: Sequence[Row]) -> Sequence[Optional[Row]]:
+    def extend(self, rows: Iterable[Row]) -> Sequence[Optional[Row]]:
         return [self.append(row) for row in rows]
 
     def update(self, search_row: Row, update_row: Row) -> None:
@@ -91,6 +91,14 @@ class Iterator_Limiter:
 
         return self._size
 
+    @property
+    def maximum(self) -> int:
+        """
+        Retrieve the hard limit of the number of items to iterate over.
+        """
+
+        return self._max
+
     @property
     def page(self) -> int:
         """
@@ -18,13 +18,16 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import json
 import logging
 from pathlib import Path, PurePath
-from typing import Dict, Iterable, List, Optional, Type, TYPE_CHECKING
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type, \
+    TYPE_CHECKING
 from .repo import RepositorySourceException, RepositoryDataException, \
     Version, Version_Control_Repository
-from ..table import Table
+from ..table import Table, write_rows
 from ..utils import Sprint_Data
 if TYPE_CHECKING:
     # pylint: disable=cyclic-import
@@ -34,6 +37,8 @@ else:
     Source = object
 
 Tables = Dict[str, List[Dict[str, str]]]
+Versions = List[Dict[str, str]]
+Result = Tuple[Version_Control_Repository, Optional[Versions], Optional[Version]]
 
 class Repositories_Holder:
     """
@@ -48,6 +53,7 @@ class Repositories_Holder:
 
         self._latest_versions: Dict[str, Version] = {}
         self._update_trackers: Dict[str, Dict[str, str]] = {}
+        self._tracker_lock = Lock()
 
     def _make_tracker_path(self, file_name: str) -> Path:
         return Path(self._project.export_key, f'{file_name}.json')
@@ -76,17 +82,18 @@ class Repositories_Holder:
         repository source name and update tracker data values (also strings).
         """
 
-        if file_name in self._update_trackers:
-            return self._update_trackers[file_name]
+        with self._tracker_lock:
+            if file_name in self._update_trackers:
+                return self._update_trackers[file_name]
 
-        path = self._make_tracker_path(file_name)
-        if path.exists():
-            with path.open('r', encoding='utf-8') as update_file:
-                self._update_trackers[file_name] = json.load(update_file)
-        else:
-            self._update_trackers[file_name] = {}
+            path = self._make_tracker_path(file_name)
+            if path.exists():
+                with path.open('r', encoding='utf-8') as update_file:
+                    self._update_trackers[file_name] = json.load(update_file)
+            else:
+                self._update_trackers[file_name] = {}
 
-        return self._update_trackers[file_name]
+            return self._update_trackers[file_name]
 
     def clear_update_tracker(self, file_name: str) -> None:
         """
@@ -162,35 +169,45 @@ class Repositories_Holder:
         """
 
         for source in self._project.sources:
-            repo_class = source.repository_class
-
             # Check if the source has version control repository functionality.
-            if repo_class is None:
+            if source.repository_class is None:
                 continue
 
-            self._init_tables(repo_class, tables)
+            self._init_tables(source.repository_class, tables)
+            repo = self._get_repository(source, force=force, pull=pull)
+            if repo is not None:
+                yield repo
 
-            if pull and self._check_up_to_date(source, repo_class):
-                continue
+    def _get_repository(self, source: Source, force: bool = False,
+                        pull: bool = True) -> Optional[Version_Control_Repository]:
+        repo_class = source.repository_class
+        if repo_class is None:
+            return None
 
-            path = PurePath(self._repo_directory, source.path_name)
-            try:
-                repo = repo_class.from_source(source, path,
-                                              project=self._project,
-                                              sprints=self._sprints,
-                                              force=force,
-                                              pull=pull)
-            except RepositorySourceException:
-                logging.exception('Cannot retrieve repository source for %s',
-                                  source.name)
-                continue
+        if pull and self._check_up_to_date(source, repo_class):
+            return None
 
-            self._check_update_trackers(repo, source.name)
+        path = PurePath(self._repo_directory, source.path_name)
+        try:
+            repo = repo_class.from_source(source, path,
+                                          project=self._project,
+                                          sprints=self._sprints,
+                                          force=force,
+                                          pull=pull)
+        except RepositorySourceException:
+            logging.exception('Cannot retrieve repository source for %s',
+                              source.name)
+            return None
 
-            if not repo.is_empty():
-                yield repo
+        self._check_update_trackers(repo, source.name)
+
+        if repo.is_empty():
+            return None
+
+        return repo
 
-    def process(self, force: bool = False, pull: bool = True) -> None:
+    def process(self, force: bool = False, pull: bool = True, jobs: int = 1,
+                indent: Optional[int] = 4, lines: bool = False) -> None:
         """
         Perform all actions required for retrieving updated commit data of all
         the repositories and exporting it to JSON. If `force` is set to `True`,
@@ -198,6 +215,13 @@ class Repositories_Holder:
         retrieved. If `pull` is set to `False`, then repositories are not
         updated locally is there already is a local state of the repository
         at the appropriate directory location.
+
+        If `jobs` is more than 1, then at most this number of repositories are
+        updated and have their data retrieved at the same time. The data is
+        still collected in the order of the sources of the project.
+
+        The exported data files are JSON arrays with the `indent` level, which
+        are compact if it is `None`, or JSON Lines files if `lines` is enabled.
         """
 
         self.load_latest_versions()
@@ -205,25 +229,61 @@ class Repositories_Holder:
         encrypt_fields = ('developer', 'developer_username', 'developer_email')
         versions = Table('vcs_versions', encrypt_fields=encrypt_fields)
         tables: Tables = {}
-        for repo in self.get_repositories(tables, force=force, pull=pull):
-            try:
-                self._process_repo(repo, versions, tables, force=force)
-            except (RepositorySourceException, RepositoryDataException):
-                logging.exception('Cannot retrieve repository data for %s',
-                                  repo.repo_name)
+        if jobs > 1:
+            results = self._retrieve_parallel(tables, force=force, pull=pull,
+                                              jobs=jobs)
+        else:
+            results = (
+                self._retrieve_repo(repo, force=force)
+                for repo in self.get_repositories(tables, force=force,
+                                                  pull=pull)
+            )
+
+        for repo, repo_versions, latest_version in results:
+            # Retrieve all tables from the repositories so that we know the
+            # names and overwrite old export files when there are no updates.
+            for table_name in repo.tables:
+                if table_name not in tables:
+                    tables[table_name] = []
+
+            if repo_versions is None or latest_version is None:
                 if force:
                     self._latest_versions.pop(repo.repo_name, None)
+            else:
+                self._process_repo(repo, repo_versions, latest_version,
+                                   versions, tables)
 
-        self._export(versions, tables)
-
-    def _process_repo(self, repo: Version_Control_Repository, versions: Table,
-                      tables: Tables, force: bool = False) -> None:
-        # Retrieve all tables from the repositories so that we know the
-        # names and overwrite old export files when there are no updates.
-        for table_name, table_data in repo.tables.items():
-            if table_name not in tables:
-                tables[table_name] = []
+        self._export(versions, tables, indent=indent, lines=lines)
 
+    def _retrieve_parallel(self, tables: Tables, force: bool = False,
+                           pull: bool = True, jobs: int = 1) -> Iterator[Result]:
+        sources: List[Source] = []
+        for source in self._project.sources:
+            if source.repository_class is not None:
+                self._init_tables(source.repository_class, tables)
+                sources.append(source)
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(self._retrieve_source, source, force=force,
+                                pull=pull)
+                for source in sources
+            ]
+            for future in futures:
+                result = future.result()
+                if result is not None:
+                    yield result
+
+    def _retrieve_source(self, source: Source, force: bool = False,
+                         pull: bool = True) -> Optional[Result]:
+        repo = self._get_repository(source, force=force, pull=pull)
+        if repo is None:
+            return None
+
+        return self._retrieve_repo(repo, force=force)
+
+    def _retrieve_repo(self, repo: Version_Control_Repository,
+                       force: bool = False) -> Result:
         repo_name = repo.repo_name
         logging.info('Processing repository %s', repo_name)
         latest_version: Optional[Version] = None
@@ -232,11 +292,23 @@ class Repositories_Holder:
 
         # Retrieve the versions and auxliary tables.
         skip_stats = repo.source.get_option('skip_stats')
-        versions.extend(repo.get_data(from_revision=latest_version, force=force,
-                                      stats=not skip_stats))
-        self._latest_versions[repo_name] = repo.get_latest_version()
+        try:
+            repo_versions = repo.get_data(from_revision=latest_version,
+                                          force=force, stats=not skip_stats)
+            return repo, repo_versions, repo.get_latest_version()
+        except (RepositorySourceException, RepositoryDataException):
+            logging.exception('Cannot retrieve repository data for %s',
+                              repo_name)
+            return repo, None, None
+
+    def _process_repo(self, repo: Version_Control_Repository,
+                      repo_versions: Versions, latest_version: Version,
+                      versions: Table, tables: Tables) -> None:
+        repo_name = repo.repo_name
+        versions.extend(repo_versions)
+        self._latest_versions[repo_name] = latest_version
         for table_name, table_data in repo.tables.items():
-            tables[table_name].extend(table_data.get())
+            tables[table_name].extend(table_data.drain())
 
         # Keep the new values of the auxiliary update trackers.
         for file_name, value in repo.update_trackers.items():
@@ -245,18 +317,20 @@ class Repositories_Holder:
 
             self._update_trackers[file_name][repo_name] = value
 
-    def _export(self, versions: Table, tables: Tables) -> None:
+    def _export(self, versions: Table, tables: Tables,
+                indent: Optional[int] = 4, lines: bool = False) -> None:
         """
         Export the version metadata, additional table metadata, and identifiers
         of the latest versions from the repositories to JSON files.
+
+        The data of the tables is streamed to the files with the given `indent`
+        level, or in the JSON Lines format if `lines` is enabled.
         """
 
-        versions.write(self._project.export_key)
+        versions.write(self._project.export_key, indent=indent, lines=lines)
 
         for table, table_data in tables.items():
-            table_path = Path(self._project.export_key, f'data_{table}.json')
-            with table_path.open('w', encoding='utf-8') as table_file:
-                json.dump(table_data, table_file, indent=4)
+            self._export_table(table, table_data, indent=indent, lines=lines)
 
         latest_path = self._make_tracker_path('latest_vcs_versions')
         with latest_path.open('w', encoding='utf-8') as latest_versions_file:
@@ -266,3 +340,10 @@ class Repositories_Holder:
             tracker_path = self._make_tracker_path(file_name)
             with tracker_path.open('w', encoding='utf-8') as tracker_file:
                 json.dump(repo_trackers, tracker_file)
+
+    def _export_table(self, table: str, table_data: List[Dict[str, str]],
+                      indent: Optional[int] = 4, lines: bool = False) -> None:
+        suffix = 'jsonl' if lines else 'json'
+        table_path = Path(self._project.export_key, f'data_{table}.{suffix}')
+        with table_path.open('w', encoding='utf-8') as table_file:
+            write_rows(table_data, table_file, indent=indent, lines=lines)
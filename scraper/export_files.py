@@ -129,7 +129,7 @@ class Exporter:
 
         agent_key = Configuration.get_agent_key()
 
-        session = Session(verify=cert)
+        session = Session.get_shared(url, verify=cert)
         request = session.post(url, data={
             "files": json.dumps({
                 "export": export,
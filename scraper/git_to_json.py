@@ -41,6 +41,13 @@ def parse_args() -> Namespace:
                         help="Delete and clone repository is pull fails")
     parser.add_argument("--no-pull", action="store_false", default=True,
                         dest="pull", help="Do not pull existing repositories")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of repositories to process at once")
+    parser.add_argument("--compact", action="store_const", const=None,
+                        default=4, dest="indent",
+                        help="Do not indent the exported JSON data")
+    parser.add_argument("--json-lines", action="store_true", default=False,
+                        dest="lines", help="Export data in JSON Lines format")
     Log_Setup.add_argument(parser)
     Log_Setup.add_upload_arguments(parser)
     args = parser.parse_args()
@@ -56,7 +63,8 @@ def main() -> None:
     project = Project(args.project, follow_host_change=args.follow_host_change)
 
     holder = Repositories_Holder(project, args.repos)
-    holder.process(force=args.force, pull=args.pull)
+    holder.process(force=args.force, pull=args.pull, jobs=args.jobs,
+                   indent=args.indent, lines=args.lines)
 
 if __name__ == "__main__":
     main()
@@ -21,7 +21,8 @@ limitations under the License.
 
 from argparse import ArgumentParser, ArgumentTypeError, Namespace
 from gatherer.config import Configuration
-from gatherer.jira import Jira, Updated_Time, Update_Tracker
+from gatherer.jira import Jira, Reference_Cache, Updated_Time, \
+    Update_Tracker
 from gatherer.log import Log_Setup
 from gatherer.domain import Project, source
 
@@ -56,6 +57,17 @@ def parse_args() -> Namespace:
     parser.add_argument("--updated-since", default=None, dest="updated_since",
                         type=validate_date,
                         help="Only fetch issues changed since the timestamp (YYYY-MM-DD HH:MM)")
+    parser.add_argument("--prefetch", type=int, default=4,
+                        help="Number of pages of issues to retrieve in advance")
+    parser.add_argument("--reference-cache", dest="reference_cache",
+                        default=None,
+                        help="Directory to cache reference data of the server")
+    parser.add_argument("--reference-ttl", dest="reference_ttl", type=int,
+                        default=Reference_Cache.DEFAULT_TTL,
+                        help="Seconds to use cached reference data")
+    parser.add_argument("--refresh-reference-data", action="store_true",
+                        dest="refresh_reference_data", default=False,
+                        help="Retrieve reference data instead of using cache")
     Log_Setup.add_argument(parser)
     args = parser.parse_args()
     Log_Setup.parse_args(args)
@@ -75,7 +87,13 @@ def main() -> None:
     jira = Jira(project, updated_since)
     jira_source = source.Jira('jira', url=args.server, name=args.project,
                               username=args.username, password=args.password)
-    latest_update = jira.process(jira_source, query=args.query)
+    reference_cache = Reference_Cache(jira_source.plain_url,
+                                      directory=args.reference_cache,
+                                      ttl=args.reference_ttl,
+                                      refresh=args.refresh_reference_data)
+    latest_update = jira.process(jira_source, query=args.query,
+                                 prefetch=args.prefetch,
+                                 reference_cache=reference_cache)
 
     tracker.save_updated_since(latest_update)
 
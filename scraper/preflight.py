@@ -89,7 +89,7 @@ def check_controller(host: str, cert: str, project: Project) -> List[str]:
 
     agent_key = Configuration.get_agent_key()
     url = f'https://{host}/auth/status.py?project={project.jira_key}&agent={agent_key}'
-    session = Session(verify=cert)
+    session = Session.get_shared(url, verify=cert)
     request = session.get(url)
 
     try:
@@ -0,0 +1,73 @@
+"""
+Test package for Git repository data extraction.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import subprocess
+from typing import List
+from git import Repo
+
+def make_history(path: str, count: int) -> Repo:
+    """
+    Create a synthetic Git repository at `path` with `count` commits on its
+    default branch. The history contains additions, modifications, renames,
+    deletions, binary files and merge commits.
+    """
+
+    repo = Repo.init(path)
+    lines: List[bytes] = []
+    for index in range(1, count + 1):
+        author = f'Dev {index % 7} <dev{index % 7}@gros.test> {1500000000 + index * 60} +0100'
+        message = f'Change {index}\n'.encode('utf-8')
+        lines.extend([
+            b'commit refs/heads/master',
+            f'mark :{index}'.encode('utf-8'),
+            f'author {author}'.encode('utf-8'),
+            f'committer {author}'.encode('utf-8'),
+            f'data {len(message)}'.encode('utf-8'),
+            message
+        ])
+        if index > 1:
+            lines.append(f'from :{index - 1}'.encode('utf-8'))
+        if index > 5 and index % 10 == 0:
+            lines.append(f'merge :{index - 5}'.encode('utf-8'))
+
+        content = ''.join(f'line {line} of {index}\n'
+                          for line in range(index % 5 + 1)).encode('utf-8')
+        lines.extend([
+            f'M 100644 inline src/module{index % 13}.py'.encode('utf-8'),
+            f'data {len(content)}'.encode('utf-8'),
+            content
+        ])
+        if index % 17 == 0:
+            lines.extend([
+                f'M 100644 inline data/blob{index}.bin'.encode('utf-8'),
+                b'data 4',
+                b'\x00\x01\x02\x03'
+            ])
+        if index % 23 == 0:
+            lines.append(f'R src/module{index % 13}.py docs/moved{index}.py'.encode('utf-8'))
+        if index % 29 == 0:
+            lines.append(f'D src/module{(index + 1) % 13}.py'.encode('utf-8'))
+
+        lines.append(b'')
+
+    subprocess.run(['git', 'fast-import', '--quiet'], cwd=path, check=True,
+                   input=b'\n'.join(lines))
+    repo.git.reset('--hard', 'master')
+    return repo
@@ -0,0 +1,108 @@
+"""
+Tests for module that handles access to a GitHub-based repository.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import datetime, timezone
+import unittest
+from unittest.mock import MagicMock
+import requests_mock
+from gatherer.git.github import GitHub_Repository
+from gatherer.utils import convert_local_datetime, format_date
+from .graphql import GraphQL_Replay
+
+class GitHubRepositoryTest(unittest.TestCase):
+    """
+    Tests for Git repository hosted by GitHub.
+    """
+
+    def setUp(self) -> None:
+        self.request = requests_mock.Mocker()
+        self.request.start()
+        self.addCleanup(self.request.stop)
+        GraphQL_Replay().register(self.request)
+
+        self.source = MagicMock(github_owner='owner', path_name='repo',
+                                github_api_url=GraphQL_Replay.URL,
+                                github_token=None)
+        self.source.name = 'repo'
+        self.source.get_option.side_effect = {'github_graphql': '1'}.get
+        self.repo = GitHub_Repository(self.source, 'repo')
+        self.repo.set_update_tracker('github_update',
+                                     format_date(convert_local_datetime(
+                                         datetime(2024, 4, 1, tzinfo=timezone.utc)
+                                     )))
+
+    def test_get_graphql_data(self) -> None:
+        """
+        Test retrieving pull requests and issues from the GraphQL API.
+        """
+
+        # pylint: disable=protected-access
+        self.repo._get_pull_requests()
+        self.repo._get_issues()
+        self.repo.set_latest_date()
+        # pylint: enable=protected-access
+
+        tables = self.repo.tables
+        self.assertEqual([
+            (row['id'], row['status'], row['author'], row['assignee'],
+             row['upvotes'], row['downvotes'])
+            for row in tables['merge_request'].get()
+        ], [
+            ('3', 'open', 'dependabot[bot]', '0', '1', '0'),
+            ('2', 'merged', 'ghost', 'dev', '1', '1')
+        ])
+
+        # Bot comments are not included as pull request notes.
+        self.assertEqual([
+            (row['merge_request_id'], row['note_id'])
+            for row in tables['merge_request_note'].get()
+        ], [('3', '301')])
+        self.assertEqual([
+            (row['merge_request_id'], row['note_id'], row['author'],
+             row['line'], row['end_line'], row['line_type'], row['file'])
+            for row in tables['commit_comment'].get()
+        ], [
+            ('3', '311', 'reviewer', '1', '3', 'new', 'gatherer/module.py'),
+            ('3', '312', 'ghost', '3', '4', 'old', 'gatherer/module.py')
+        ])
+        self.assertEqual([
+            (row['merge_request_id'], row['reviewer'], row['vote'])
+            for row in tables['merge_request_review'].get()
+        ], [('3', 'reviewer', '1'), ('2', 'reviewer', '-1'), ('2', 'maintainer', '1')])
+
+        # Pull requests are also added as issues with their comments.
+        self.assertEqual([
+            (row['id'], row['pull_request_id'], row['status'],
+             row['labels'], row['closed_by'])
+            for row in tables['github_issue'].get()
+        ], [
+            ('3', '3', 'open', '0', '0'),
+            ('2', '2', 'closed', '2', 'maintainer'),
+            ('4', '0', 'closed', '1', 'maintainer'),
+            ('5', '0', 'open', '0', '0')
+        ])
+        self.assertEqual([
+            (row['issue_id'], row['note_id'])
+            for row in tables['github_issue_note'].get()
+        ], [('3', '301'), ('3', '302'), ('4', '401')])
+
+        latest = datetime(2024, 4, 20, 12, 30, tzinfo=timezone.utc)
+        self.assertEqual(self.repo.update_trackers['github_update'],
+                         format_date(convert_local_datetime(latest)))
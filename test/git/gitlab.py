@@ -0,0 +1,166 @@
+"""
+Tests for module that handles access to a GitLab-based repository.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from itertools import islice
+import random
+import threading
+import time
+from typing import List, TypeVar
+import unittest
+from unittest.mock import MagicMock, patch
+from gatherer.git.gitlab import GitLab_Repository
+
+T = TypeVar('T')
+
+class GitLabRepositoryTest(unittest.TestCase):
+    """
+    Tests for Git repository hosted by a GitLab instance.
+    """
+
+    def setUp(self) -> None:
+        options = {'has_commit_comments': '1', 'gitlab_workers': '3'}
+        source = MagicMock(host='https://gitlab.test')
+        source.name = 'test-repo'
+        source.get_option.side_effect = options.get
+        self.repo = GitLab_Repository(source, 'test-repo')
+        self.project = MagicMock()
+        # pylint: disable-next=protected-access
+        self.repo._repo_project = self.project
+
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.random = random.Random(42)
+
+    def tearDown(self) -> None:
+        # pylint: disable-next=protected-access
+        GitLab_Repository._host_slots.clear()
+
+    def _list(self, values: List[T]) -> List[T]:
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.active, self.max_active)
+
+        time.sleep(self.random.random() * 0.01)
+        with self.lock:
+            self.active -= 1
+
+        return values
+
+    @staticmethod
+    def _make_note(index: int) -> MagicMock:
+        return MagicMock(id=index, author={'name': 'Dev', 'username': 'dev'},
+                         body=f'Note {index}', note=f'Comment {index}',
+                         path=None, line=None, line_type=None,
+                         created_at='2024-04-22T11:00:00.000Z')
+
+    def test_harvest(self) -> None:
+        """
+        Test retrieving related objects of items concurrently.
+        """
+
+        # pylint: disable-next=protected-access
+        results = list(self.repo._harvest(range(20),
+                                          lambda item: self._list([item] * item)))
+        self.assertEqual(results, [(item, [item] * item) for item in range(20)])
+        self.assertLessEqual(self.max_active, 3)
+
+        def _fail(item: int) -> List[int]:
+            if item == 5:
+                raise RuntimeError('Not found')
+
+            return self._list([item])
+
+        # pylint: disable-next=protected-access
+        harvest = self.repo._harvest(range(20), _fail)
+        self.assertEqual(list(islice(harvest, 5)),
+                         [(item, [item]) for item in range(5)])
+        with self.assertRaises(RuntimeError):
+            next(harvest)
+
+    def test_get_data(self) -> None:
+        """
+        Test retrieving merge requests with notes from the API.
+        """
+
+        requests = []
+        for index in range(1, 11):
+            request = MagicMock(id=index, assignee=None, title=f'MR {index}',
+                                description='', state='merged',
+                                source_branch='feature', target_branch='main',
+                                author={'name': 'Dev', 'username': 'dev'},
+                                upvotes=0, downvotes=0,
+                                created_at='2024-04-22T11:00:00.000Z',
+                                updated_at='2024-04-22T11:00:00.000Z')
+            notes = [self._make_note(index * 10 + note) for note in range(index % 4)]
+            request.notes.list.side_effect = lambda as_list, notes=notes: \
+                self._list(notes)
+            requests.append(request)
+
+        self.project.events.list.return_value = []
+        self.project.mergerequests.list.return_value = requests
+
+        with patch('gatherer.git.repo.Git_Repository.get_data',
+                   return_value=[]), \
+                patch.object(self.repo, 'fill_repo_table'):
+            self.repo.get_data()
+
+        self.assertEqual([row['id'] for row in self.repo.tables['merge_request'].get()],
+                         [str(index) for index in range(1, 11)])
+        self.assertEqual([
+            (row['merge_request_id'], row['note_id'])
+            for row in self.repo.tables['merge_request_note'].get()
+        ], [
+            (str(index), str(index * 10 + note))
+            for index in range(1, 11) for note in range(index % 4)
+        ])
+        self.assertLessEqual(self.max_active, 3)
+
+    def test_get_commit_comments(self) -> None:
+        """
+        Test retrieving commit comments of versions from the API.
+        """
+
+        comments = {
+            f'{index:040x}': [self._make_note(index * 10 + note)
+                              for note in range(index % 3)]
+            for index in range(20)
+        }
+
+        def _get_commit(commit_id: str, lazy: bool = False) -> MagicMock:
+            self.assertTrue(lazy)
+            commit = MagicMock()
+            commit.comments.list.side_effect = lambda as_list: \
+                self._list(comments[commit_id])
+            return commit
+
+        self.project.commits.get.side_effect = _get_commit
+        self.repo.get_commit_comments([
+            {'version_id': version} for version in comments
+        ])
+        self.assertEqual([
+            (row['commit_id'], row['comment'])
+            for row in self.repo.tables['commit_comment'].get()
+        ], [
+            (version, comment.note)
+            for version, version_comments in comments.items()
+            for comment in version_comments
+        ])
+        self.assertLessEqual(self.max_active, 3)
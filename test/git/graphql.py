@@ -0,0 +1,193 @@
+"""
+Tests for module that retrieves data from the GitHub GraphQL API.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import datetime, timezone
+import json
+from typing import Any, Dict, List
+import unittest
+import requests_mock
+from gatherer.git.graphql import GitHub_GraphQL, Comment, Review, User
+
+Replay = Dict[str, Any]
+
+class GraphQL_Replay:
+    """
+    Stub of a GraphQL API which replays canned responses to requests made
+    through a `requests_mock` mocker.
+
+    Each canned response has a `query` string that must occur in the GraphQL
+    query and `variables` which must have the same values in the request.
+    The requests are recorded in the `requests` list.
+    """
+
+    URL = 'https://api.github.test'
+
+    def __init__(self, filename: str = 'test/sample/github_graphql.json') -> None:
+        with open(filename, 'r', encoding='utf-8') as replay_file:
+            self.replays: List[Replay] = json.load(replay_file)
+
+        self.requests: List[Replay] = []
+
+    def register(self, mocker: requests_mock.Mocker) -> None:
+        """
+        Register the GraphQL API endpoint in the `mocker`.
+        """
+
+        mocker.post(f'{self.URL}/graphql', json=self.replay)
+
+    def replay(self, request: Any, _context: Any) -> Replay:
+        """
+        Retrieve the canned response for a GraphQL request.
+        """
+
+        body: Replay = request.json()
+        body['authorization'] = request.headers.get('Authorization')
+        self.requests.append(body)
+        variables = body.get('variables', {})
+        for replay in self.replays:
+            if replay['query'] in body['query'] and \
+                all(variables.get(key) == value
+                    for key, value in replay['variables'].items()):
+                response: Replay = replay['response']
+                return response
+
+        return {'errors': [{'message': 'No canned response for request'}]}
+
+class GitHubGraphQLTest(unittest.TestCase):
+    """
+    Tests for client for the GitHub GraphQL API.
+    """
+
+    def setUp(self) -> None:
+        self.request = requests_mock.Mocker()
+        self.request.start()
+        self.addCleanup(self.request.stop)
+        self.replay = GraphQL_Replay()
+        self.replay.register(self.request)
+        self.api = GitHub_GraphQL(self.replay.URL, token='secret')
+        self.since = datetime(2024, 4, 1, tzinfo=timezone.utc)
+
+    def test_url(self) -> None:
+        """
+        Test the URL of the GraphQL API endpoint.
+        """
+
+        self.assertEqual(GitHub_GraphQL('https://api.github.com').url,
+                         'https://api.github.com/graphql')
+        self.assertEqual(GitHub_GraphQL('https://github.test/api/v3/').url,
+                         'https://github.test/api/graphql')
+
+    def test_get_pull_requests(self) -> None:
+        """
+        Test retrieving pull requests with comments and reviews.
+        """
+
+        pull_requests = list(self.api.get_pull_requests('owner', 'repo',
+                                                        self.since))
+        self.assertEqual([pull_request.number for pull_request in pull_requests],
+                         [3, 2])
+
+        # The pull request with an older update is not retrieved.
+        self.assertEqual([request['variables']['cursor']
+                          for request in self.replay.requests
+                          if 'pullRequests' in request['query']],
+                         [None, 'PR2'])
+        self.assertEqual(self.replay.requests[0]['authorization'],
+                         'bearer secret')
+
+        bot_request = pull_requests[0]
+        self.assertEqual(bot_request.user, User('dependabot[bot]', 'Bot'))
+        self.assertEqual(bot_request.state, 'open')
+        self.assertFalse(bot_request.merged)
+        self.assertIsNone(bot_request.assignee)
+        self.assertIsNone(bot_request.closed_at)
+        self.assertEqual(bot_request.head.ref, 'dependabot/pip/requests')
+        self.assertEqual(bot_request.base.ref, 'main')
+        self.assertEqual(bot_request.updated_at,
+                         datetime(2024, 4, 20, 12, 30, tzinfo=timezone.utc))
+        self.assertEqual([comment.id for comment in bot_request.get_issue_comments()],
+                         [301, 302])
+        self.assertEqual(bot_request.get_issue_comments()[1].user,
+                         User('github-actions[bot]', 'Bot'))
+        self.assertEqual(bot_request.get_reviews(),
+                         [Review('APPROVED', User('reviewer', 'User'))])
+        self.assertEqual(bot_request.get_review_comments()[0], Comment(
+            id=311,
+            user=User('reviewer', 'User'),
+            body='Comment 311',
+            created_at=datetime(2024, 4, 20, 12, tzinfo=timezone.utc),
+            updated_at=datetime(2024, 4, 20, 12, tzinfo=timezone.utc),
+            path='gatherer/module.py',
+            commit_id='a1b2c3d4e5f60718293a4b5c6d7e8f9012345678',
+            position=2,
+            diff_hunk='@@ -1,2 +1,3 @@\n context\n+added'
+        ))
+        self.assertEqual(bot_request.get_review_comments()[1].user,
+                         User('ghost', 'User'))
+
+        merged_request = pull_requests[1]
+        self.assertEqual(merged_request.user, User('ghost', 'User'))
+        self.assertEqual(merged_request.state, 'closed')
+        self.assertTrue(merged_request.merged)
+        self.assertEqual(merged_request.assignee, User('dev', 'User'))
+        self.assertEqual(merged_request.closed_by, User('maintainer', 'User'))
+        self.assertEqual(merged_request.label_count, 2)
+        self.assertEqual([review.state for review in merged_request.get_reviews()],
+                         ['CHANGES_REQUESTED', 'APPROVED'])
+        self.assertEqual(merged_request.get_review_comments(), [])
+
+    def test_get_issues(self) -> None:
+        """
+        Test retrieving issues with comments.
+        """
+
+        issues = list(self.api.get_issues('owner', 'repo', self.since))
+        self.assertEqual([issue.number for issue in issues], [4, 5])
+        self.assertEqual(self.replay.requests[0]['variables']['since'],
+                         '2024-04-01T00:00:00Z')
+        self.assertEqual(issues[0].closed_by, User('maintainer', 'User'))
+        self.assertEqual(issues[0].label_count, 1)
+        self.assertEqual([comment.id for comment in issues[0].get_comments()],
+                         [401])
+        self.assertEqual(issues[0].get_comments(since=issues[0].updated_at),
+                         issues[0].comments)
+        self.assertEqual(issues[1].get_comments(), [])
+        request = self.request.last_request
+        if request is None: # pragma: no cover
+            self.fail('Expected a request to the GraphQL API to be made')
+        self.assertEqual(request.timeout, GitHub_GraphQL.TIMEOUT)
+
+        # Comments that are updated before the date are not included.
+        since = datetime(2024, 4, 16, tzinfo=timezone.utc)
+        issues = list(self.api.get_issues('owner', 'repo', since))
+        self.assertEqual([issue.number for issue in issues], [4, 5])
+        self.assertEqual(issues[0].get_comments(), [])
+
+    def test_query_errors(self) -> None:
+        """
+        Test performing a query which has errors in the result.
+        """
+
+        with self.assertRaisesRegex(RuntimeError, 'owner/missing'):
+            list(self.api.get_issues('owner', 'missing', self.since))
+
+        self.request.post(f'{self.replay.URL}/v2/graphql', status_code=404)
+        with self.assertRaises(RuntimeError):
+            GitHub_GraphQL(f'{self.replay.URL}/v2').query('{ viewer }', {})
@@ -0,0 +1,80 @@
+"""
+Tests for indexing which merge commits brought in commits of a Git branch.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import shutil
+import tempfile
+from typing import Optional
+import unittest
+from gatherer.git.merge import Merge_Index
+from . import make_history
+
+class MergeIndexTest(unittest.TestCase):
+    """
+    Tests for index of merge commits that brought in commits.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.repo = make_history(self.directory, 100)
+
+    def _get_merge(self, hexsha: str) -> Optional[str]:
+        merges = self.repo.git.rev_list(f'{hexsha}..HEAD', '--ancestry-path',
+                                        '--merges', '--reverse').splitlines()
+        return merges[0] if merges else None
+
+    def test_get_merge(self) -> None:
+        """
+        Test retrieving the earliest merge commit that has a commit as ancestor.
+        """
+
+        index = Merge_Index(self.repo)
+        self.assertEqual(len(index), 100)
+        for commit in self.repo.iter_commits('HEAD'):
+            self.assertIn(commit.hexsha, index)
+            self.assertEqual(index.get_merge(commit.hexsha),
+                             self._get_merge(commit.hexsha))
+
+    def test_exclude(self) -> None:
+        """
+        Test indexing only the commits that are not in an earlier range.
+        """
+
+        index = Merge_Index(self.repo, exclude='HEAD~50')
+        self.assertEqual(len(index), 50)
+        for commit in self.repo.iter_commits('HEAD~50..HEAD'):
+            self.assertEqual(index.get_merge(commit.hexsha),
+                             self._get_merge(commit.hexsha))
+
+        excluded = self.repo.commit('HEAD~50').hexsha
+        self.assertNotIn(excluded, index)
+        with self.assertRaises(KeyError):
+            index.get_merge(excluded)
+
+    def test_branch(self) -> None:
+        """
+        Test storing the branch names of merge commits.
+        """
+
+        index = Merge_Index(self.repo)
+        merge = self.repo.commit('HEAD').hexsha
+        self.assertIsNone(index.get_branch(merge))
+        index.set_branch(merge, 'feature')
+        self.assertEqual(index.get_branch(merge), 'feature')
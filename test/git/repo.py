@@ -0,0 +1,141 @@
+"""
+Tests for Git repository version information extraction.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from itertools import chain
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+import unittest
+from unittest.mock import patch
+from git import Commit, NULL_TREE
+from gatherer.domain import Source
+from gatherer.git.repo import Git_Repository
+from gatherer.version_control.repo import Change_Type, \
+    RepositoryDataException
+from . import make_history
+
+class GitRepositoryTest(unittest.TestCase):
+    """
+    Tests for Git repository.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.repo = make_history(self.directory, 60)
+
+    def _create_repo(self, processes: Optional[str] = None) -> Git_Repository:
+        def get_option(option: str) -> Optional[str]:
+            return processes if option == 'stats_processes' else None
+
+        source = Source.from_type('git', name='test-repo',
+                                  url='https://gitlab.test/group/test-repo.git')
+        patcher = patch.object(source, 'get_option', side_effect=get_option)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return Git_Repository(source, self.directory)
+
+    @staticmethod
+    def _get_change_paths(commit: Commit) -> List[Dict[str, str]]:
+        if commit.parents:
+            parent_diffs = [commit.diff(parent, R=True)
+                            for parent in commit.parents]
+        else:
+            parent_diffs = [commit.diff(NULL_TREE)]
+
+        files = commit.stats.files
+        rows = []
+        for diff in chain(*parent_diffs):
+            if diff.a_path != diff.b_path:
+                # Only renames without subdirectories in common occur
+                stat_file = f'{diff.a_path} => {diff.b_path}'
+            else:
+                stat_file = diff.a_path
+
+            # Changes against other parents of merges have no statistics
+            if stat_file not in files:
+                continue
+
+            rows.append({
+                'repo_name': 'test-repo',
+                'version_id': commit.hexsha,
+                'file': diff.b_path,
+                'change_type': Change_Type.from_label(diff.change_type).value,
+                'insertions': str(files[stat_file]['insertions']),
+                'deletions': str(files[stat_file]['deletions']),
+                'size': str(0 if diff.b_blob is None else diff.b_blob.size)
+            })
+
+        return rows
+
+    def test_get_versions(self) -> None:
+        """
+        Test retrieving versions with difference statistics.
+        """
+
+        repo = self._create_repo()
+        versions = repo.get_versions()
+        self.assertEqual(len(versions), 60)
+        change_paths = repo.tables['change_path'].get()
+        for version in versions:
+            commit = self.repo.commit(version['version_id'])
+            total = commit.stats.total
+            self.assertEqual(version['insertions'], str(total['insertions']))
+            self.assertEqual(version['deletions'], str(total['deletions']))
+            self.assertEqual(version['number_of_files'], str(total['files']))
+            self.assertEqual(version['number_of_lines'], str(total['lines']))
+            self.assertEqual(version['size'], str(commit.size))
+            self.assertEqual([
+                row for row in change_paths
+                if row['version_id'] == commit.hexsha
+            ], self._get_change_paths(commit))
+
+        without_stats = self._create_repo().get_versions(stats=False)
+        self.assertNotIn('insertions', without_stats[0])
+        self.assertEqual([version['version_id'] for version in without_stats],
+                         [version['version_id'] for version in versions])
+
+    @patch.object(Git_Repository, 'STATS_CHUNK_SIZE', 10)
+    def test_get_versions_processes(self) -> None:
+        """
+        Test retrieving versions with difference statistics from a pool of
+        processes.
+        """
+
+        reference = self._create_repo()
+        repo = self._create_repo(processes='2')
+        self.assertEqual(repo.get_versions(), reference.get_versions())
+        self.assertEqual(repo.tables['change_path'].get(),
+                         reference.tables['change_path'].get())
+
+    def test_collect_stats(self) -> None:
+        """
+        Test retrieving difference statistics of commits and stopping early.
+        """
+
+        repo = self._create_repo()
+        commits = [commit.hexsha for commit in self.repo.iter_commits('master')]
+        # pylint: disable-next=protected-access
+        stats = repo._collect_stats(commits)
+        self.assertIn('insertions', next(stats)[0])
+        stats.close()
+
+        with self.assertRaises(RepositoryDataException):
+            repo.get_versions(to_revision='0' * 40)
@@ -0,0 +1,178 @@
+"""
+Tests for streaming difference statistics of Git commits from log output.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from io import BytesIO
+import os
+import shutil
+import tempfile
+import time
+from typing import List
+import unittest
+from git import Commit, NULL_TREE
+from git.exc import GitCommandError
+from gatherer.git.stream import Change, Log_Parser, Raw_Stream
+from . import make_history
+
+class LogParserTest(unittest.TestCase):
+    """
+    Tests for parser of difference statistics and changed paths of commits.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.repo = make_history(self.directory, 100)
+        self.commits = list(self.repo.iter_commits('master'))
+
+    @staticmethod
+    def _get_changes(commit: Commit) -> List[Change]:
+        if commit.parents:
+            parent_diffs = [commit.diff(parent, R=True)
+                            for parent in commit.parents]
+        else:
+            parent_diffs = [commit.diff(NULL_TREE)]
+
+        return [
+            Change(diff.change_type, diff.a_path, diff.b_path,
+                   None if diff.b_blob is None else diff.b_blob.hexsha)
+            for diffs in parent_diffs for diff in diffs
+        ]
+
+    def test_get_stats(self) -> None:
+        """
+        Test retrieving line statistics against the first parent of commits.
+        """
+
+        parser = Log_Parser(self.repo, [commit.hexsha for commit in self.commits])
+        for commit in self.commits:
+            stats = parser.get_stats(commit.hexsha)
+            expected = commit.stats
+            self.assertEqual(stats.total, expected.total)
+            self.assertEqual(stats.files, {
+                path: {
+                    key: value for key, value in file_stats.items()
+                    if key in ('insertions', 'deletions', 'lines')
+                } for path, file_stats in expected.files.items()
+            })
+
+        parser.close()
+
+    def test_get_changes(self) -> None:
+        """
+        Test retrieving changed paths against all the parents of commits.
+        """
+
+        parser = Log_Parser(self.repo, [commit.hexsha for commit in self.commits])
+        for commit in self.commits:
+            self.assertEqual(parser.get_changes(commit.hexsha),
+                             self._get_changes(commit))
+
+        parser.close()
+
+    def test_out_of_order(self) -> None:
+        """
+        Test retrieving statistics for commits out of the provided order.
+        """
+
+        parser = Log_Parser(self.repo, [commit.hexsha for commit in self.commits])
+        last = self.commits[-1]
+        self.assertEqual(parser.get_stats(last.hexsha).total, {
+            'insertions': 0,
+            'deletions': 0,
+            'lines': 0,
+            'files': 0
+        })
+        self.assertEqual(parser.get_changes(last.hexsha), [])
+        parser.close()
+
+    def test_close(self) -> None:
+        """
+        Test finishing the processes after an error.
+        """
+
+        commits = [commit.hexsha for commit in self.commits[:5]]
+        parser = Log_Parser(self.repo, commits + ['0' * 40])
+        with self.assertRaises(GitCommandError):
+            parser.close()
+
+        with self.assertRaises(RuntimeError):
+            with Log_Parser(self.repo, commits) as parser:
+                parser.get_stats(commits[0])
+                raise RuntimeError('Stop early')
+
+        # pylint: disable=protected-access
+        self.assertIsNotNone(parser._numstat._process.proc.poll())
+        self.assertIsNotNone(parser._raw._process.proc.poll())
+
+        with Log_Parser(self.repo, commits) as parser:
+            for commit in commits:
+                parser.get_changes(commit)
+
+        self.assertEqual(parser._numstat._process.proc.returncode, 0)
+        self.assertEqual(parser._raw._process.proc.returncode, 0)
+        # pylint: enable=protected-access
+
+    def test_truncated(self) -> None:
+        """
+        Test parsing raw output that ends before the path of a change.
+        """
+
+        commit = self.commits[0]
+        stream = Raw_Stream(self.repo, [commit.hexsha])
+        self.addCleanup(stream.close)
+        meta = f':100644 100644 {"1" * 40} {"2" * 40} M'.encode('utf-8')
+        output = b'\x01' + commit.hexsha.encode('utf-8') + b'\n' + meta
+        # pylint: disable-next=protected-access
+        records = stream._parse(BytesIO(output + b'\x00file.txt\x00' + meta))
+        self.assertEqual(next(records),
+                         (commit.hexsha, Change('M', 'file.txt', 'file.txt',
+                                                '2' * 40)))
+        with self.assertRaisesRegex(ValueError, commit.hexsha):
+            next(records)
+
+    @unittest.skipUnless(os.environ.get('GATHERER_BENCHMARK'),
+                         'Set GATHERER_BENCHMARK to a number of commits')
+    def test_benchmark(self) -> None:
+        """
+        Compare the duration of streaming statistics from log output against
+        retrieving statistics for each commit object on a larger history.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            repo = make_history(directory,
+                                int(os.environ.get('GATHERER_BENCHMARK', 0)))
+            commits = list(repo.iter_commits('master'))
+
+            start = time.perf_counter()
+            for commit in commits:
+                commit.stats.total # pylint: disable=pointless-statement
+                self._get_changes(commit)
+            objects_duration = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with Log_Parser(repo, [commit.hexsha for commit in commits]) as parser:
+                for commit in commits:
+                    parser.get_stats(commit.hexsha)
+                    parser.get_changes(commit.hexsha)
+            stream_duration = time.perf_counter() - start
+
+        print(f'\n{len(commits)} commits: objects {objects_duration:.2f}s, '
+              f'stream {stream_duration:.2f}s')
+        self.assertLess(stream_duration, objects_duration)
@@ -0,0 +1,266 @@
+"""
+Tests for module that handles Team Foundation Server-based repositories.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple, Union
+import unittest
+from unittest.mock import patch
+from gatherer.git.tfs import TFS_Project, Work_Item_Mapping, Work_Item_Fields, \
+    Result
+from gatherer.table import Table
+from gatherer.vsts.parser import String_Parser, Int_Parser, Date_Parser, \
+    Unicode_Parser, Tags_Parser, Developer_Parser
+
+class TFSProjectTest(unittest.TestCase):
+    """
+    Tests for project using Git on a TFS or VSTS server.
+    """
+
+    def setUp(self) -> None:
+        self.project = TFS_Project('http://tfs.test', ('Collection', 'Project'),
+                                   'user', 'pass')
+
+    @staticmethod
+    def _get_page(url: str, params: Dict[str, str]) \
+            -> Tuple[Optional[Result], Optional[Exception]]:
+        if url.endswith('/missing'):
+            return None, RuntimeError('Not found')
+
+        skip = int(params['$skip'])
+        values = [
+            {'id': index} for index in range(skip, min(skip + 10, 35))
+        ]
+        return {'count': len(values), 'value': values}, None
+
+    def test_get_iterator(self) -> None:
+        """
+        Test retrieving paginated results with concurrent requests.
+        """
+
+        with patch.object(self.project, '_perform_request',
+                          side_effect=self._get_page) as request:
+            # pylint: disable-next=protected-access
+            values = self.project._get_iterator('git', 'pushes',
+                                                options={'size': 10},
+                                                project_collection=True)
+            self.assertEqual(list(values),
+                             [{'id': index} for index in range(35)])
+            skips = sorted(int(call.args[1]['$skip'])
+                           for call in request.call_args_list)
+            self.assertEqual(skips[:5], [0, 10, 20, 30, 40])
+            self.assertLessEqual(len(skips), 4 + TFS_Project.PAGE_WORKERS)
+
+            # pylint: disable-next=protected-access
+            missing = self.project._get_iterator('git', 'missing',
+                                                 project_collection=True)
+            with self.assertRaises(RuntimeError):
+                list(missing)
+
+            # pylint: disable-next=protected-access
+            empty = self.project._get_iterator('git', 'missing',
+                                               options='empty_on_error',
+                                               project_collection=True)
+            self.assertEqual(list(empty), [])
+
+    def test_get_continuation(self) -> None:
+        """
+        Test retrieving results that continue in next links.
+        """
+
+        batches = {
+            'start': {
+                'values': [{'id': 1}, {'id': 2}],
+                'isLastBatch': False,
+                'nextLink': 'second'
+            },
+            'second': {
+                'values': [{'id': 3}],
+                'isLastBatch': False,
+                'nextLink': 'third'
+            },
+            'third': {
+                'values': [],
+                'isLastBatch': True,
+                'nextLink': 'fourth'
+            },
+            'fourth': {
+                'values': [{'id': 4}],
+                'isLastBatch': True,
+                'nextLink': 'fifth'
+            }
+        }
+
+        def _get_batch(url: str, params: Dict[str, str]) \
+                -> Tuple[Optional[Result], Optional[Exception]]:
+            self.assertEqual(params, {'api-version': '3.0', 'fields': 'id'})
+            if url.endswith('workitemrevisions'):
+                return batches['start'], None
+            if url not in batches:
+                return None, RuntimeError('Not found')
+
+            return batches[url], None
+
+        with patch.object(self.project, '_perform_request',
+                          side_effect=_get_batch) as request:
+            # pylint: disable-next=protected-access
+            values = self.project._get_continuation('wit',
+                                                    'reporting/workitemrevisions',
+                                                    fields='id')
+            self.assertEqual(list(values),
+                             [{'id': 1}, {'id': 2}, {'id': 3}, {'id': 4}])
+            self.assertEqual(request.call_count, 4)
+
+            batches['second']['nextLink'] = 'missing'
+            # pylint: disable-next=protected-access
+            values = self.project._get_continuation('wit',
+                                                    'reporting/workitemrevisions',
+                                                    fields='id')
+            with self.assertRaises(RuntimeError):
+                list(values)
+
+class WorkItemMappingTest(unittest.TestCase):
+    """
+    Tests for mapping of fields of work item revisions.
+    """
+
+    def setUp(self) -> None:
+        self.tables = {'tfs_developer': Table('tfs_developer')}
+        parsers = [
+            String_Parser(), Int_Parser(), Date_Parser(), Unicode_Parser(),
+            Tags_Parser(), Developer_Parser(self.tables)
+        ]
+        self.types = {parser.type: parser for parser in parsers}
+        self.work_item_fields: Work_Item_Fields = {
+            'status': {'type': 'string', 'fields': ['System.State']},
+            'created_date': {
+                'type': 'timestamp',
+                'fields': ['System.CreatedDate']
+            },
+            'reporter': {'type': 'developer', 'fields': ['System.CreatedBy']},
+            'title': {'type': 'unicode', 'fields': ['System.Title']},
+            'labels': {'type': 'tags', 'fields': ['System.Tags']},
+            'priority': {
+                'type': 'integer',
+                'fields': ['Common.Priority', 'Custom.Priority']
+            },
+            'story_points': {
+                'type': 'integer',
+                'fields': ['Custom.Points', 'Common.StoryPoints']
+            },
+            'state': {'type': 'string', 'fields': ['System.State']}
+        }
+
+    def _parse(self, fields: Result) -> Dict[str, str]:
+        # Reference implementation which looks up each specification
+        row = {}
+        for target, properties in self.work_item_fields.items():
+            parser = self.types[str(properties['type'])]
+            for field in properties['fields']:
+                if field in fields:
+                    value = parser.parse(fields[field])
+                    if value is not None:
+                        row[target] = value
+                    break
+
+        return row
+
+    def _make_revisions(self, count: int) -> List[Result]:
+        values: Dict[str, List[Union[str, int]]] = {
+            'System.State': ['Active', 'Closed'],
+            'System.CreatedDate': ['2024-04-22T11:00:00.123Z'],
+            'System.CreatedBy': ['Dev <dev@tfs.test>', 'invalid'],
+            'System.Title': ['Title', 'Other title'],
+            'System.Tags': ['', 'a; b'],
+            'Common.Priority': [1, 2],
+            'Custom.Priority': [3],
+            'Custom.Points': [5],
+            'Common.StoryPoints': [8],
+            'System.Unknown': ['ignored']
+        }
+        generator = random.Random(42)
+        return [
+            {
+                field: generator.choice(options)
+                for field, options in values.items()
+                if generator.random() < 0.7
+            }
+            for _ in range(count)
+        ]
+
+    def test_fields(self) -> None:
+        """
+        Test retrieving the fields of work item revisions used by the mapping.
+        """
+
+        mapping = Work_Item_Mapping(self.work_item_fields, self.types)
+        self.assertEqual(mapping.fields, {
+            'System.State', 'System.CreatedDate', 'System.CreatedBy',
+            'System.Title', 'System.Tags', 'Common.Priority',
+            'Custom.Priority', 'Custom.Points', 'Common.StoryPoints'
+        })
+
+    def test_parse(self) -> None:
+        """
+        Test parsing fields of work item revisions.
+        """
+
+        mapping = Work_Item_Mapping(self.work_item_fields, self.types)
+        self.assertEqual(mapping.parse({
+            'Custom.Priority': 3,
+            'Common.Priority': 2,
+            'Common.StoryPoints': 8,
+            'System.State': 'Active',
+            'System.CreatedBy': 'invalid'
+        }), {
+            'priority': '2',
+            'story_points': '8',
+            'status': 'Active',
+            'state': 'Active'
+        })
+
+        for fields in self._make_revisions(500):
+            self.assertEqual(mapping.parse(fields), self._parse(fields))
+
+    @unittest.skipUnless(os.environ.get('GATHERER_BENCHMARK'),
+                         'Set GATHERER_BENCHMARK to a number of revisions')
+    def test_benchmark(self) -> None:
+        """
+        Compare the duration of parsing work item revisions with the compiled
+        mapping against looking up each field specification.
+        """
+
+        revisions = self._make_revisions(int(os.environ.get('GATHERER_BENCHMARK', 0)))
+        mapping = Work_Item_Mapping(self.work_item_fields, self.types)
+
+        start = time.perf_counter()
+        for fields in revisions:
+            self._parse(fields)
+        lookup_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for fields in revisions:
+            mapping.parse(fields)
+        mapping_duration = time.perf_counter() - start
+
+        print(f'\n{len(revisions)} revisions: lookup {lookup_duration:.2f}s, '
+              f'mapping {mapping_duration:.2f}s')
+        self.assertLess(mapping_duration, lookup_duration)
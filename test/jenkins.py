@@ -19,224 +19,13 @@ limitations under the License.
 """
 
 from configparser import RawConfigParser
-from typing import Optional, Tuple
 import unittest
 from unittest.mock import patch
 from requests.auth import HTTPBasicAuth
-import requests_mock
-from gatherer.jenkins import Base, Build, Jenkins, Job, Nodes, Node, \
-    NoneMapping, RequestException, View
-
-class NoneMappingTest(unittest.TestCase):
-    """
-    Tests for an empty mapping.
-    """
-
-    def test_properties(self) -> None:
-        """
-        Test various properties of the mapping.
-        """
-
-        mapping = NoneMapping()
-        self.assertIsNone(mapping['thing'])
-        with self.assertRaises(StopIteration):
-            next(iter(mapping))
-
-        self.assertEqual(len(mapping), 0)
-        self.assertNotIn('key', mapping)
-        self.assertEqual(repr(mapping), 'NoneMapping()')
-
-def _setup_jenkins(host: Optional[str] = None,
-                   protocol: str = 'http+mock://',
-                   jenkins: Optional[Jenkins] = None) -> \
-        Tuple[Jenkins, requests_mock.Adapter]:
-    # Create or obtain the Jenkins instance
-    if jenkins is None:
-        if host is None:
-            host = f'{protocol}jenkins.test'
-        jenkins = Jenkins(host)
-
-    # Set up adapter with crumb issuer route (just route it to a 404)
-    adapter = requests_mock.Adapter()
-    adapter.register_uri('GET', '/crumbIssuer/api/json', status_code=404)
-
-    # Extend to protocol matching
-    prefix = host
-    if prefix is not None and prefix.startswith(protocol):
-        prefix = protocol
-
-    # Mount on the host/protocol prefix
-    jenkins.mount(adapter, prefix=prefix)
-    return jenkins, adapter
-
-class BaseTest(unittest.TestCase):
-    """
-    Tests for base Jenkins object.
-    """
-
-    def setUp(self) -> None:
-        self.jenkins, self.adapter = _setup_jenkins()
-        self.base = Base(self.jenkins, self.jenkins.base_url)
-
-    def test_base_url(self) -> None:
-        """
-        Test retrieving the base URL.
-        """
-
-        self.assertEqual(self.base.base_url, 'http+mock://jenkins.test/')
-
-        base = Base(self.jenkins, None)
-        with self.assertRaises(ValueError):
-            self.assertIsNone(base.base_url)
-
-        params = Base(self.jenkins, {
-            'depth': '2',
-            'url': 'http+mock://jenkins.test/base/url/'
-        })
-        self.assertEqual(params.base_url, 'http+mock://jenkins.test/base/url/')
-
-    def test_query(self) -> None:
-        """
-        Test retrieving the query parameters.
-        """
-
-        self.assertEqual(self.base.query, {})
-
-        params = Base(self.jenkins, {
-            'depth': '2',
-            'url': 'http+mock://jenkins.test/base/url/'
-        })
-        self.assertEqual(params.query, {'depth': '2'})
-
-        # Query setter
-        params.query = {'url': 'really-important'}
-        self.assertEqual(params.query, {'url': 'really-important'})
-
-    def test_data(self) -> None:
-        """
-        Test retrieving the raw data from the API.
-        """
-
-        self.assertFalse(self.base.has_data)
-
-        matcher = self.adapter.register_uri('GET', '/api/json',
-                                            json={'foo': 'bar'})
-        self.assertEqual(self.base.data, {'foo': 'bar'})
-
-        self.assertTrue(self.base.has_data)
-        self.assertTrue(matcher.called_once)
-
-        self.adapter.reset()
-        matcher = self.adapter.register_uri('GET', '/api/json', status_code=404)
-
-        # The data is still cached, so any issues upstream do not affect us yet
-        self.assertEqual(self.base.data, {'foo': 'bar'})
-        self.assertFalse(matcher.called)
-
-        self.base.invalidate()
-
-        # After invalidation, the data becomes an empty mapping.
-        self.assertEqual(self.base.data, NoneMapping())
-        self.assertTrue(matcher.called_once)
-
-        # Other HTTP errors cause an exception
-        self.adapter.reset()
-        matcher = self.adapter.register_uri('GET', '/api/json', status_code=500)
-        self.base.invalidate()
-
-        with self.assertRaises(RequestException):
-            self.assertNotEqual(self.base.data, NoneMapping())
-        self.assertTrue(matcher.called_once)
-
-    def test_version(self) -> None:
-        """
-        Test retrieving the version number of the Jenkins instance.
-        """
-
-        matcher = self.adapter.register_uri('GET', '/api/json',
-                                            headers={'X-Jenkins': '1.2.3'},
-                                            json={'foo': 'bar'})
-        self.assertEqual(self.base.version, '1.2.3')
-
-        # The version remains cached.
-        self.assertEqual(self.base.version, '1.2.3')
-        self.assertTrue(matcher.called_once)
-
-    def test_instance(self) -> None:
-        """
-        Test retrieving the Jenkins instance.
-        """
-
-        self.assertEqual(self.base.instance, self.jenkins)
-        self.assertEqual(self.jenkins.instance, self.jenkins)
-
-    def test_exists(self) -> None:
-        """
-        Test retrieving whether the object exists on the Jenkins instance.
-        """
-
-        matcher = self.adapter.register_uri('GET', '/api/json',
-                                            json={'foo': 'bar'})
-
-        # By default, the object is assumed to exist.
-        self.assertTrue(self.base.exists)
-        self.assertFalse(matcher.called)
-
-        base = Base(self.jenkins, self.jenkins.base_url, exists=None)
-
-        # The existence is cached.
-        self.assertTrue(base.exists)
-        self.assertTrue(matcher.called_once)
-
-        base.invalidate()
-        matcher = self.adapter.register_uri('GET', '/api/json', status_code=404)
-        self.assertFalse(base.exists)
-
-    def test_delete(self) -> None:
-        """
-        Test deleting the object from the Jenkins instance.
-        """
-
-        with self.assertRaises(TypeError):
-            self.base.delete()
-
-        with patch.object(Base, 'DELETE_URL', new='doDelete'):
-            matcher = self.adapter.register_uri('POST', '/doDelete')
-            self.base.delete()
-            self.assertTrue(matcher.called_once)
-
-            self.adapter.reset()
-            matcher = self.adapter.register_uri('POST', '/doDelete',
-                                                status_code=500)
-
-            with self.assertRaises(RequestException):
-                self.base.delete()
-            self.assertTrue(matcher.called_once)
-
-    def test_comparison(self) -> None:
-        """
-        Test rich comparison equality, hash and other special methods.
-        """
-
-        same = Base(self.jenkins, 'http+mock://jenkins.test/')
-        other = Base(self.jenkins, 'http+mock://other.test')
-        self.assertTrue(self.base == same)
-        self.assertFalse(self.base == other)
-        self.assertFalse(self.base == 'http+mock://jenkins.test/')
-
-        self.assertFalse(self.base != same)
-        self.assertTrue(self.base != other)
-        self.assertTrue(self.base != 'http+mock://jenkins.test/')
-
-        self.assertTrue(self.base)
-
-        invalid = Base(self.jenkins, 'http+mock://jenkins.test/', exists=False)
-        self.assertFalse(invalid)
-
-        self.assertEqual(hash(self.base),
-                         hash(('http+mock://jenkins.test/',) * 2))
-
-        self.assertEqual(repr(self.base), "Base('http+mock://jenkins.test/')")
+from gatherer.jenkins import Build, Jenkins, Job, Nodes, Node, View
+from gatherer.jenkins_base import Object_Cache, RequestException
+from gatherer.request import Session
+from .jenkins_base import setup_jenkins
 
 class JenkinsTest(unittest.TestCase):
     """
@@ -244,7 +33,8 @@ class JenkinsTest(unittest.TestCase):
     """
 
     def setUp(self) -> None:
-        self.jenkins, self.adapter = _setup_jenkins()
+        self.addCleanup(Session.clear_shared)
+        self.jenkins, self.adapter = setup_jenkins()
 
     def test_from_config(self) -> None:
         """
@@ -258,7 +48,7 @@ class JenkinsTest(unittest.TestCase):
         config.set('jenkins', 'password', '-')
         config.set('jenkins', 'verify', '0')
         raw = Jenkins.from_config(config)
-        _setup_jenkins(jenkins=raw)
+        setup_jenkins(jenkins=raw)
         self.assertEqual(raw.base_url, 'https+mock://config.test/')
         self.assertFalse(raw.session.verify)
 
@@ -267,7 +57,7 @@ class JenkinsTest(unittest.TestCase):
         config.set('jenkins', 'password', 'jenkinspass')
         config.set('jenkins', 'verify', 'test/sample/invalid/path')
         auth = Jenkins.from_config(config)
-        _setup_jenkins(jenkins=auth)
+        setup_jenkins(jenkins=auth)
         self.assertTrue(auth.session.verify)
         self.assertEqual(auth.session.auth,
                          HTTPBasicAuth('jenkinsuser', 'jenkinspass'))
@@ -275,7 +65,7 @@ class JenkinsTest(unittest.TestCase):
         # Test certificate verification and crumb token retrieval
         config.set('jenkins', 'verify', 'certs/README.md')
         verify = Jenkins.from_config(config)
-        _, adapter = _setup_jenkins(jenkins=verify)
+        _, adapter = setup_jenkins(jenkins=verify)
         adapter.register_uri('GET', '/crumbIssuer/api/json', json={
             'crumbRequestField': 'X-Crumb',
             'crumb': 'my-token'
@@ -285,7 +75,7 @@ class JenkinsTest(unittest.TestCase):
 
         # Test crumb token retrieval with (temporary) error
         crumb_error = Jenkins.from_config(config)
-        _, adapter = _setup_jenkins(jenkins=crumb_error)
+        _, adapter = setup_jenkins(jenkins=crumb_error)
         adapter.register_uri('GET', '/crumbIssuer/api/json', status_code=500)
         self.assertNotIn('X-Crumb', crumb_error.session.headers)
 
@@ -337,6 +127,65 @@ class JenkinsTest(unittest.TestCase):
         self.assertEqual(self.jenkins.get_job('builder', url=query).query,
                          query)
 
+    def test_get_object(self) -> None:
+        """
+        Test retrieving an earlier Jenkins object with the same API URL.
+        """
+
+        # Jobs may change, so they are not reused.
+        job = self.jenkins.get_job('foo')
+        self.assertIsNot(self.jenkins.get_job('foo'), job)
+        self.assertEqual(self.jenkins.get_job('foo'), job)
+
+        build = Build(job, number=1, exists=None)
+        self.assertIs(self.jenkins.get_object(build), build)
+
+        # Builds are only reused once their data shows they are finished.
+        matcher = self.adapter.register_uri('GET', '/job/foo/1/api/json', [
+            {'json': {'number': 1, 'result': None, 'building': True}},
+            {'json': {'number': 1, 'result': 'SUCCESS', 'building': False}}
+        ])
+        self.assertTrue(build.building)
+        building = self.jenkins.get_object(Build(job, number=1, exists=None))
+        self.assertIsNot(building, build)
+        self.assertFalse(building.building)
+        self.assertIs(self.jenkins.get_object(Build(job, number=1,
+                                                    exists=None)),
+                      building)
+        self.assertIs(self.jenkins.get_object(Build(job, number=1)), building)
+        self.assertEqual(matcher.call_count, 2)
+
+        # A different state of existence replaces the earlier object.
+        missing = Build(job, number=1, exists=False)
+        self.assertIs(self.jenkins.get_object(missing), missing)
+
+        # Builds through permalinks are not reused.
+        last = Build(job, url=f'{job.base_url}lastBuild/', exists=None)
+        self.assertIs(self.jenkins.get_object(last), last)
+        self.adapter.register_uri('GET', '/job/foo/lastBuild/api/json',
+                                  json={'number': 2, 'building': False})
+        self.assertFalse(last.building)
+        self.assertIsNot(self.jenkins.get_object(Build(job,
+                                                       url=last.base_url,
+                                                       exists=None)),
+                         last)
+
+    @patch.object(Object_Cache, 'MAX_SIZE', 2)
+    def test_get_object_size(self) -> None:
+        """
+        Test limiting the number of remembered Jenkins objects.
+        """
+
+        job = self.jenkins.get_job('foo')
+        self.adapter.register_uri('GET', '/job/foo/1/api/json',
+                                  json={'number': 1, 'building': False})
+        build = self.jenkins.get_object(Build(job, number=1, exists=None))
+        self.assertFalse(build.building)
+        self.assertIs(self.jenkins.get_object(Build(job, number=1)), build)
+        self.jenkins.get_object(Build(job, number=2, exists=None))
+        self.jenkins.get_object(Build(job, number=3, exists=None))
+        self.assertIsNot(self.jenkins.get_object(Build(job, number=1)), build)
+
     def test_get_view(self) -> None:
         """
         Test retrieving a view from the Jenkins instance.
@@ -351,7 +200,7 @@ class NodesTest(unittest.TestCase):
     """
 
     def setUp(self) -> None:
-        self.jenkins, self.adapter = _setup_jenkins()
+        self.jenkins, self.adapter = setup_jenkins()
         self.nodes = Nodes(self.jenkins)
 
         data = {
@@ -393,7 +242,7 @@ class NodeTest(unittest.TestCase):
     """
 
     def setUp(self) -> None:
-        self.jenkins = _setup_jenkins()[0]
+        self.jenkins = setup_jenkins()[0]
         self.node = Node(self.jenkins, displayName='Test')
 
     def test_name(self) -> None:
@@ -431,7 +280,7 @@ class ViewTest(unittest.TestCase):
     """
 
     def setUp(self) -> None:
-        self.jenkins, self.adapter = _setup_jenkins()
+        self.jenkins, self.adapter = setup_jenkins()
         self.view = View(self.jenkins, name='MyTestView')
 
     def test_name(self) -> None:
@@ -480,7 +329,7 @@ class JobTest(unittest.TestCase):
     """
 
     def setUp(self) -> None:
-        self.jenkins, self.adapter = _setup_jenkins()
+        self.jenkins, self.adapter = setup_jenkins()
         self.job = Job(self.jenkins, name='test-job')
 
     def test_name(self) -> None:
@@ -643,9 +492,15 @@ class JobTest(unittest.TestCase):
                 }
             ]
         }
-        self.adapter.register_uri('GET', '/job/test-job/lastBuild/api/json',
-                                  json=build_data)
+        matcher = self.adapter.register_uri('GET',
+                                            '/job/test-job/lastBuild/api/json',
+                                            json=build_data)
         build, build_result = self.job.get_last_branch_build('main')
+        self.assertEqual(matcher.call_count, 1)
+        request = matcher.last_request
+        if request is None: # pragma: no cover
+            self.fail('Expected a request to the API to be made')
+        self.assertEqual(request.query, '')
         if build is None: # pragma: no cover
             self.fail('Excepted main build for test-job to not be None')
         self.assertEqual(build.base_url,
@@ -790,7 +645,7 @@ class BuildTest(unittest.TestCase):
     """
 
     def setUp(self) -> None:
-        self.jenkins, self.adapter = _setup_jenkins()
+        self.jenkins, self.adapter = setup_jenkins()
         self.job = Job(self.jenkins, name='test-job')
         self.build = Build(self.job, number=1)
 
@@ -820,6 +675,64 @@ class BuildTest(unittest.TestCase):
                        url='http+mock://jenkins.test/job/test-job/lastStableBuild')
         self.assertEqual(future.number, 0)
 
+    def test_tree(self) -> None:
+        """
+        Test retrieving the data that the properties read for the build.
+        """
+
+        self.assertEqual(self.build.tree, 'number,result,building')
+        matcher = self.adapter.register_uri('GET', '/job/test-job/1/api/json', [
+            {'json': {'number': 1, 'result': 'SUCCESS', 'building': False}},
+            {'json': {'number': 1, 'result': 'SUCCESS', 'actions': [{}]}}
+        ])
+        self.assertEqual(self.build.result, 'SUCCESS')
+        request = matcher.last_request
+        if request is None: # pragma: no cover
+            self.fail('Expected a request to the API to be made')
+        self.assertEqual(request.query,
+                         'tree=number%2cresult%2cbuilding')
+        self.assertEqual(len(self.build.data), 3)
+        self.assertEqual(matcher.call_count, 1)
+
+        # All the data is retrieved once when it is requested.
+        self.assertEqual(self.build.full_data['actions'], [{}])
+        request = matcher.last_request
+        if request is None: # pragma: no cover
+            self.fail('Expected a request to the API to be made')
+        self.assertEqual(request.query, '')
+        self.assertEqual(self.build.data['actions'], [{}])
+        self.assertEqual(self.build.full_data['actions'], [{}])
+        self.assertEqual(matcher.call_count, 2)
+        self.assertIsNone(self.build.data.get('building'))
+
+        # Looking up other data retrieves all the data as a fallback.
+        build = Build(self.job, number=2)
+        self.adapter.register_uri('GET', '/job/test-job/2/api/json', [
+            {'json': {'number': 2, 'result': None, 'building': True}},
+            {'json': {'number': 2, 'actions': []}}
+        ])
+        self.assertTrue(build.building)
+        self.assertEqual(build.data['actions'], [])
+
+        # Retrieving all the data at first does not use the tree.
+        build = Build(self.job, number=3)
+        matcher = self.adapter.register_uri('GET', '/job/test-job/3/api/json',
+                                            json={'number': 3, 'actions': []})
+        self.assertEqual(build.full_data['actions'], [])
+        self.assertEqual(build.number, 3)
+        request = matcher.last_request
+        if request is None: # pragma: no cover
+            self.fail('Expected a request to the API to be made')
+        self.assertEqual(request.query, '')
+        self.assertEqual(matcher.call_count, 1)
+
+        # Explicit query parameters are not altered.
+        build = Build(self.job, url={
+            'url': 'http+mock://jenkins.test/job/test-job/1/',
+            'depth': '1'
+        })
+        self.assertIsNone(build.tree)
+
     def test_comparison(self) -> None:
         """
         Test comparison methods of the build.
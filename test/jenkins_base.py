@@ -0,0 +1,305 @@
+"""
+Tests for module for the base of Jenkins API objects and caches of their
+data.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import Optional, Tuple
+import unittest
+from unittest.mock import patch
+import requests_mock
+from gatherer.jenkins import Jenkins, Job
+from gatherer.jenkins_base import Base, NoneMapping, RequestException, \
+    Response_Cache
+
+class NoneMappingTest(unittest.TestCase):
+    """
+    Tests for an empty mapping.
+    """
+
+    def test_properties(self) -> None:
+        """
+        Test various properties of the mapping.
+        """
+
+        mapping = NoneMapping()
+        self.assertIsNone(mapping['thing'])
+        with self.assertRaises(StopIteration):
+            next(iter(mapping))
+
+        self.assertEqual(len(mapping), 0)
+        self.assertNotIn('key', mapping)
+        self.assertEqual(repr(mapping), 'NoneMapping()')
+
+def setup_jenkins(host: Optional[str] = None,
+                  protocol: str = 'http+mock://',
+                  jenkins: Optional[Jenkins] = None) -> \
+        Tuple[Jenkins, requests_mock.Adapter]:
+    """
+    Create or set up a Jenkins instance with a mock adapter mounted on the
+    host or protocol prefix.
+    """
+
+    # Create or obtain the Jenkins instance
+    if jenkins is None:
+        if host is None:
+            host = f'{protocol}jenkins.test'
+        jenkins = Jenkins(host)
+
+    # Set up adapter with crumb issuer route (just route it to a 404)
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', '/crumbIssuer/api/json', status_code=404)
+
+    # Extend to protocol matching
+    prefix = host
+    if prefix is not None and prefix.startswith(protocol):
+        prefix = protocol
+
+    # Mount on the host/protocol prefix
+    jenkins.mount(adapter, prefix=prefix)
+    return jenkins, adapter
+
+class BaseTest(unittest.TestCase):
+    """
+    Tests for base Jenkins object.
+    """
+
+    def setUp(self) -> None:
+        self.jenkins, self.adapter = setup_jenkins()
+        self.base = Base(self.jenkins, self.jenkins.base_url)
+
+    def test_base_url(self) -> None:
+        """
+        Test retrieving the base URL.
+        """
+
+        self.assertEqual(self.base.base_url, 'http+mock://jenkins.test/')
+
+        base = Base(self.jenkins, None)
+        with self.assertRaises(ValueError):
+            self.assertIsNone(base.base_url)
+
+        params = Base(self.jenkins, {
+            'depth': '2',
+            'url': 'http+mock://jenkins.test/base/url/'
+        })
+        self.assertEqual(params.base_url, 'http+mock://jenkins.test/base/url/')
+
+    def test_query(self) -> None:
+        """
+        Test retrieving the query parameters.
+        """
+
+        self.assertEqual(self.base.query, {})
+
+        params = Base(self.jenkins, {
+            'depth': '2',
+            'url': 'http+mock://jenkins.test/base/url/'
+        })
+        self.assertEqual(params.query, {'depth': '2'})
+
+        # Query setter
+        params.query = {'url': 'really-important'}
+        self.assertEqual(params.query, {'url': 'really-important'})
+
+    def test_data(self) -> None:
+        """
+        Test retrieving the raw data from the API.
+        """
+
+        self.assertFalse(self.base.has_data)
+
+        matcher = self.adapter.register_uri('GET', '/api/json',
+                                            json={'foo': 'bar'})
+        self.assertEqual(self.base.data, {'foo': 'bar'})
+
+        self.assertTrue(self.base.has_data)
+        self.assertTrue(matcher.called_once)
+
+        self.adapter.reset()
+        matcher = self.adapter.register_uri('GET', '/api/json', status_code=404)
+
+        # The data is still cached, so any issues upstream do not affect us yet
+        self.assertEqual(self.base.data, {'foo': 'bar'})
+        self.assertFalse(matcher.called)
+
+        self.base.invalidate()
+
+        # After invalidation, the data becomes an empty mapping.
+        self.assertEqual(self.base.data, NoneMapping())
+        self.assertTrue(matcher.called_once)
+
+        # Other HTTP errors cause an exception
+        self.adapter.reset()
+        matcher = self.adapter.register_uri('GET', '/api/json', status_code=500)
+        self.base.invalidate()
+
+        with self.assertRaises(RequestException):
+            self.assertNotEqual(self.base.data, NoneMapping())
+        self.assertTrue(matcher.called_once)
+
+    def test_data_conditional(self) -> None:
+        """
+        Test retrieving the raw data from the API with conditional requests.
+        """
+
+        matcher = self.adapter.register_uri('GET', '/api/json', [
+            {
+                'json': {'foo': 'bar'},
+                'headers': {
+                    'ETag': '"abc"',
+                    'Last-Modified': 'Mon, 22 Apr 2024 11:00:00 GMT'
+                }
+            },
+            {'status_code': 304},
+            {'json': {'foo': 'baz'}}
+        ])
+        self.assertEqual(self.base.data, {'foo': 'bar'})
+        request = matcher.last_request
+        if request is None: # pragma: no cover
+            self.fail('Expected a request to the API to be made')
+        self.assertNotIn('If-None-Match', request.headers)
+
+        # Another object for the same URL revalidates the cached response.
+        other = Base(self.jenkins, self.jenkins.base_url)
+        self.assertEqual(other.data, {'foo': 'bar'})
+        request = matcher.last_request
+        if request is None: # pragma: no cover
+            self.fail('Expected a revalidation request to the API to be made')
+        self.assertEqual(request.headers['If-None-Match'], '"abc"')
+        self.assertEqual(request.headers['If-Modified-Since'],
+                         'Mon, 22 Apr 2024 11:00:00 GMT')
+
+        # Modified data without validators is not cached.
+        self.base.invalidate()
+        self.assertEqual(self.base.data, {'foo': 'baz'})
+        self.assertEqual(matcher.call_count, 3)
+        self.assertEqual(self.jenkins.responses.get_headers(self.base.api_url),
+                         {})
+
+    @patch.object(Response_Cache, 'MAX_SIZE', 1)
+    def test_data_conditional_size(self) -> None:
+        """
+        Test limiting the number of cached responses.
+        """
+
+        headers = {'ETag': '"abc"'}
+        self.adapter.register_uri('GET', '/api/json', json={'foo': 'bar'},
+                                  headers=headers)
+        self.adapter.register_uri('GET', '/job/foo/api/json', json={},
+                                  headers=headers)
+        self.assertEqual(self.base.data, {'foo': 'bar'})
+        self.assertEqual(self.jenkins.responses.get_headers(self.base.api_url),
+                         {'If-None-Match': '"abc"'})
+
+        job = Job(self.jenkins, name='foo', exists=None)
+        self.assertTrue(job.exists)
+        self.assertEqual(self.jenkins.responses.get_headers(self.base.api_url),
+                         {})
+        self.assertEqual(self.jenkins.responses.get_headers(job.api_url),
+                         {'If-None-Match': '"abc"'})
+
+    def test_version(self) -> None:
+        """
+        Test retrieving the version number of the Jenkins instance.
+        """
+
+        matcher = self.adapter.register_uri('GET', '/api/json',
+                                            headers={'X-Jenkins': '1.2.3'},
+                                            json={'foo': 'bar'})
+        self.assertEqual(self.base.version, '1.2.3')
+
+        # The version remains cached.
+        self.assertEqual(self.base.version, '1.2.3')
+        self.assertTrue(matcher.called_once)
+
+    def test_instance(self) -> None:
+        """
+        Test retrieving the Jenkins instance.
+        """
+
+        self.assertEqual(self.base.instance, self.jenkins)
+        self.assertEqual(self.jenkins.instance, self.jenkins)
+
+    def test_exists(self) -> None:
+        """
+        Test retrieving whether the object exists on the Jenkins instance.
+        """
+
+        matcher = self.adapter.register_uri('GET', '/api/json',
+                                            json={'foo': 'bar'})
+
+        # By default, the object is assumed to exist.
+        self.assertTrue(self.base.exists)
+        self.assertFalse(matcher.called)
+
+        base = Base(self.jenkins, self.jenkins.base_url, exists=None)
+
+        # The existence is cached.
+        self.assertTrue(base.exists)
+        self.assertTrue(matcher.called_once)
+
+        base.invalidate()
+        matcher = self.adapter.register_uri('GET', '/api/json', status_code=404)
+        self.assertFalse(base.exists)
+
+    def test_delete(self) -> None:
+        """
+        Test deleting the object from the Jenkins instance.
+        """
+
+        with self.assertRaises(TypeError):
+            self.base.delete()
+
+        with patch.object(Base, 'DELETE_URL', new='doDelete'):
+            matcher = self.adapter.register_uri('POST', '/doDelete')
+            self.base.delete()
+            self.assertTrue(matcher.called_once)
+
+            self.adapter.reset()
+            matcher = self.adapter.register_uri('POST', '/doDelete',
+                                                status_code=500)
+
+            with self.assertRaises(RequestException):
+                self.base.delete()
+            self.assertTrue(matcher.called_once)
+
+    def test_comparison(self) -> None:
+        """
+        Test rich comparison equality, hash and other special methods.
+        """
+
+        same = Base(self.jenkins, 'http+mock://jenkins.test/')
+        other = Base(self.jenkins, 'http+mock://other.test')
+        self.assertTrue(self.base == same)
+        self.assertFalse(self.base == other)
+        self.assertFalse(self.base == 'http+mock://jenkins.test/')
+
+        self.assertFalse(self.base != same)
+        self.assertTrue(self.base != other)
+        self.assertTrue(self.base != 'http+mock://jenkins.test/')
+
+        self.assertTrue(self.base)
+
+        invalid = Base(self.jenkins, 'http+mock://jenkins.test/', exists=False)
+        self.assertFalse(invalid)
+
+        self.assertEqual(hash(self.base),
+                         hash(('http+mock://jenkins.test/',) * 2))
+
+        self.assertEqual(repr(self.base), "Base('http+mock://jenkins.test/')")
@@ -277,3 +277,14 @@ class ChangelogTest(unittest.TestCase):
         # If the updated date is too recent, then no versions are collected.
         jira = Collector(self.project, updated_since='2024-04-23 11:23')
         self.assertEqual(jira.changelog.get_versions(self.issue, data), [])
+
+    def test_iter_versions(self) -> None:
+        """
+        Test generating the versions of the issue.
+        """
+
+        data = self.jira.collect_fields(self.issue)
+        versions = self.changelog.get_versions(self.issue, data)
+        iterator = self.changelog.iter_versions(self.issue, data)
+        self.assertEqual(next(iterator), versions[0])
+        self.assertEqual(list(iterator), versions[1:])
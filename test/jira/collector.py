@@ -18,8 +18,11 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Dict, Optional, Type, Union
+import json
+import os
+from typing import Any, Dict, List, Optional, Type, Union, cast
 from pathlib import Path
+import time
 import unittest
 from unittest.mock import patch, MagicMock, Mock
 from jira import Issue, JIRA, JIRAError
@@ -27,13 +30,13 @@ from jira.resources import IssueType, User
 from jira.resilientsession import ResilientSession
 from gatherer.domain.project import Project
 from gatherer.domain.source import Source, Jira
-from gatherer.jira.base import TableKey, Table_Source
+from gatherer.jira.base import Raw_Resource, TableKey, Table_Source
 from gatherer.jira.changelog import Changes
 from gatherer.jira.collector import Collector
 from gatherer.jira.field import Primary_Field, Property_Field, Payload_Field
-from gatherer.jira.special_field import Subtask_Field
+from gatherer.jira.special_field import Issue_Link_Field, Subtask_Field
 from gatherer.jira.update import Update_Tracker
-from gatherer.table import Table, Key_Table, Link_Table
+from gatherer.table import Table, Key_Table, Link_Table, Row
 
 class EmptyTableSource(Table_Source):
     """
@@ -206,6 +209,121 @@ class CollectorTest(unittest.TestCase):
 
         self.assertRegex(self.jira.search_fields, '.+,creator$')
 
+    def test_collect_fields(self) -> None:
+        """
+        Test extracting simple field data from one issue.
+        """
+
+        data = self.jira.collect_fields(self.issue)
+        self.assertEqual(data['issue_id'], '99')
+        self.assertEqual(data['key'], 'TEST-52')
+        self.assertEqual(data['created'], '2024-04-22 11:00:00')
+
+        # Fields registered later are extracted as well.
+        self.jira.register_issue_field('issue_key', {'primary': 'key'})
+        self.assertEqual(self.jira.collect_fields(self.issue)['issue_key'],
+                         'TEST-52')
+
+    def test_collect_fields_lookup(self) -> None:
+        """
+        Test that extracting field data from an issue provides the same data
+        as parsing each registered field of the issue.
+        """
+
+        with open('jira_fields.json', 'r', encoding='utf-8') as fields_file:
+            names = list(json.load(fields_file).keys())
+
+        expected: Dict[str, str] = {}
+        for name in names:
+            try:
+                field = self.jira.get_issue_field(name)
+            except KeyError:
+                continue
+
+            value = field.parse(self.issue)
+            if value is not None:
+                expected[name] = value
+
+        self.assertEqual(self.jira.collect_fields(self.issue), expected)
+
+    TABLES = (
+        'issue', 'developer', 'sprint', 'fixVersion', 'issuetype', 'priority',
+        'resolution', 'status', 'status_category', 'test_execution',
+        'ready_status', 'comments', 'issue_component', 'issuelinks',
+        'subtasks'
+    )
+
+    @staticmethod
+    def _load_issues() -> List[Dict[str, Any]]:
+        with open('test/sample/jira_search.json', 'r',
+                  encoding='utf-8') as search_file:
+            issues: List[Dict[str, Any]] = json.load(search_file)['issues']
+
+        return issues
+
+    def _collect_tables(self, issues: List[Issue]) -> Dict[str, List[Row]]:
+        jira = Collector(self.project)
+        link_field = jira.get_issue_field('issuelinks')
+        if not isinstance(link_field, Issue_Link_Field): # pragma: no cover
+            self.fail('Invalid issue link field')
+        query = MagicMock()
+        query.api.issue_link_types.return_value = [
+            Raw_Resource({'id': '10000', 'name': 'Blocks',
+                          'inward': 'is blocked by', 'outward': 'blocks'})
+        ]
+        link_field.prefetch(query)
+
+        for issue in issues:
+            data = jira.collect_fields(issue)
+            jira.get_table('issue').extend(jira.changelog.iter_versions(issue,
+                                                                        data))
+
+        return {name: jira.get_table(name).get() for name in self.TABLES}
+
+    def test_collect_raw(self) -> None:
+        """
+        Test that extracting field data and versions from raw JSON issue data
+        provides the same data as from issue resources.
+        """
+
+        issues = self._load_issues()
+        session = ResilientSession()
+        expected = self._collect_tables([
+            Issue({}, session, issue) for issue in issues
+        ])
+        self.assertEqual(len(expected['issue']), 12)
+        self.assertNotEqual(expected['comments'], [])
+        self.assertEqual(self._collect_tables([
+            cast(Issue, Raw_Resource(issue)) for issue in issues
+        ]), expected)
+
+    @unittest.skipUnless(os.environ.get('GATHERER_BENCHMARK'),
+                         'Set GATHERER_BENCHMARK to a number of issues')
+    def test_benchmark(self) -> None:
+        """
+        Compare the duration of collecting field data and versions from issue
+        resources against raw JSON issue data.
+        """
+
+        sample = self._load_issues()
+        count = int(os.environ.get('GATHERER_BENCHMARK', 0))
+        issues = [sample[index % len(sample)] for index in range(count)]
+        session = ResilientSession()
+
+        start = time.perf_counter()
+        self._collect_tables([Issue({}, session, issue) for issue in issues])
+        resource_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self._collect_tables([
+            cast(Issue, Raw_Resource(issue)) for issue in issues
+        ])
+        raw_duration = time.perf_counter() - start
+
+        print(f'\n{len(issues)} issues: resources {resource_duration:.2f}s, '
+              f'raw {raw_duration:.2f}s')
+        self.assertLess(raw_duration, resource_duration)
+
     @patch('gatherer.jira.query.Query', autospec=True)
     def test_search_issues(self, query_class: MagicMock) -> None:
         """
@@ -263,7 +381,8 @@ class CollectorTest(unittest.TestCase):
 
         self.assertEqual(self.jira.process(jira, 'test=1'),
                          '2024-04-22 11:00:00')
-        query_class.assert_called_once_with(self.jira, jira, 'test=1')
+        query_class.assert_called_once_with(self.jira, jira, 'test=1',
+                                            prefetch=0, reference_cache=None)
 
         exporter.assert_called_once_with()
 
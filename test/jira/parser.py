@@ -19,6 +19,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import tempfile
 from typing import Union
 import unittest
 from unittest.mock import MagicMock, Mock
@@ -33,6 +34,7 @@ from gatherer.jira.parser import String_Parser, Int_Parser, ID_Parser, \
     Version_Parser, Rank_Parser, Issue_Key_Parser, Flag_Parser, Labels_Parser, \
     Project_Parser
 from gatherer.jira.query import Query
+from gatherer.jira.reference import Reference_Cache
 
 class FieldParserTest(unittest.TestCase):
     """
@@ -161,6 +163,7 @@ class SprintParserTest(FieldParserTest):
         session = ResilientSession()
 
         query = MagicMock(spec=Query)
+        query.reference_cache = Reference_Cache('https://jira.test')
         attrs = {
             'boards.return_value': [
                 Board({}, session, {
@@ -224,6 +227,43 @@ class SprintParserTest(FieldParserTest):
         parser.prefetch(query)
         self.assertEqual(table.get(), [])
 
+    def test_prefetch_cache(self) -> None:
+        """
+        Test retrieving data about sprints of boards that are shared between
+        projects from a reference data cache.
+        """
+
+        session = ResilientSession()
+        query = MagicMock(spec=Query)
+        attrs = {
+            'boards.return_value': [
+                Board({}, session, {'self': '', 'type': 'scrum', 'id': 123})
+            ],
+            'sprints.return_value': [
+                Sprint({}, session, {
+                    'self': '',
+                    'id': 90,
+                    'name': 'Sprint #0',
+                    'startDate': '2024-03-28T12:00:19Z',
+                    'endDate': '2024-04-12T12:01:02Z',
+                    'originBoardId': 123
+                })
+            ]
+        }
+        query.api.configure_mock(**attrs)
+        with tempfile.TemporaryDirectory() as directory:
+            query.reference_cache = Reference_Cache('https://jira.test',
+                                                    directory=directory)
+            Sprint_Parser(self.jira).prefetch(query)
+
+            other = Collector(Project('EX'))
+            Sprint_Parser(other).prefetch(query)
+
+        query.api.sprints.assert_called_once_with(123, maxResults=False)
+        self.assertEqual(other.get_table('sprint').get(),
+                         self.jira.get_table('sprint').get())
+        self.assertEqual(len(other.get_table('sprint')), 1)
+
     def test_parse(self) -> None:
         """
         Test parsing an issue field or changelog value.
@@ -422,6 +462,7 @@ class VersionParserTest(FieldParserTest):
         parser = Version_Parser(self.jira)
 
         query = MagicMock(spec=Query)
+        query.reference_cache = Reference_Cache('https://jira.test')
         session = ResilientSession()
         version = Version({}, session, {
             'self': '',
@@ -542,6 +583,7 @@ class ProjectParserTest(FieldParserTest):
         self.project = Project('TEST')
         self.jira = Collector(self.project)
         self.query = MagicMock(spec=Query)
+        self.query.reference_cache = Reference_Cache('https://jira.test')
         session = ResilientSession()
         attrs = {
             'projects.return_value': [
@@ -66,14 +66,20 @@ class QueryTest(unittest.TestCase):
         Test retrieving a batch of issue results.
         """
 
+        self.api.search_issues.return_value = {
+            'total': 1,
+            'issues': [{'id': '1', 'key': 'TEST-1', 'fields': {'summary': 'Test'}}]
+        }
         result = self.query.perform_batched_query(True)
-        self.assertEqual(result, self.api.search_issues.return_value)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0].key, 'TEST-1')
+        self.assertEqual(result[0].fields.summary, 'Test')
         self.api.search_issues.assert_called_once()
         self.assertEqual(self.api.search_issues.call_args.args[0], self.jql)
         self.assertEqual(self.api.search_issues.call_args.kwargs['startAt'], 0)
         self.assertEqual(self.api.search_issues.call_args.kwargs['expand'],
                          'attachment,changelog')
-        self.assertFalse(self.api.search_issues.call_args.kwargs['json_result'])
+        self.assertTrue(self.api.search_issues.call_args.kwargs['json_result'])
         latest_update = self.query.latest_update
         self.assertNotEqual(latest_update, Update_Tracker.NULL_TIMESTAMP)
 
@@ -81,3 +87,33 @@ class QueryTest(unittest.TestCase):
         self.assertEqual(self.query.perform_batched_query(False), [])
         self.api.search_issues.assert_not_called()
         self.assertEqual(self.query.latest_update, latest_update)
+
+    def test_prefetch(self) -> None:
+        """
+        Test retrieving batches of issue results with prefetched pages.
+        """
+
+        pages = {
+            start: {'total': 250, 'issues': [{'id': str(start)}]}
+            for start in range(0, 300, 100)
+        }
+        attrs = {
+            'search_issues.side_effect':
+                lambda jql, startAt, **kwargs: pages[startAt]
+        }
+        self.api.configure_mock(**attrs)
+
+        query = Query(self.jira, self.source, prefetch=2)
+        for start in ('0', '100', '200'):
+            self.assertEqual([
+                issue.id for issue in query.perform_batched_query(True)
+            ], [start])
+            query.update()
+
+        query.close()
+
+        self.assertEqual(sorted(call.kwargs['startAt']
+                                for call in self.api.search_issues.call_args_list),
+                         [0, 100, 200])
+        for call in self.api.search_issues.call_args_list:
+            self.assertEqual(call.kwargs['maxResults'], 100)
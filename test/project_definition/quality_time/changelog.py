@@ -0,0 +1,127 @@
+"""
+Tests for cache of changes to metrics from the changelog of a Quality-time
+server.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+from gatherer.project_definition.quality_time.changelog import Change, \
+    Changelog_Cache
+
+class ChangelogCacheTest(unittest.TestCase):
+    """
+    Tests for cache of processed changelog entries of metrics.
+    """
+
+    @staticmethod
+    def _make_change(day: int) -> Change:
+        return Change(f'2024-05-{day:02d}T12:00:00+00:00',
+                      datetime(2024, 5, day, 12, tzinfo=timezone.utc),
+                      {'parameter_key': 'target', 'user': 'Dev',
+                       'old_value': str(day - 1), 'new_value': str(day)},
+                      'dev@example.test')
+
+    @staticmethod
+    def _make_date(day: int) -> datetime:
+        return datetime(2024, 5, day, tzinfo=timezone.utc)
+
+    def test_get(self) -> None:
+        """
+        Test retrieving changes of a metric from the cache.
+        """
+
+        cache = Changelog_Cache()
+        self.assertIsNone(cache.get('metric', self._make_date(1),
+                                    self._make_date(10)))
+
+        cache.update('metric', [self._make_change(day) for day in (7, 3, 5)],
+                     self._make_date(2), self._make_date(8))
+        self.assertEqual(cache.get('metric', self._make_date(2),
+                                   self._make_date(8)),
+                         [self._make_change(day) for day in (7, 5, 3)])
+        self.assertEqual(cache.get('metric', self._make_date(4),
+                                   self._make_date(6)),
+                         [self._make_change(5)])
+
+        # Changes before the complete period or after the last update are not
+        # known in the cache.
+        self.assertIsNone(cache.get('metric', self._make_date(1),
+                                    self._make_date(8)))
+        self.assertIsNone(cache.get('metric', self._make_date(2),
+                                    self._make_date(9)))
+        self.assertIsNone(cache.get('other', self._make_date(2),
+                                    self._make_date(8)))
+
+    def test_update(self) -> None:
+        """
+        Test storing changes of a metric in the cache.
+        """
+
+        cache = Changelog_Cache()
+        cache.update('metric', [self._make_change(3)], self._make_date(2),
+                     self._make_date(4))
+
+        # Overlapping periods are combined.
+        cache.update('metric', [self._make_change(5), self._make_change(3)],
+                     self._make_date(3), self._make_date(6))
+        self.assertEqual(cache.get('metric', self._make_date(2),
+                                   self._make_date(6)),
+                         [self._make_change(5), self._make_change(3)])
+
+        # A complete changelog extends the period to all changes.
+        cache.update('metric', [self._make_change(7)], None, self._make_date(8))
+        self.assertEqual(cache.get('metric', self._make_date(1),
+                                   self._make_date(8)),
+                         [self._make_change(day) for day in (7, 5, 3)])
+
+        # Disjoint periods replace the earlier changes.
+        cache.update('metric', [self._make_change(20)], self._make_date(15),
+                     self._make_date(21))
+        self.assertIsNone(cache.get('metric', self._make_date(1),
+                                    self._make_date(21)))
+        self.assertEqual(cache.get('metric', self._make_date(15),
+                                   self._make_date(21)),
+                         [self._make_change(20)])
+
+    def test_write(self) -> None:
+        """
+        Test writing the cache to a file and reading it again.
+        """
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory, 'cache', 'changelog.json')
+            cache = Changelog_Cache(path)
+            cache.write()
+            self.assertFalse(path.exists())
+
+            cache.update('metric', [self._make_change(3)], None,
+                         self._make_date(4))
+            cache.write()
+            self.assertEqual(Changelog_Cache(path).get('metric',
+                                                       self._make_date(1),
+                                                       self._make_date(4)),
+                             [self._make_change(3)])
+
+            path.write_text('{"metric": {"since": "invalid"}}', encoding='utf-8')
+            with self.assertLogs(level='WARNING'):
+                self.assertIsNone(Changelog_Cache(path).get('metric',
+                                                            self._make_date(1),
+                                                            self._make_date(4)))
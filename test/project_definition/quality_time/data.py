@@ -23,6 +23,7 @@ from copy import deepcopy
 from datetime import datetime
 import json
 from pathlib import Path
+from tempfile import TemporaryDirectory
 import unittest
 from unittest.mock import patch, MagicMock
 import dateutil.tz
@@ -31,6 +32,7 @@ import requests_mock
 from gatherer.domain.project import Project
 from gatherer.domain.source import Source
 from gatherer.project_definition.base import MetricNames
+from gatherer.project_definition.quality_time.changelog import Changelog_Cache
 from gatherer.project_definition.quality_time.data import Quality_Time_Data
 from gatherer.utils import convert_local_datetime, format_date, get_utc_datetime
 
@@ -155,6 +157,12 @@ class SonarDataTest(unittest.TestCase):
         url = f'https://qt.test/api/internal/changelog/metric/{metric_uuid}/10'
         self.request.get(url, json=response)
 
+        # The report changelog does not indicate the metrics of the changes,
+        # so the metric changelog is used.
+        report_uuid = '818b0b22-1bac-45b9-9f4d-ad898a7c47e0'
+        report_url = f'https://qt.test/api/internal/changelog/report/{report_uuid}/10'
+        self.request.get(report_url, json=response)
+
         version = {'version_id': '2024-05-04T13:45:00+00:00'}
         metrics = {
             metric_uuid: {
@@ -176,6 +184,9 @@ class SonarDataTest(unittest.TestCase):
 
         versions = self.data.adjust_target_versions(version, deepcopy(metrics))
         self.assertEqual(len(versions), 4)
+        self.assertEqual([request.path for request in self.request.request_history],
+                         [f'/api/internal/changelog/report/{report_uuid}/10',
+                          f'/api/internal/changelog/metric/{metric_uuid}/10'])
 
         self.assertEqual(versions[0][0], {
             "developer": "Jane Doe",
@@ -232,11 +243,103 @@ class SonarDataTest(unittest.TestCase):
                                                     from_revision=end_date)
         self.assertEqual(len(versions), 0)
 
+        # The changes are cached.
+        self.assertEqual(self.request.call_count, 2)
+
         # If the request has an error, then a RuntimeError is raised.
+        self.data.changelog_cache = Changelog_Cache()
         self.request.get(url, exc=ConnectError)
         with self.assertRaises(RuntimeError):
             self.data.adjust_target_versions(version, metrics)
 
+    def _register_report_changelog(self, report_uuid: str, metric_uuid: str,
+                                   other_uuid: str) -> None:
+        # Register a report changelog with changes of two metrics
+        response_path = Path('test/sample/quality-time_changelog.json')
+        with response_path.open('r', encoding='utf-8') as response_file:
+            response = json.load(response_file)
+
+        for change in response['changelog']:
+            change['uuids'] = [report_uuid, metric_uuid]
+        response['changelog'].insert(2, {
+            'delta': "John Doe changed the target of metric 'Tests' of "
+                     "subject 'Quality-time' in report 'Quality-time' from "
+                     "'100' to '200'.",
+            'email': 'johndoe@example.test',
+            'timestamp': '2024-05-04T13:39:25+00:00',
+            'uuids': [report_uuid, other_uuid]
+        })
+        report_url = f'https://qt.test/api/internal/changelog/report/{report_uuid}/20'
+        self.request.get(report_url, json=response)
+
+    def test_adjust_report_versions(self) -> None:
+        """
+        Test updating metric target version information using the changelog
+        of the report and a persistent cache of changes.
+        """
+
+        report_uuid = '818b0b22-1bac-45b9-9f4d-ad898a7c47e0'
+        metric_uuid = '3edbace9-8e2c-4c1d-8e62-7a9fb40ae127'
+        other_uuid = '5a8e7f36-2bd0-4a47-8e33-9a7c3fd1a4c6'
+        self._register_report_changelog(report_uuid, metric_uuid, other_uuid)
+
+        metric = {
+            'base_name': 'loc',
+            'report_uuid': report_uuid,
+            'report_date': '2024-05-04 13:39:32',
+            'domain_name': 'Demo application',
+            'scale': 'count',
+            'target': '40000',
+            'low_target': '50000'
+        }
+        metrics = {
+            metric_uuid: metric,
+            other_uuid: {**metric, 'base_name': 'tests', 'target': '200'}
+        }
+        version = {'version_id': '2024-05-04T13:45:00+00:00'}
+
+        with TemporaryDirectory() as directory:
+            self.data.set_cache_directory(directory)
+            versions = self.data.adjust_target_versions(version, deepcopy(metrics))
+            self.assertEqual([
+                (new_version['version_id'], list(data))
+                for new_version, data in versions
+            ], [
+                ('2024-05-04T13:27:42+00:00', [metric_uuid]),
+                ('2024-05-04T13:27:44+00:00', [metric_uuid]),
+                ('2024-05-04T13:39:23+00:00', [metric_uuid]),
+                ('2024-05-04T13:39:25+00:00', [other_uuid]),
+                ('2024-05-04T13:39:30+00:00', [metric_uuid])
+            ])
+            self.assertEqual(versions[3][1][other_uuid]['target'], '200')
+            self.assertEqual(versions[3][0]['email'], 'johndoe@example.test')
+            self.assertEqual(self.request.call_count, 1)
+
+            # A later collection uses the changes from the persistent cache.
+            self.assertTrue(Path(directory,
+                                 Quality_Time_Data.CHANGELOG_CACHE).exists())
+            data = Quality_Time_Data(self.project, self.source)
+            data.set_cache_directory(directory)
+            self.assertEqual(data.adjust_target_versions(version,
+                                                         deepcopy(metrics)),
+                             versions)
+            self.assertEqual(self.request.call_count, 1)
+
+            # Only the most recent changes of each metric are used.
+            with patch.object(data, 'CHANGELOG_SIZE', 2):
+                limited = data.adjust_target_versions(version,
+                                                      deepcopy(metrics))
+                self.assertEqual([
+                    new_version['version_id'] for new_version, _ in limited
+                ], ['2024-05-04T13:39:25+00:00', '2024-05-04T13:39:30+00:00'])
+
+            # Newer changes are retrieved for a later report date.
+            later_version = {'version_id': '2024-05-05T10:00:00+00:00'}
+            self.assertEqual(data.adjust_target_versions(later_version,
+                                                         deepcopy(metrics)),
+                             versions)
+            self.assertEqual(self.request.call_count, 2)
+
     def test_get_measurements(self) -> None:
         """
         Test retrieving the measurements for quality metrics measured at
@@ -277,3 +380,44 @@ class SonarDataTest(unittest.TestCase):
         self.request.get(url, exc=ConnectError)
         with self.assertRaises(RuntimeError):
             self.data.get_measurements(metrics, version)
+
+        self.request.get(url, text='{"measurements": [{"end": ')
+        with self.assertRaises(RuntimeError):
+            self.data.get_measurements(metrics, version)
+
+    def test_get_measurements_order(self) -> None:
+        """
+        Test retrieving the measurements for many quality metrics in the order
+        of the metrics.
+        """
+
+        metrics: MetricNames = {}
+        for index in range(20):
+            metric_uuid = f'00000000-0000-4000-8000-{index:012d}'
+            metrics[metric_uuid] = {'base_name': 'loc'}
+            self.request.get(f'https://qt.test/api/internal/measurements/{metric_uuid}',
+                             json={'measurements': [
+                                 {
+                                     'metric_uuid': metric_uuid,
+                                     'end': f'2024-05-{day:02d}T12:00:00+00:00'
+                                 }
+                                 for day in range(1, index % 5 + 3)
+                             ]})
+
+        version = {'version_id': '2024-05-04T13:45:00+00:00'}
+        measurements = self.data.get_measurements(metrics, version,
+                                                  from_revision='2024-05-02 12:00:00')
+        self.assertEqual([
+            (measurement['metric_uuid'], measurement['end'][:10])
+            for measurement in measurements
+        ], [
+            (metric_uuid, f'2024-05-{day:02d}')
+            for index, metric_uuid in enumerate(metrics)
+            for day in range(3, index % 5 + 3)
+        ])
+
+        failing_uuid = '00000000-0000-4000-8000-000000000010'
+        self.request.get(f'https://qt.test/api/internal/measurements/{failing_uuid}',
+                         status_code=500)
+        with self.assertRaisesRegex(RuntimeError, failing_uuid):
+            self.data.get_measurements(metrics, version)
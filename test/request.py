@@ -18,15 +18,20 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from configparser import RawConfigParser
 from io import StringIO
-from typing import Dict, Union
+import json
+import threading
+import time
+from typing import Any, Dict, List, Union, cast
 import unittest
 from unittest.mock import patch, MagicMock
 import requests
 from requests.auth import HTTPBasicAuth
 import requests_mock
 from gatherer import __version__ as version
-from gatherer.request import Session
+from gatherer.config import Configuration
+from gatherer.request import Session, Rate_Limiter, Rate_Limit_Adapter
 
 class SessionTest(unittest.TestCase):
     """
@@ -74,3 +79,316 @@ class SessionTest(unittest.TestCase):
             else str(session.headers['User-Agent'], encoding='utf-8')
         self.assertTrue(user_agent.startswith(f'gatherer/{version}-tests-sha '),
                         msg=f'User-Agent header missing module: {user_agent}')
+
+    def test_init_limiter(self) -> None:
+        """
+        Test creating a Session with a rate limiter.
+        """
+
+        session = Session()
+        self.assertIsInstance(session.get_adapter('https://resp.test'),
+                              Rate_Limit_Adapter)
+        limiter = Rate_Limiter()
+        session = Session(limiter=limiter)
+        adapter = session.get_adapter('http://resp.test')
+        self.assertIsInstance(adapter, Rate_Limit_Adapter)
+        if isinstance(adapter, Rate_Limit_Adapter):
+            self.assertIs(adapter.limiter, limiter)
+
+    def test_get_shared(self) -> None:
+        """
+        Test retrieving sessions that are shared within the process.
+        """
+
+        self.addCleanup(Session.clear_shared)
+        session = Session.get_shared('https://api.test/path', verify=False)
+        self.assertFalse(session.verify)
+        self.assertIsNone(session.auth)
+        self.assertIs(Session.get_shared('https://api.test/other?q=1',
+                                         verify=False),
+                      session)
+        self.assertIsNot(Session.get_shared('https://api.test/path'), session)
+        self.assertIsNot(Session.get_shared('https://other.test/path',
+                                            verify=False),
+                         session)
+
+        Session.clear_shared()
+        self.assertIsNot(Session.get_shared('https://api.test/path',
+                                            verify=False),
+                         session)
+
+    def test_fork(self) -> None:
+        """
+        Test creating a session for a single client based on another session.
+        """
+
+        session = Session(verify=False)
+        session.params = {'shared': '1'}
+        fork = session.fork(auth=HTTPBasicAuth('user', 'pass'))
+        self.assertIsInstance(fork, Session)
+        self.assertFalse(fork.verify)
+        self.assertEqual(fork.auth, HTTPBasicAuth('user', 'pass'))
+        self.assertIsNone(session.auth)
+        self.assertIs(fork.get_adapter('https://api.test'),
+                      session.get_adapter('https://api.test'))
+        self.assertEqual(fork.headers['User-Agent'],
+                         session.headers['User-Agent'])
+        self.assertEqual(fork.params, {'shared': '1'})
+
+        fork.headers['X-Crumb'] = 'token'
+        fork.cookies.set('JSESSIONID', 'abc')
+        fork.hooks['response'].append(MagicMock())
+        cast(Dict[str, str], fork.params)['client'] = '1'
+        fork.proxies['https'] = 'https://proxy.test'
+        adapter = requests_mock.Adapter()
+        fork.mount('https://api.test', adapter)
+        self.assertIs(fork.get_adapter('https://api.test'), adapter)
+        self.assertIsNot(session.get_adapter('https://api.test'), adapter)
+        self.assertNotIn('X-Crumb', session.headers)
+        self.assertNotIn('JSESSIONID', session.cookies)
+        self.assertEqual(session.hooks['response'], [])
+        self.assertEqual(session.params, {'shared': '1'})
+        self.assertEqual(session.proxies, {})
+
+        other = session.fork()
+        self.assertIsNone(other.auth)
+        self.assertNotIn('X-Crumb', other.headers)
+        self.assertEqual(other.hooks['response'], [])
+
+    def test_configure(self) -> None:
+        """
+        Test changing the settings of transport adapters of sessions.
+        """
+
+        # pylint: disable-next=protected-access
+        settings = dict(Session._adapter_settings)
+        self.addCleanup(Session.configure, **settings)
+
+        session = Session.get_shared('https://api.test')
+        adapter = session.get_adapter('https://api.test')
+        self.assertIsInstance(adapter, Rate_Limit_Adapter)
+        if isinstance(adapter, Rate_Limit_Adapter):
+            self.assertIsInstance(adapter.adapter, requests.adapters.HTTPAdapter)
+            if isinstance(adapter.adapter, requests.adapters.HTTPAdapter):
+                pool_manager = adapter.adapter.poolmanager
+                self.assertEqual(pool_manager.connection_pool_kw['maxsize'], 10)
+
+        factory = MagicMock(return_value=requests_mock.Adapter())
+        Session.configure(pool_maxsize=20, adapter_factory=factory)
+        shared = Session.get_shared('https://api.test')
+        self.assertIsNot(shared, session)
+        factory.assert_called_once_with(pool_connections=10, pool_maxsize=20)
+        adapter = shared.get_adapter('https://api.test')
+        if isinstance(adapter, Rate_Limit_Adapter):
+            self.assertIs(adapter.adapter, factory.return_value)
+
+    def test_configure_settings(self) -> None:
+        """
+        Test reading the connection pool sizes of sessions from the settings.
+        """
+
+        # pylint: disable-next=protected-access
+        settings = dict(Session._adapter_settings)
+        self.addCleanup(Session.configure, **settings)
+        self.addCleanup(setattr, Session, '_settings_read', False)
+
+        config = RawConfigParser()
+        config.read_dict({
+            'http': {'pool_connections': '3', 'pool_maxsize': 'many'}
+        })
+        factory = MagicMock(return_value=requests_mock.Adapter())
+        Session.configure(adapter_factory=factory)
+        with patch.object(Configuration, 'get_settings', return_value=config):
+            # Settings are not read again after they are configured.
+            Session.make_adapter()
+            factory.assert_called_once_with(pool_connections=10,
+                                            pool_maxsize=10)
+
+            factory.reset_mock()
+            Session.clear_shared()
+            setattr(Session, '_settings_read', False)
+            with self.assertLogs(level='WARNING') as logs:
+                Session.get_shared('https://api.test')
+
+            factory.assert_called_once_with(pool_connections=3,
+                                            pool_maxsize=10)
+            self.assertEqual(len(logs.output), 1)
+            self.assertIn('pool_maxsize setting: many', logs.output[0])
+
+            # Explicitly configured sizes take precedence over the settings.
+            factory.reset_mock()
+            Session.configure(pool_connections=5)
+            Session.make_adapter()
+            factory.assert_called_once_with(pool_connections=5,
+                                            pool_maxsize=10)
+
+    @requests_mock.Mocker()
+    def test_iter_json_array(self, request: requests_mock.Mocker) -> None:
+        """
+        Test parsing items of an array in a JSON response while reading it.
+        """
+
+        items = [
+            {'id': index, 'text': f'caf\u00e9 [{index}], {{"items": []}}'}
+            for index in range(50)
+        ]
+        request.get('https://resp.test/items',
+                    text=json.dumps({'other': [1], 'items': items, 'after': True},
+                                    ensure_ascii=False))
+        session = Session()
+        with session.get('https://resp.test/items', stream=True) as response:
+            self.assertEqual(list(Session.iter_json_array(response, 'items',
+                                                          chunk_size=7)),
+                             items)
+
+        request.get('https://resp.test/empty', text='{"items":[]}')
+        response = session.get('https://resp.test/empty', stream=True)
+        self.assertEqual(list(Session.iter_json_array(response, 'items')), [])
+
+        request.get('https://resp.test/missing', json={'other': []})
+        response = session.get('https://resp.test/missing', stream=True)
+        with self.assertRaises(ValueError):
+            list(Session.iter_json_array(response, 'items'))
+
+        request.get('https://resp.test/invalid', text='{"items": [{"id": 1}, {"id": ')
+        response = session.get('https://resp.test/invalid', stream=True)
+        iterator = Session.iter_json_array(response, 'items', chunk_size=4)
+        self.assertEqual(next(iterator), {'id': 1})
+        with self.assertRaises(ValueError):
+            next(iterator)
+
+class RateLimitAdapterTest(unittest.TestCase):
+    """
+    Tests for transport adapter which schedules requests with a rate limiter.
+    """
+
+    def setUp(self) -> None:
+        self.mock = requests_mock.Adapter()
+        self._set_limiter(Rate_Limiter(max_concurrency=4, max_backoff=0.05))
+
+    def _set_limiter(self, limiter: Rate_Limiter) -> None:
+        self.limiter = limiter
+        self.session = Session(limiter=self.limiter)
+        adapter = Rate_Limit_Adapter(self.limiter, adapter=self.mock,
+                                     max_retries=2)
+        self.session.mount('https://api.test', adapter)
+
+    def test_send(self) -> None:
+        """
+        Test sending requests through the adapter.
+        """
+
+        self.mock.register_uri('GET', 'https://api.test/ok', status_code=200)
+        self.mock.register_uri('GET', 'https://api.test/missing',
+                               status_code=404)
+        self.assertEqual(self.session.get('https://api.test/ok').status_code,
+                         200)
+        self.assertEqual(self.session.get('https://api.test/missing').status_code,
+                         404)
+        self.assertEqual(self.limiter.get_counters(), {
+            'api.test': {
+                'requests': 2,
+                'throttled': 0,
+                'wait_time': self.limiter.get_counters()['api.test']['wait_time'],
+                'concurrency': 4
+            }
+        })
+
+        with self.assertLogs(level='INFO') as logs:
+            self.limiter.log_counters()
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('api.test: 2 requests, 0 throttled', logs.output[0])
+
+    def test_send_throttled(self) -> None:
+        """
+        Test sending requests that exceed the rate limit of the host.
+        """
+
+        self.mock.register_uri('GET', 'https://api.test/retry', [
+            {'status_code': 429, 'headers': {'Retry-After': '0'}},
+            {'status_code': 403, 'headers': {'X-RateLimit-Remaining': '0',
+                                             'X-RateLimit-Reset': '0'}},
+            {'status_code': 200}
+        ])
+        self.assertEqual(self.session.get('https://api.test/retry').status_code,
+                         200)
+        counters = self.limiter.get_counters()['api.test']
+        self.assertEqual(counters['requests'], 3)
+        self.assertEqual(counters['throttled'], 2)
+        self.assertEqual(counters['concurrency'], 2)
+
+        # Successful requests increase the concurrency again.
+        self.mock.register_uri('GET', 'https://api.test/ok', status_code=200)
+        for _ in range(3):
+            self.session.get('https://api.test/ok')
+        self.assertEqual(self.limiter.get_counters()['api.test']['concurrency'],
+                         3)
+
+        # Requests are not retried too often.
+        self.mock.register_uri('GET', 'https://api.test/limit',
+                               status_code=429)
+        self.assertEqual(self.session.get('https://api.test/limit').status_code,
+                         429)
+        self.assertEqual(self.limiter.get_counters()['api.test']['requests'],
+                         9)
+
+        # Streamed request bodies are not sent again.
+        self.mock.register_uri('POST', 'https://api.test/limit',
+                               status_code=429)
+        response = self.session.post('https://api.test/limit',
+                                     data=iter([b'body']))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.limiter.get_counters()['api.test']['requests'],
+                         10)
+
+    def test_send_remaining(self) -> None:
+        """
+        Test sending requests when few requests remain in the rate limit.
+        """
+
+        self._set_limiter(Rate_Limiter(max_backoff=1.0))
+        self.mock.register_uri('GET', 'https://api.test/low', headers={
+            'RateLimit-Limit': '100',
+            'RateLimit-Remaining': '5',
+            'RateLimit-Reset': str(int(time.time()) + 1)
+        })
+        for _ in range(3):
+            self.session.get('https://api.test/low')
+
+        # The remaining requests are spread over the time until the reset.
+        counters = self.limiter.get_counters()['api.test']
+        self.assertGreater(counters['wait_time'], 0.1)
+        self.assertEqual(counters['throttled'], 0)
+
+    def test_concurrency(self) -> None:
+        """
+        Test limiting the number of concurrent requests to the host.
+        """
+
+        lock = threading.Lock()
+        active: List[int] = [0, 0]
+
+        def _callback(_request: Any, _context: Any) -> str:
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return 'ok'
+
+        self.mock.register_uri('GET', 'https://api.test/slow', text=_callback)
+        threads = [
+            threading.Thread(target=self.session.get,
+                             args=('https://api.test/slow',))
+            for _ in range(12)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(active[1], 4)
+        self.assertEqual(self.limiter.get_counters()['api.test']['requests'],
+                         12)
@@ -0,0 +1,56 @@
+"""
+Test package for Subversion repository data extraction.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from pathlib import Path
+import subprocess
+
+def make_history(path: Path, count: int) -> str:
+    """
+    Create a synthetic Subversion repository in the directory `path` with
+    `count` commits in its trunk, and return the `file://` URL of the
+    repository. The history contains additions, modifications and deletions.
+    """
+
+    repo_path = path / 'repo'
+    checkout = path / 'checkout'
+    subprocess.run(['svnadmin', 'create', str(repo_path)], check=True)
+    url = repo_path.resolve().as_uri()
+    subprocess.run(['svn', 'mkdir', '--quiet', '-m', 'Create trunk',
+                    f'{url}/trunk'], check=True)
+    subprocess.run(['svn', 'checkout', '--quiet', f'{url}/trunk',
+                    str(checkout)], check=True)
+    for index in range(1, count + 1):
+        module = checkout / f'module{index % 7}.py'
+        added = not module.exists()
+        with module.open('a', encoding='utf-8') as module_file:
+            module_file.write(''.join(f'line {line} of {index}\n'
+                                      for line in range(index % 5 + 1)))
+        if added:
+            subprocess.run(['svn', 'add', '--quiet', str(module)], check=True)
+
+        removed = checkout / f'module{(index + 3) % 7}.py'
+        if index % 11 == 0 and removed.exists():
+            subprocess.run(['svn', 'delete', '--quiet', str(removed)],
+                           check=True)
+
+        subprocess.run(['svn', 'commit', '--quiet', '-m', f'Change {index}',
+                        str(checkout)], check=True)
+
+    return url
@@ -0,0 +1,89 @@
+"""
+Tests for module for parsing Subversion difference formats.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from io import BytesIO
+import unittest
+from unittest.mock import MagicMock, patch
+from gatherer.svn.difference import Difference, Difference_State
+
+DIFF = b'''Index: trunk/new.py
+===================================================================
+--- trunk/new.py\t(nonexistent)
++++ trunk/new.py\t(revision 5)
+@@ -0,0 +1,2 @@
++first line\r
++second line\r
+Index: trunk/old.py
+===================================================================
+--- trunk/old.py\t(revision 4)
++++ trunk/old.py\t(nonexistent)
+@@ -1,3 +0,0 @@
+-removed
+-removed again
+-
+Index: trunk/module.py
+===================================================================
+--- trunk/module.py\t(revision 4)
++++ trunk/module.py\t(revision 5)
+@@ -1,3 +1,3 @@
+ context
+-before
++after
+ context
+'''
+
+class DifferenceTest(unittest.TestCase):
+    """
+    Tests for parser for Subversion difference format.
+    """
+
+    def setUp(self) -> None:
+        self.repo = MagicMock(repo_name='test-repo')
+
+    def test_parse_diff(self) -> None:
+        """
+        Test parsing the output of a diff command in chunks.
+        """
+
+        reference = Difference(self.repo, 'trunk', to_revision=5)
+        state = Difference_State(reference)
+        for line in DIFF.splitlines():
+            state.parse_line(line)
+
+        expected_stats = state.get_data()
+        expected = reference.change_paths.get()
+        self.assertEqual(expected[0], {
+            'repo_name': 'test-repo',
+            'version_id': '5',
+            'file': 'trunk/new.py',
+            'change_type': 'A',
+            'insertions': '2',
+            'deletions': '0'
+        })
+        self.assertEqual(len(expected), 3)
+
+        for chunk_size in (1, 7, 64, Difference.CHUNK_SIZE):
+            with self.subTest(chunk_size=chunk_size), \
+                    patch.object(Difference, 'CHUNK_SIZE', chunk_size):
+                diff = Difference(self.repo, 'trunk', to_revision=5)
+                # pylint: disable-next=protected-access
+                stats = diff._parse_diff(BytesIO(DIFF))
+                self.assertEqual(stats, expected_stats)
+                self.assertEqual(diff.change_paths.get(), expected)
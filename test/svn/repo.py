@@ -0,0 +1,162 @@
+"""
+Tests for module that handles access to a Subversion repository.
+
+Copyright 2017-2020 ICTU
+Copyright 2017-2022 Leiden University
+Copyright 2017-2024 Leon Helwerda
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import time
+import unittest
+import svn.remote
+from gatherer.domain.source import Source
+from gatherer.svn.repo import Subversion_Repository, StreamingRemoteClient, \
+    UnsafeRemoteClient
+from . import make_history
+
+class SubversionCommandTest(unittest.TestCase):
+    """
+    Tests for Subversion commands with streamed output.
+    """
+
+    def setUp(self) -> None:
+        self.path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.path)
+        # Replace the svn executable with a script that writes its arguments
+        # to the output and a large error message.
+        self.svn = self.path / 'svn'
+        self.svn.write_text('#!/bin/sh\necho "$@"\n'
+                            'head -c 200000 /dev/zero | tr "\\0" e >&2\n'
+                            'exit 1\n', encoding='utf-8')
+        self.svn.chmod(0o755)
+        source = Source.from_type('subversion', name='test-repo',
+                                  url='https://svn.test/repo')
+        self.repo = Subversion_Repository(source, self.path / 'work')
+
+    def test_open_command(self) -> None:
+        """
+        Test starting a Subversion command with the options of the client.
+        """
+
+        self.repo.repo = StreamingRemoteClient('https://svn.test/repo',
+                                               username='user',
+                                               password='pass',
+                                               svn_filepath=str(self.svn))
+        args = ['-r', '1:2', 'trunk']
+        with tempfile.TemporaryFile() as error_file:
+            with self.repo.open_command('diff', args,
+                                        stderr=error_file) as process:
+                if process.stdout is None: # pragma: no cover
+                    self.fail('Process has no output stream')
+
+                output = process.stdout.read()
+
+            self.assertEqual(process.returncode, 1)
+            self.assertEqual(output,
+                             b'--non-interactive --username user --password pass '
+                             b'--no-auth-cache diff -r 1:2 trunk\n')
+            error_file.seek(0)
+            self.assertEqual(len(error_file.read()), 200000)
+
+        self.assertEqual(args, ['-r', '1:2', 'trunk'])
+
+        # Errors are discarded if no file is provided.
+        self.repo.repo = UnsafeRemoteClient('https://svn.test/repo',
+                                            svn_filepath=str(self.svn))
+        with self.repo.open_command('diff', args) as process:
+            if process.stdout is None: # pragma: no cover
+                self.fail('Process has no output stream')
+
+            self.assertEqual(process.stdout.read(),
+                             b'--non-interactive diff -r 1:2 trunk '
+                             b'--trust-server-cert-failures=' +
+                             UnsafeRemoteClient.TRUST_FAILURES.encode() + b'\n')
+
+        # Other clients cannot start streaming commands.
+        self.repo.repo = svn.remote.RemoteClient('https://svn.test/repo',
+                                                 svn_filepath=str(self.svn))
+        with self.assertRaises(TypeError):
+            self.repo.open_command('diff', args)
+
+@unittest.skipUnless(shutil.which('svnadmin'), 'Subversion is not installed')
+class SubversionRepositoryTest(unittest.TestCase):
+    """
+    Tests for Subversion repository.
+    """
+
+    def setUp(self) -> None:
+        self.path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.path)
+        self.url = make_history(self.path, 30)
+
+    def _create_repo(self) -> Subversion_Repository:
+        source = Source.from_type('subversion', name='test-repo', url=self.url)
+        return Subversion_Repository.from_source(source, self.path / 'work')
+
+    def test_get_versions(self) -> None:
+        """
+        Test retrieving versions with difference statistics in batches.
+        """
+
+        repo = self._create_repo()
+        versions = repo.get_versions()
+        self.assertEqual(len(versions), 31)
+
+        reference = self._create_repo()
+        for version in versions:
+            stats = reference.get_diff_stats(filename='trunk',
+                                             to_revision=version['version_id'])
+            self.assertEqual({key: version[key] for key in stats}, stats)
+
+        self.assertEqual(repo.tables['change_path'].get(),
+                         reference.tables['change_path'].get())
+
+        without_stats = self._create_repo().get_versions(stats=False)
+        self.assertNotIn('insertions', without_stats[0])
+        self.assertEqual([version['version_id'] for version in without_stats],
+                         [version['version_id'] for version in versions])
+
+    @unittest.skipUnless(os.environ.get('GATHERER_BENCHMARK'),
+                         'Set GATHERER_BENCHMARK to a number of commits')
+    def test_benchmark(self) -> None:
+        """
+        Compare the duration of retrieving difference statistics with
+        concurrent threads against retrieving them one by one.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.path = Path(directory)
+            self.url = make_history(self.path,
+                                    int(os.environ.get('GATHERER_BENCHMARK', 0)))
+
+            repo = self._create_repo()
+            start = time.perf_counter()
+            versions = repo.get_versions(stats=False)
+            for version in versions:
+                repo.get_diff_stats(filename='trunk',
+                                    to_revision=version['version_id'])
+            serial_duration = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self._create_repo().get_versions()
+            batch_duration = time.perf_counter() - start
+
+        print(f'\n{len(versions)} revisions: serial {serial_duration:.2f}s, '
+              f'batch {batch_duration:.2f}s')
+        self.assertLess(batch_duration, serial_duration)
@@ -18,11 +18,21 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from collections.abc import MutableSequence
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from itertools import repeat
+import json
+import os
 from pathlib import Path
+import tempfile
+import time
 from typing import Dict, Optional, Sequence, Tuple, Union
 import unittest
 from unittest.mock import patch, MagicMock
-from gatherer.table import PathLike, Table, Key_Table, Link_Table
+from gatherer.salt import Salt
+from gatherer.table import PathLike, Encryption_Cache, Table, Key_Table, \
+    Link_Table
 
 class TableTest(unittest.TestCase):
     """
@@ -85,6 +95,69 @@ class TableTest(unittest.TestCase):
         self.assertEqual(len(rows), 1)
         self.assertEqual(set(rows[0].keys()), {"username", "encrypted"})
 
+        # Changes to the copy do not alter the table data.
+        username = rows[0]["username"]
+        rows[0]["username"] = "otheruser"
+        rows.append({"username": "newuser"})
+        self.assertEqual(len(self.table), 1)
+        self.assertEqual(next(iter(self.table))["username"], username)
+
+    def test_rows(self) -> None:
+        """
+        Test retrieving a read-only view of the table data.
+        """
+
+        rows = self.table.rows()
+        self.assertEqual(len(rows), 0)
+        self.table.append({"username": "testuser"})
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(set(rows[0].keys()), {"username", "encrypted"})
+        self.assertEqual(list(rows), list(self.table))
+        self.assertEqual(list(rows[:1]), list(self.table))
+        self.assertIs(rows[0], next(iter(self.table)))
+        self.assertNotIsInstance(rows, MutableSequence)
+
+    def test_drain(self) -> None:
+        """
+        Test retrieving the table data and removing it from the table.
+        """
+
+        self.table.append({"username": "testuser"})
+        rows = self.table.drain()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(set(rows[0].keys()), {"username", "encrypted"})
+        self.assertEqual(len(self.table), 0)
+        self.assertNotIn({"username": "testuser"}, self.table)
+        self.assertEqual(self.table.drain(), [])
+
+    @unittest.skipUnless(os.environ.get('GATHERER_BENCHMARK'),
+                         'Set GATHERER_BENCHMARK to a number of rows')
+    def test_benchmark(self) -> None:
+        """
+        Compare the duration of retrieving the table data with a deep copy,
+        with a copy of each row and with a view.
+        """
+
+        table = self._build_table('issue')
+        table.extend([
+            {"issue_id": str(index), "changelog_id": "1", "type": "story"}
+            for index in range(int(os.environ.get('GATHERER_BENCHMARK', 0)))
+        ])
+
+        durations: Dict[str, float] = {}
+        for name, method in (('deepcopy', lambda: deepcopy(list(table))),
+                             ('get', table.get),
+                             ('rows', lambda: list(table.rows()))):
+            start = time.perf_counter()
+            method()
+            durations[name] = time.perf_counter() - start
+
+        print(f'\n{type(table).__name__} {len(table)} rows: ' +
+              ', '.join(f'{name} {duration:.3f}s'
+                        for name, duration in durations.items()))
+        self.assertLess(durations['get'], durations['deepcopy'])
+        self.assertLess(durations['rows'], durations['get'])
+
     def test_has(self) -> None:
         """
         Test checking whether a row already exists within the table.
@@ -143,6 +216,39 @@ class TableTest(unittest.TestCase):
             "username": "testuser", "email": "foo@bar.test", "encrypted": "0"
         })
 
+    def test_encryption_cache(self) -> None:
+        """
+        Test remembering encrypted values of fields in tables.
+        """
+
+        shared = self.table.encryption_cache
+        table = self._build_table('test', encrypt_fields=('username',))
+        self.assertIsNotNone(shared)
+        self.assertIs(table.encryption_cache, shared)
+        self.assertIsNone(self._build_table('issue').encryption_cache)
+
+        secrets_path = Path('test/sample/secrets.json')
+        with secrets_path.open('r', encoding='utf-8') as secrets_file:
+            cache = Encryption_Cache(json.load(secrets_file))
+
+        value = cache.encrypt("username", "AD\\Cached")
+        self.assertEqual(value, Salt.encrypt(b"cached", b"salttoken",
+                                             b"peppertoken"))
+        self.assertEqual(cache.encrypt("developer_username", "AD\\Cached"),
+                         value)
+        self.assertEqual(cache.encrypt("email", "AD\\Cached"),
+                         Salt.encrypt(b"AD\\Cached", b"salttoken",
+                                      b"peppertoken"))
+        self.assertEqual(cache.encrypt("email", "0"), "0")
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 3)
+
+        row = table.append({"username": "AD\\Cached"})
+        if row is None: # pragma: no cover
+            self.fail("Row was not appended")
+
+        self.assertEqual(row["username"], value)
+
     def test_extend(self) -> None:
         """
         Test inserting multiple rows at once into the table.
@@ -184,9 +290,54 @@ class TableTest(unittest.TestCase):
             "username": "user", "email": "user@ad.test", "a": "new"
         }))
 
-    @patch('json.dump')
+    @staticmethod
+    def _get_written(file: MagicMock) -> str:
+        return ''.join(call.args[0] for call in file.write.call_args_list)
+
+    def test_index(self) -> None:
+        """
+        Test searching and updating rows in a table with a content index.
+        """
+
+        table = Table('issue', index=True)
+        table.extend([
+            {"issue_id": "1", "changelog_id": "1", "type": "bug"},
+            {"issue_id": "2", "changelog_id": "1", "type": "story"}
+        ])
+        table.append({"issue_id": "1", "changelog_id": "1", "type": "bug"})
+        self.assertTrue(table.has({
+            "issue_id": "2", "changelog_id": "1", "type": "story"
+        }))
+        self.assertFalse(table.has({"issue_id": "2"}))
+
+        table.update({"issue_id": "1", "changelog_id": "1", "type": "bug"},
+                     {"type": "task"})
+        self.assertEqual(table.get(), [
+            {"issue_id": "1", "changelog_id": "1", "type": "task"},
+            {"issue_id": "2", "changelog_id": "1", "type": "story"},
+            {"issue_id": "1", "changelog_id": "1", "type": "bug"}
+        ])
+        self.assertIsNotNone(table.get_row({
+            "issue_id": "1", "changelog_id": "1", "type": "task"
+        }))
+
+        # The duplicate row is updated in a later search.
+        table.update({"issue_id": "1", "changelog_id": "1", "type": "bug"},
+                     {"type": "task"})
+        self.assertFalse(table.has({
+            "issue_id": "1", "changelog_id": "1", "type": "bug"
+        }))
+        with self.assertRaises(ValueError):
+            table.update({"issue_id": "1", "changelog_id": "1", "type": "bug"},
+                         {"type": "epic"})
+
+        table.clear()
+        self.assertFalse(table.has({
+            "issue_id": "2", "changelog_id": "1", "type": "story"
+        }))
+
     @patch('json.load')
-    def test_write(self, loader: MagicMock, dumper: MagicMock) -> None:
+    def test_write(self, loader: MagicMock) -> None:
         """
         Test exporting the table data into a file.
         """
@@ -196,9 +347,8 @@ class TableTest(unittest.TestCase):
         self.assertIn(args, self.path_mocks)
         self.path_mocks[args].open.assert_called_once_with('w', encoding='utf-8')
         file = self.path_mocks[args].open.return_value.__enter__.return_value
-        dumper.assert_called_once_with([], file, indent=4)
+        self.assertEqual(self._get_written(file), '[]')
 
-        dumper.reset_mock()
         loader.configure_mock(return_value=[{
             "issue_id": "10", "changelog_id": "2", "type": "bug"
         }])
@@ -211,7 +361,7 @@ class TableTest(unittest.TestCase):
         self.assertIn(args, self.path_mocks)
         self.path_mocks[args].open.assert_called_with('w', encoding='utf-8')
         file = self.path_mocks[args].open.return_value.__enter__.return_value
-        dumper.assert_called_once_with([
+        expected = [
             {
                 "issue_id": "123",
                 "changelog_id": "1",
@@ -222,7 +372,53 @@ class TableTest(unittest.TestCase):
                 "changelog_id": "2",
                 "type": "bug"
             }
-        ], file, indent=4)
+        ]
+        self.assertEqual(self._get_written(file),
+                         json.dumps(expected, indent=4))
+
+        file.reset_mock()
+        table = self._build_table('issue', filename='data.json')
+        table.extend(expected)
+        table.write('test/sample/nest', indent=None)
+        self.assertEqual(self._get_written(file), json.dumps(expected))
+
+        table.write('test/sample/nest', lines=True)
+        path = self.path_mocks[args].with_suffix
+        path.assert_called_once_with('.jsonl')
+        file = path.return_value.open.return_value.__enter__.return_value
+        self.assertEqual(self._get_written(file).splitlines(),
+                         [json.dumps(row) for row in expected])
+
+    def test_write_lines_merge(self) -> None:
+        """
+        Test exporting table data in the JSON Lines format repeatedly while
+        merging with the earlier exported data.
+        """
+
+        self.path.configure_mock(side_effect=Path)
+        with tempfile.TemporaryDirectory() as directory:
+            table = self._build_table('issue', filename='data.json',
+                                      merge_update=True)
+            first = {"issue_id": "10", "changelog_id": "2", "type": "bug"}
+            table.append(first)
+            table.write(directory, lines=True)
+
+            second = {"issue_id": "123", "changelog_id": "1", "type": "story"}
+            table = self._build_table('issue', filename='data.json',
+                                      merge_update=True)
+            table.append(second)
+            table.write(directory, lines=True)
+
+            path = Path(directory, 'data.jsonl')
+            with path.open('r', encoding='utf-8') as lines_file:
+                rows = [json.loads(line) for line in lines_file]
+
+            self.assertEqual(rows, [second, first])
+            self.assertFalse(Path(directory, 'data.json').exists())
+
+            table = self._build_table('issue', filename='data.json')
+            table.load(directory, lines=True)
+            self.assertEqual(table.get(), [second, first])
 
     @patch('json.load')
     def test_load(self, loader: MagicMock) -> None:
@@ -453,3 +649,59 @@ class LinkTableTest(TableTest):
             self.table[("user3",)] = "bar@baz.test"
         with self.assertRaises(ValueError):
             self.table[("user3", "more")] = {"email": "baz@qux.test"}
+
+class EncryptionCacheTest(unittest.TestCase):
+    """
+    Tests for memory of pseudonymous values of fields.
+    """
+
+    @patch.object(Encryption_Cache, 'MAX_SIZE', 50)
+    def test_threads(self) -> None:
+        """
+        Test remembering encrypted values from multiple threads.
+        """
+
+        cache = Encryption_Cache({"salts": {"salt": "salt", "pepper": "pepper"}})
+        values = [str(index) for index in range(1, 200)] * 2
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            encrypted = list(executor.map(cache.encrypt, repeat("email"), values))
+
+        self.assertEqual(encrypted, [
+            Salt.encrypt(value.encode('utf-8'), b"salt", b"pepper")
+            for value in values
+        ])
+        self.assertEqual(cache.hits + cache.misses, len(values))
+        # pylint: disable-next=protected-access
+        self.assertLessEqual(len(cache._values), 50)
+
+    def test_load(self) -> None:
+        """
+        Test retrieving shared encryption caches for secrets files.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory, 'secrets.json')
+            self.assertIsNone(Encryption_Cache.load(path))
+
+            secrets = {"salts": {"salt": "first", "pepper": "second"}}
+            path.write_text(json.dumps(secrets), encoding='utf-8')
+            cache = Encryption_Cache.load(path)
+            if cache is None: # pragma: no cover
+                self.fail("Secrets were not loaded")
+
+            self.assertEqual(cache.secrets, secrets)
+            self.assertIs(Encryption_Cache.load(path), cache)
+
+            secrets["salts"]["salt"] = "third"
+            path.write_text(json.dumps(secrets), encoding='utf-8')
+            mtime = path.stat().st_mtime_ns + 1000000000
+            os.utime(path, ns=(mtime, mtime))
+            other = Encryption_Cache.load(path)
+            if other is None: # pragma: no cover
+                self.fail("Secrets were not loaded")
+
+            self.assertIsNot(other, cache)
+            self.assertEqual(other.secrets, secrets)
+
+            path.unlink()
+            self.assertIsNone(Encryption_Cache.load(path))
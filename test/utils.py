@@ -52,6 +52,7 @@ class IteratorLimiterTest(unittest.TestCase):
         self.assertFalse(self.limiter.reached_limit())
 
         limiter = Iterator_Limiter(size=1000, maximum=1000)
+        self.assertEqual(limiter.maximum, 1000)
         limiter.update()
         self.assertTrue(limiter.reached_limit())
 
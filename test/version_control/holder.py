@@ -19,10 +19,11 @@ limitations under the License.
 """
 
 from itertools import chain, repeat
+import json
 from pathlib import Path
 from typing import Dict, Optional, Tuple, Type, Union
 import unittest
-from unittest.mock import patch, MagicMock, PropertyMock
+from unittest.mock import call, patch, MagicMock, PropertyMock
 from gatherer.domain.project import Project
 from gatherer.domain.source import Source
 from gatherer.table import Table
@@ -250,7 +251,8 @@ class RepositoriesHolderTest(unittest.TestCase):
         repo.get_data.assert_called_once_with(from_revision='1234567890abcdef',
                                               force=False, stats=True)
         versions.extend.assert_called_once_with(repo.get_data.return_value)
-        versions.write.assert_called_once_with(Path('export/TEST'))
+        versions.write.assert_called_once_with(Path('export/TEST'), indent=4,
+                                               lines=False)
 
         # A repository with problems leads to no rows being added to the table.
         versions.reset_mock()
@@ -273,3 +275,56 @@ class RepositoriesHolderTest(unittest.TestCase):
         repo.get_data.assert_called_once_with(from_revision=None,
                                               force=True, stats=True)
         versions.extend.assert_called_once_with(repo.get_data.return_value)
+
+    @patch('gatherer.version_control.holder.Table', autospec=True)
+    def test_process_jobs(self, table: MagicMock) -> None:
+        """
+        Test retrieving updated commit data of repositories at the same time.
+        """
+
+        repo_class = MagicMock(spec=Version_Control_Repository,
+                               AUXILIARY_TABLES=('test',),
+                               UPDATE_TRACKER_NAME=None)
+        class_attrs = {'is_up_to_date.return_value': False}
+        repo_class.configure_mock(**class_attrs)
+        self.project.sources.clear()
+        repos: Dict[MagicMock, MagicMock] = {}
+        for name in ('testrepo', 'other', 'broken'):
+            source = MagicMock(spec=Source, repository_class=repo_class)
+            source_attrs = {'name': name, 'get_option.return_value': False}
+            source.configure_mock(**source_attrs)
+            self.project.sources.include(source)
+
+            repo = MagicMock(spec=Version_Control_Repository)
+            repo_attrs: RepositoryMockAttributes = {
+                'is_empty.return_value': False,
+                'get_latest_version.return_value': f'{name}-latest',
+                'repo_name': name,
+                'source': source,
+                'tables': {'test': Table('test')},
+                'update_trackers': {}
+            }
+            repo.configure_mock(**repo_attrs)
+            repo.get_data.configure_mock(return_value=[{'repo_name': name}])
+            repos[source] = repo
+
+        repos_attrs = {
+            'from_source.side_effect':
+                lambda source, *args, **kwargs: repos[source]
+        }
+        repo_class.configure_mock(**repos_attrs)
+        broken = [repo for repo in repos.values() if repo.repo_name == 'broken']
+        broken[0].get_data.configure_mock(side_effect=RepositorySourceException)
+
+        self._reset_path('latest_vcs_versions.json', True)
+        self.holder.process(force=True, jobs=2)
+        versions = table.return_value
+        # Repositories are added in the order of the sources.
+        self.assertEqual(versions.extend.call_args_list, [
+            call([{'repo_name': source.name}])
+            for source in self.project.sources if source.name != 'broken'
+        ])
+        self.assertEqual(json.loads(self.latest_path.read_text(encoding='utf-8')), {
+            'testrepo': 'testrepo-latest',
+            'other': 'other-latest'
+        })